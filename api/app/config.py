@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 import os
 
 
@@ -24,13 +24,114 @@ class Settings(BaseSettings):
     smtp_port: int = 587
     smtp_username: Optional[str] = None
     smtp_password: Optional[str] = None
+    smtp_use_tls: bool = True
+    smtp_timeout: int = 30
+    # Sessions kept open per SMTP server and login
+    smtp_pool_size: int = 4
+    # Pooled sessions idle longer than this are checked with NOOP before use
+    smtp_noop_interval: int = 30
+    # Servers commonly drop idle sessions after a few minutes
+    smtp_idle_timeout: int = 240
+    smtp_max_messages_per_connection: int = 100
+    # Unseen messages downloaded per POP3 session; a burst drains over several
+    email_fetch_batch_size: int = 25
+    # Plain POP3 is only for local stand-in servers
+    pop3_use_ssl: bool = True
+    # Larger messages are skipped after reading their headers
+    mail_max_message_size: int = 52428800
+    # IDLE is re-issued on a fresh connection after this many seconds (RFC 2177 allows 29 minutes)
+    imap_idle_timeout: int = 600
+    imap_use_ssl: bool = True
+    imap_reconnect_delay: int = 30
     
     # Redis
     redis_url: str = "redis://localhost:6379/0"
     
+    # Processing Queue
+    queue_backend: str = "postgres"  # postgres or redis
+    queue_visibility_timeout: int = 300
+    queue_lease_heartbeat_interval: int = 60  # must be well under the visibility timeout
+    queue_redis_prefix: str = "resume_queue:"
+    queue_default_tenant_weight: int = 1
+    queue_default_tenant_concurrency: int = 0  # 0 = no cap
+    queue_tenant_share_refresh: int = 60
+    
+    # Pipeline
+    pipeline_queue_size: int = 100
+    pipeline_ingest_concurrency: int = 4
+    pipeline_store_concurrency: int = 4
+    pipeline_parse_workers: int = 2
+    pipeline_score_concurrency: int = 4
+    pipeline_respond_concurrency: int = 4
+    pipeline_poll_interval: int = 60
+    pipeline_dispatch_idle_interval: float = 1.0
+    pipeline_embedded: bool = False
+    worker_drain_timeout: int = 120
+    
+    # Outbound Mailer
+    outbox_poll_interval: int = 5
+    outbox_batch_size: int = 100
+    # Delay before a queued candidate response is first sent
+    outbox_response_delay: int = 0
+    # Sends per minute per SMTP account, and per email_provider across accounts
+    outbox_account_rate_limit: int = 20
+    outbox_provider_rate_limits: Dict[str, int] = {"gmail": 60, "outlook": 60}
+    outbox_default_provider_rate_limit: int = 120
+    # Buckets hold this many seconds' worth of sends, capping bursts
+    outbox_burst_seconds: int = 10
+    outbox_max_attempts: int = 5
+    outbox_retry_base_delay: int = 60
+    outbox_retry_max_delay: int = 3600
+    # A response left in sending this long is taken to belong to a dead sender
+    # and sent again; keep it well above the time to send one batch
+    outbox_claim_timeout: int = 600
+    
+    # Email Templates
+    # Compiled templates kept in memory, keyed by template id and updated_at
+    template_cache_size: int = 1000
+    # Seconds a user's template index is used before it is reloaded
+    template_index_ttl: int = 60
+    
+    # Dashboard Cache
+    dashboard_cache_backend: str = "memory"  # memory, redis or off
+    # Seconds a cached stats response is served; writes invalidate sooner
+    dashboard_cache_ttl: int = 30
+    dashboard_cache_max_entries: int = 10000
+    dashboard_cache_redis_prefix: str = "dashboard_cache:"
+    # Longest a request waits for another process to compute the same response
+    dashboard_cache_lock_timeout: float = 10.0
+    
+    # Mailbox Poller
+    poller_max_connections: int = 20
+    poller_max_connections_per_host: int = 4
+    poller_mailbox_timeout: int = 30
+    poller_max_interval: int = 900
+    poller_backoff_factor: float = 2.0
+    
+    # Worker Autoscaler
+    autoscaler_interval: int = 15
+    autoscaler_parse_min_workers: int = 1
+    autoscaler_parse_max_workers: int = 4
+    autoscaler_score_min_workers: int = 1
+    autoscaler_score_max_workers: int = 8
+    autoscaler_jobs_per_worker: int = 25
+    autoscaler_max_job_age: int = 120
+    autoscaler_scale_up_cooldown: int = 30
+    autoscaler_scale_down_cooldown: int = 300
+    autoscaler_metrics_port: int = 9100
+
+    # Scheduler
+    scheduler_mailbox_poll_interval: int = 60
+    scheduler_mailbox_poll_jitter: int = 10
+    scheduler_upload_cleanup_cron: str = "30 3 * * *"
+    scheduler_history_retention_days: int = 30
+    
     # File Upload
     upload_dir: str = "uploads"
     max_file_size: int = 10485760  # 10MB
+    bulk_upload_max_files: int = 1000
+    upload_retention_days: int = 30
+    bulk_upload_insert_batch_size: int = 200
     
     # Application
     debug: bool = True
@@ -9,6 +9,12 @@ from .email_template import EmailTemplate
 from .system_config import SystemConfig
 from .audit_log import AuditLog
 from .processing_queue import ProcessingQueue
+from .pipeline_stage_timing import PipelineStageTiming
+from .upload_batch import UploadBatch
+from .scheduled_task_run import ScheduledTaskRun
+from .email_seen_uid import EmailSeenUid
+from .stored_file import StoredFile
+from .daily_user_rollup import DailyUserRollup
 
 __all__ = [
     "User",
@@ -22,5 +28,11 @@ __all__ = [
     "EmailTemplate",
     "SystemConfig",
     "AuditLog",
-    "ProcessingQueue"
+    "ProcessingQueue",
+    "PipelineStageTiming",
+    "UploadBatch",
+    "ScheduledTaskRun",
+    "EmailSeenUid",
+    "StoredFile",
+    "DailyUserRollup"
 ] 
\ No newline at end of file
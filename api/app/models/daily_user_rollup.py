@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Date, DateTime, Integer, BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+import uuid
+
+
+class DailyUserRollup(Base):
+    __tablename__ = "daily_user_rollups"
+    __table_args__ = (
+        Index("idx_daily_user_rollups_user_day", "user_id", "day", unique=True),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    # Day the submissions were received; their later outcomes count against it too
+    day = Column(Date, nullable=False)
+    submissions = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    score_sum = Column(BigInteger, nullable=False, default=0)
+    score_count = Column(Integer, nullable=False, default=0)
+    responses = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
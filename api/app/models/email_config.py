@@ -13,10 +13,17 @@ class EmailConfig(Base):
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
     email_address = Column(String(255), nullable=False)
     email_provider = Column(String(50), nullable=False)
+    # pop3 mailboxes are polled; imap mailboxes are watched with IDLE
+    ingest_protocol = Column(String(10), default="pop3")
     pop3_host = Column(String(255))
     pop3_port = Column(Integer, default=995)
     pop3_username = Column(String(255))
     pop3_password = Column(String(255))
+    imap_host = Column(String(255))
+    imap_port = Column(Integer, default=993)
+    imap_username = Column(String(255))
+    imap_password = Column(String(255))
+    imap_folder = Column(String(255), default="INBOX")
     smtp_host = Column(String(255))
     smtp_port = Column(Integer, default=587)
     smtp_username = Column(String(255))
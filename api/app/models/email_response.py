@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -8,6 +8,9 @@ import uuid
 
 class EmailResponse(Base):
     __tablename__ = "email_responses"
+    __table_args__ = (
+        Index("idx_email_responses_status_send_after", "delivery_status", "send_after"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     resume_submission_id = Column(UUID(as_uuid=True), ForeignKey("resume_submissions.id", ondelete="CASCADE"))
@@ -17,9 +20,16 @@ class EmailResponse(Base):
     body = Column(Text)
     template_used = Column(String(100))
     sent_at = Column(DateTime(timezone=True))
+    # pending (queued), sending, sent or failed; the outbound mailer sends
+    # pending rows once send_after has passed
     delivery_status = Column(String(50))
+    send_after = Column(DateTime(timezone=True), server_default=func.now())
+    # When the mailer marked the row sending
+    claimed_at = Column(DateTime(timezone=True))
+    attempts = Column(Integer, default=0)
     error_message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     resume_submission = relationship("ResumeSubmission", back_populates="email_responses")
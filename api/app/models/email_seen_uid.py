@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+import uuid
+
+
+class EmailSeenUid(Base):
+    __tablename__ = "email_seen_uids"
+    __table_args__ = (
+        Index("idx_email_seen_uids_config_uid", "email_config_id", "uid", unique=True),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email_config_id = Column(UUID(as_uuid=True), ForeignKey("email_configs.id", ondelete="CASCADE"), nullable=False)
+    # POP3 UIDL of a message that was stored or screened out
+    uid = Column(String(255), nullable=False)
+    seen_at = Column(DateTime(timezone=True), server_default=func.now())
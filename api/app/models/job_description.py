@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Text, ARRAY
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Text, ARRAY, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -8,6 +8,10 @@ import uuid
 
 class JobDescription(Base):
     __tablename__ = "job_descriptions"
+    __table_args__ = (
+        # Keyset pagination order within a user's job descriptions
+        Index("idx_job_descriptions_user_created_at_id", "user_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
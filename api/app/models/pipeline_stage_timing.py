@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+import uuid
+
+
+class PipelineStageTiming(Base):
+    __tablename__ = "pipeline_stage_timings"
+    __table_args__ = (
+        Index("idx_pipeline_stage_timings_stage_completed_at", "stage", "completed_at"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    resume_submission_id = Column(UUID(as_uuid=True), ForeignKey("resume_submissions.id", ondelete="CASCADE"), index=True)
+    stage = Column(String(50), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    completed_at = Column(DateTime(timezone=True), nullable=False)
+    duration_ms = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    resume_submission = relationship("ResumeSubmission", back_populates="stage_timings")
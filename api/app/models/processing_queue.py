@@ -11,14 +11,19 @@ class ProcessingQueue(Base):
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     resume_submission_id = Column(UUID(as_uuid=True), ForeignKey("resume_submissions.id", ondelete="CASCADE"))
+    # Owner of the submission's mailbox, copied here for fair-share dequeueing
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
     priority = Column(Integer, default=0)
     status = Column(String(50), default="queued")
+    stage = Column(String(50), default="parse")
     retry_count = Column(Integer, default=0)
     max_retries = Column(Integer, default=3)
     scheduled_at = Column(DateTime(timezone=True), server_default=func.now())
     started_at = Column(DateTime(timezone=True))
+    lease_expires_at = Column(DateTime(timezone=True))
     completed_at = Column(DateTime(timezone=True))
     error_message = Column(Text)
+    failure_class = Column(String(50))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
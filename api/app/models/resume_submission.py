@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Text, BigInteger
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, ForeignKey, Text, BigInteger, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -8,11 +8,20 @@ import uuid
 
 class ResumeSubmission(Base):
     __tablename__ = "resume_submissions"
+    __table_args__ = (
+        Index("idx_resume_submissions_idempotency_key", "email_config_id", "idempotency_key", unique=True),
+        # Keyset pagination order
+        Index("idx_resume_submissions_created_at_id", "created_at", "id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     email_config_id = Column(UUID(as_uuid=True), ForeignKey("email_configs.id", ondelete="CASCADE"))
     job_description_id = Column(UUID(as_uuid=True), ForeignKey("job_descriptions.id"))
-    candidate_email = Column(String(255), nullable=False)
+    upload_batch_id = Column(UUID(as_uuid=True), ForeignKey("upload_batches.id", ondelete="SET NULL"), index=True)
+    # Shared copy of the attachment's content; set for mailbox submissions
+    stored_file_id = Column(UUID(as_uuid=True), ForeignKey("stored_files.id", ondelete="SET NULL"), index=True)
+    # Bulk uploads have no sender; the address is filled in from the parsed resume
+    candidate_email = Column(String(255))
     candidate_name = Column(String(255))
     position_applied = Column(String(255))
     original_email_subject = Column(String(500))
@@ -22,16 +31,24 @@ class ResumeSubmission(Base):
     file_size_bytes = Column(BigInteger)
     file_type = Column(String(50))
     status = Column(String(50), default="pending")
+    # Last pipeline checkpoint whose output is stored (stored/parsed/scored/responded)
+    pipeline_stage = Column(String(50), default="stored")
     processing_started_at = Column(DateTime(timezone=True))
     processing_completed_at = Column(DateTime(timezone=True))
     error_message = Column(Text)
+    # Client-supplied Idempotency-Key, or derived from Message-ID and attachment hash
+    idempotency_key = Column(String(255))
+    duplicate_count = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     email_config = relationship("EmailConfig", back_populates="resume_submissions")
+    upload_batch = relationship("UploadBatch", back_populates="resume_submissions")
+    stored_file = relationship("StoredFile", back_populates="resume_submissions")
     job_description = relationship("JobDescription", back_populates="resume_submissions")
     parsed_resume = relationship("ParsedResume", back_populates="resume_submission", uselist=False)
     scoring_results = relationship("ScoringResult", back_populates="resume_submission")
     email_responses = relationship("EmailResponse", back_populates="resume_submission")
-    processing_queue = relationship("ProcessingQueue", back_populates="resume_submission", uselist=False) 
\ No newline at end of file
+    processing_queue = relationship("ProcessingQueue", back_populates="resume_submission", uselist=False)
+    stage_timings = relationship("PipelineStageTiming", back_populates="resume_submission") 
\ No newline at end of file
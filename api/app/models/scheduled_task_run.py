@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from app.database import Base
+import uuid
+
+
+class ScheduledTaskRun(Base):
+    __tablename__ = "scheduled_task_runs"
+    __table_args__ = (
+        Index("idx_scheduled_task_runs_task_started_at", "task_name", "started_at"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    task_name = Column(String(100), nullable=False)
+    node = Column(String(255))
+    status = Column(String(50), default="running")
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+    duration_ms = Column(Integer)
+    result = Column(JSONB)
+    error_message = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+import uuid
+
+
+class StoredFile(Base):
+    __tablename__ = "stored_files"
+    __table_args__ = (
+        Index("idx_stored_files_sha256", "sha256", unique=True),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    # Content hash of the attachment; submissions with the same content share the file
+    sha256 = Column(String(64), nullable=False)
+    file_path = Column(String(500), nullable=False)
+    file_size_bytes = Column(BigInteger)
+    file_type = Column(String(50))
+    # Submissions linked to the file after the first, whose copies were not kept
+    reuse_count = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_seen_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    resume_submissions = relationship("ResumeSubmission", back_populates="stored_file")
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index, Text
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.database import Base
+import uuid
+
+
+class UploadBatch(Base):
+    __tablename__ = "upload_batches"
+    __table_args__ = (
+        Index("idx_upload_batches_idempotency_key", "user_id", "idempotency_key", unique=True),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    email_config_id = Column(UUID(as_uuid=True), ForeignKey("email_configs.id", ondelete="CASCADE"))
+    job_description_id = Column(UUID(as_uuid=True), ForeignKey("job_descriptions.id"))
+    status = Column(String(50), default="uploading")
+    idempotency_key = Column(String(255))
+    total_files = Column(Integer, default=0)
+    accepted_files = Column(Integer, default=0)
+    rejected_files = Column(Integer, default=0)
+    rejections = Column(JSONB, default=list)
+    error_message = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    uploaded_at = Column(DateTime(timezone=True))
+    
+    # Relationships
+    resume_submissions = relationship("ResumeSubmission", back_populates="upload_batch")
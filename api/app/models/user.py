@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Text
+from sqlalchemy import Column, String, Boolean, DateTime, Integer, Text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -16,6 +16,9 @@ class User(Base):
     last_name = Column(String(100), nullable=False)
     role = Column(String(50), nullable=False, default="user")
     is_active = Column(Boolean, default=True)
+    # Fair-share scheduling of this user's processing queue jobs
+    queue_weight = Column(Integer, default=1)
+    max_concurrent_jobs = Column(Integer)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
@@ -7,6 +7,7 @@ from .email_configs import router as email_configs_router
 from .email_templates import router as email_templates_router
 from .dashboard import dashboard_router
 from .email_responses import router as email_responses_router
+from .processing_queue import router as processing_queue_router
 
 __all__ = [
     "auth_router",
@@ -17,5 +18,6 @@ __all__ = [
     "email_configs_router",
     "email_templates_router",
     "dashboard_router",
-    "email_responses_router"
+    "email_responses_router",
+    "processing_queue_router"
 ] 
\ No newline at end of file
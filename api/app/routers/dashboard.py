@@ -1,186 +1,317 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
-from datetime import datetime, timedelta
+from sqlalchemy.dialects.postgresql import array
+from datetime import date, datetime, time, timedelta
 from typing import List, Dict, Any
 from app.database import get_db
+from app.auth import get_current_active_user
+from app.models.user import User
+from app.models.email_config import EmailConfig
 from app.models.resume_submission import ResumeSubmission
 from app.models.scoring_result import ScoringResult
-from app.models.email_response import EmailResponse
+from app.models.daily_user_rollup import DailyUserRollup
 from app.models.processing_queue import ProcessingQueue
+from app.models.pipeline_stage_timing import PipelineStageTiming
+from app.models.scheduled_task_run import ScheduledTaskRun
+from app.services.pipeline import get_running_pipeline
+from app.services.response_cache import get_response_cache
 
 dashboard_router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
+PIPELINE_STAGES = ["received", "stored", "queued", "parsed", "scored", "responded", "sent"]
+
+STATS_WINDOW_DAYS = (7, 30, 90)
+
+# Lower bound and label of each score range, lowest first
+SCORE_BUCKETS = [(0, "0-59"), (60, "60-69"), (70, "70-79"), (80, "80-89"), (90, "90-100")]
+
+
+def _stats_since(days: int) -> datetime:
+    """Start of the first day in a stats window, so every bucket is a whole day"""
+    if days not in STATS_WINDOW_DAYS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"days must be one of {', '.join(str(window) for window in STATS_WINDOW_DAYS)}"
+        )
+    return datetime.combine(date.today() - timedelta(days=days - 1), time.min)
+
+
+def _dashboard_metrics(db: Session, user_id) -> Dict[str, Any]:
+    """Compute the metrics response"""
+    # Totals come from the daily rollups, so they cost one row per day of history
+    last_month = date.today() - timedelta(days=30)
+    recent = DailyUserRollup.day >= last_month
+    totals = db.query(
+        func.coalesce(func.sum(DailyUserRollup.submissions), 0),
+        func.coalesce(func.sum(DailyUserRollup.submissions).filter(recent), 0),
+        func.coalesce(func.sum(DailyUserRollup.score_sum), 0),
+        func.coalesce(func.sum(DailyUserRollup.score_count), 0),
+        func.coalesce(func.sum(DailyUserRollup.responses), 0),
+        func.coalesce(func.sum(DailyUserRollup.responses).filter(recent), 0)
+    ).filter(DailyUserRollup.user_id == user_id).one()
+    total_submissions, last_month_submissions, score_sum, score_count, email_responses, last_month_emails = (
+        int(value) for value in totals
+    )
+    
+    # Calculate submissions change percentage
+    submissions_change = 0
+    if last_month_submissions > 0:
+        submissions_change = ((total_submissions - last_month_submissions) / last_month_submissions) * 100
+    
+    # Get processing queue count
+    processing_queue = db.query(ProcessingQueue).filter(
+        ProcessingQueue.user_id == user_id,
+        ProcessingQueue.status.in_(["queued", "processing"])
+    ).count()
+    
+    # Get average score
+    average_score = round(score_sum / score_count, 1) if score_count else 0
+    
+    # Calculate email change percentage
+    email_change = 0
+    if last_month_emails > 0:
+        email_change = ((email_responses - last_month_emails) / last_month_emails) * 100
+    
+    # Calculate queue change (mock data for now)
+    queue_change = 0
+    
+    # Calculate score change (mock data for now)
+    score_change = 0
+    
+    return {
+        "totalSubmissions": total_submissions,
+        "submissionsChange": round(submissions_change, 1),
+        "processingQueue": processing_queue,
+        "queueChange": queue_change,
+        "averageScore": average_score,
+        "scoreChange": score_change,
+        "emailResponses": email_responses,
+        "emailChange": round(email_change, 1)
+    }
+
+
+def _processing_stats(db: Session, user_id, since: datetime, days: int) -> List[Dict[str, Any]]:
+    """Compute the processing stats response"""
+    # Read from the daily rollups: one row per day, whatever the volume
+    rows = db.query(
+        DailyUserRollup.day,
+        DailyUserRollup.submissions,
+        DailyUserRollup.processed,
+        DailyUserRollup.failed
+    ).filter(
+        DailyUserRollup.user_id == user_id,
+        DailyUserRollup.day >= since.date()
+    ).all()
+    
+    by_day = {row[0]: row for row in rows}
+    processing_stats = []
+    for offset in range(days):
+        current_date = since.date() + timedelta(days=offset)
+        row = by_day.get(current_date)
+        processing_stats.append({
+            "date": current_date.strftime("%Y-%m-%d"),
+            "submissions": row[1] if row else 0,
+            "processed": row[2] if row else 0,
+            "failed": row[3] if row else 0
+        })
+    
+    return processing_stats
+
+
+def _scoring_stats(db: Session, user_id, since: datetime, days: int) -> Dict[str, Any]:
+    """Compute the scoring stats response"""
+    score = ScoringResult.total_score
+    day = func.date_trunc('day', ScoringResult.created_at)
+    # Bucket 0 is below the first threshold, bucket N at or above the Nth
+    bucket = func.width_bucket(score, array([threshold for threshold, _ in SCORE_BUCKETS[1:]]))
+    
+    # Distribution and trends come from one query, grouped both ways
+    rows = db.query(
+        func.grouping(day),
+        day,
+        bucket,
+        func.count(ScoringResult.id),
+        func.avg(score)
+    ).join(
+        ResumeSubmission, ScoringResult.resume_submission_id == ResumeSubmission.id
+    ).join(EmailConfig).filter(
+        EmailConfig.user_id == user_id,
+        ScoringResult.created_at >= since
+    ).group_by(func.grouping_sets(day, bucket)).all()
+    
+    trend_rows = {row[1].date(): row for row in rows if row[0] == 0}
+    bucket_counts = {row[2]: row[3] for row in rows if row[0] == 1}
+    total_scored = sum(bucket_counts.values())
+    
+    distribution = []
+    for index, (_, range_label) in reversed(list(enumerate(SCORE_BUCKETS))):
+        count = bucket_counts.get(index, 0)
+        if count > 0:
+            distribution.append({
+                "score_range": range_label,
+                "count": count,
+                "percentage": round((count / total_scored) * 100, 1)
+            })
+    
+    trends = []
+    for offset in range(days):
+        current_date = since.date() + timedelta(days=offset)
+        row = trend_rows.get(current_date)
+        if row:
+            trends.append({
+                "date": current_date.strftime("%Y-%m-%d"),
+                "average_score": round(float(row[4]), 1),
+                "total_submissions": row[3]
+            })
+    
+    return {
+        "window_days": days,
+        "distribution": distribution,
+        "trends": trends
+    }
+
 
 @dashboard_router.get("/metrics")
-async def get_dashboard_metrics(db: Session = Depends(get_db)):
-    """Get dashboard metrics"""
+async def get_dashboard_metrics(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get dashboard metrics for the current user"""
     try:
-        # Get total submissions
-        total_submissions = db.query(ResumeSubmission).count()
-        
-        # Get submissions from last month for comparison
-        last_month = datetime.now() - timedelta(days=30)
-        last_month_submissions = db.query(ResumeSubmission).filter(
-            ResumeSubmission.created_at >= last_month
-        ).count()
-        
-        # Calculate submissions change percentage
-        submissions_change = 0
-        if last_month_submissions > 0:
-            submissions_change = ((total_submissions - last_month_submissions) / last_month_submissions) * 100
-        
-        # Get processing queue count
-        processing_queue = db.query(ProcessingQueue).filter(
-            ProcessingQueue.status.in_(["pending", "processing"])
-        ).count()
-        
-        # Get average score
-        avg_score_result = db.query(func.avg(ScoringResult.score)).scalar()
-        average_score = round(avg_score_result, 1) if avg_score_result else 0
-        
-        # Get email responses count
-        email_responses = db.query(EmailResponse).count()
-        
-        # Get email responses from last month for comparison
-        last_month_emails = db.query(EmailResponse).filter(
-            EmailResponse.created_at >= last_month
-        ).count()
-        
-        # Calculate email change percentage
-        email_change = 0
-        if last_month_emails > 0:
-            email_change = ((email_responses - last_month_emails) / last_month_emails) * 100
-        
-        # Calculate queue change (mock data for now)
-        queue_change = 0
-        
-        # Calculate score change (mock data for now)
-        score_change = 0
-        
-        return {
-            "totalSubmissions": total_submissions,
-            "submissionsChange": round(submissions_change, 1),
-            "processingQueue": processing_queue,
-            "queueChange": queue_change,
-            "averageScore": average_score,
-            "scoreChange": score_change,
-            "emailResponses": email_responses,
-            "emailChange": round(email_change, 1)
-        }
+        return await get_response_cache().get_or_compute(
+            "metrics", current_user.id, {}, lambda: _dashboard_metrics(db, current_user.id)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching metrics: {str(e)}")
 
 
 @dashboard_router.get("/processing-stats")
-async def get_processing_stats(db: Session = Depends(get_db)):
-    """Get processing statistics for the last 7 days"""
+async def get_processing_stats(
+    days: int = Query(7),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get daily submission counts for the current user over the last 7, 30 or 90 days"""
+    since = _stats_since(days)
     try:
-        # Get data for the last 7 days
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
-        
-        processing_stats = []
-        
-        for i in range(7):
-            current_date = start_date + timedelta(days=i)
-            next_date = current_date + timedelta(days=1)
-            
-            # Get submissions for this day
-            submissions = db.query(ResumeSubmission).filter(
-                ResumeSubmission.created_at >= current_date,
-                ResumeSubmission.created_at < next_date
-            ).count()
-            
-            # Get processed submissions (completed scoring results)
-            processed = db.query(ScoringResult).join(ResumeSubmission).filter(
-                ScoringResult.created_at >= current_date,
-                ScoringResult.created_at < next_date
-            ).count()
-            
-            # Calculate failed (submissions - processed)
-            failed = max(0, submissions - processed)
-            
-            processing_stats.append({
-                "date": current_date.strftime("%Y-%m-%d"),
-                "submissions": submissions,
-                "processed": processed,
-                "failed": failed
-            })
-        
-        return processing_stats
+        return await get_response_cache().get_or_compute(
+            "processing-stats", current_user.id, {"days": days},
+            lambda: _processing_stats(db, current_user.id, since, days)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching processing stats: {str(e)}")
 
 
 @dashboard_router.get("/scoring-stats")
-async def get_scoring_stats(db: Session = Depends(get_db)):
-    """Get scoring statistics"""
+async def get_scoring_stats(
+    days: int = Query(7),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the score distribution and daily score trends for the current user over the last 7, 30 or 90 days"""
+    since = _stats_since(days)
     try:
-        # Get score distribution
-        score_ranges = [
-            (90, 100, "90-100"),
-            (80, 89, "80-89"),
-            (70, 79, "70-79"),
-            (60, 69, "60-69"),
-            (0, 59, "0-59")
-        ]
-        
-        distribution = []
-        total_scored = 0
-        
-        for min_score, max_score, range_label in score_ranges:
-            count = db.query(ScoringResult).filter(
-                ScoringResult.score >= min_score,
-                ScoringResult.score <= max_score
-            ).count()
-            
-            total_scored += count
-            
-            if count > 0:
-                distribution.append({
-                    "score_range": range_label,
-                    "count": count,
-                    "percentage": 0  # Will calculate below
-                })
-        
-        # Calculate percentages
-        for item in distribution:
-            if total_scored > 0:
-                item["percentage"] = round((item["count"] / total_scored) * 100, 1)
-        
-        # Get score trends for the last 7 days
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=7)
+        return await get_response_cache().get_or_compute(
+            "scoring-stats", current_user.id, {"days": days},
+            lambda: _scoring_stats(db, current_user.id, since, days)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching scoring stats: {str(e)}")
+
+
+@dashboard_router.get("/cache-stats")
+async def get_cache_stats():
+    """Get hit rates of the dashboard response cache in this process"""
+    return get_response_cache().get_stats()
+
+
+@dashboard_router.get("/pipeline-status")
+async def get_pipeline_status():
+    """Get per-stage queue depths of the pipeline running in this process"""
+    pipeline = get_running_pipeline()
+    if pipeline is None:
+        return {"status": "not_running", "stages": {}}
+    return {
+        "status": "running",
+        "stages": pipeline.get_stats(),
+        "mailbox_poller": pipeline.poller.get_stats() if pipeline.has_stage("ingest") else None,
+        "mail_classifier": pipeline.email_processor.mail_classifier.get_stats() if pipeline.has_stage("ingest") else None,
+        "outbound_mailer": pipeline.outbound_mailer.get_stats() if pipeline.outbound_mailer is not None else None,
+        "template_engine": pipeline.template_engine.get_stats(),
+        "deduplication": pipeline.dedup_stats
+    }
+
+
+@dashboard_router.get("/pipeline-latency")
+async def get_pipeline_latency(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    db: Session = Depends(get_db)
+):
+    """Get p50/p95/p99 duration per pipeline stage over the last N hours"""
+    try:
+        since = datetime.now() - timedelta(hours=hours)
+        duration = PipelineStageTiming.duration_ms
         
-        trends = []
+        # Percentiles are computed by Postgres in a single grouped query
+        rows = db.query(
+            PipelineStageTiming.stage,
+            func.count(PipelineStageTiming.id),
+            func.percentile_cont(0.5).within_group(duration),
+            func.percentile_cont(0.95).within_group(duration),
+            func.percentile_cont(0.99).within_group(duration),
+            func.max(duration)
+        ).filter(
+            PipelineStageTiming.completed_at >= since
+        ).group_by(PipelineStageTiming.stage).all()
         
-        for i in range(7):
-            current_date = start_date + timedelta(days=i)
-            next_date = current_date + timedelta(days=1)
-            
-            # Get average score for this day
-            avg_score_result = db.query(func.avg(ScoringResult.score)).filter(
-                ScoringResult.created_at >= current_date,
-                ScoringResult.created_at < next_date
-            ).scalar()
-            
-            # Get total submissions for this day
-            total_submissions = db.query(ScoringResult).filter(
-                ScoringResult.created_at >= current_date,
-                ScoringResult.created_at < next_date
-            ).count()
-            
-            if avg_score_result and total_submissions > 0:
-                trends.append({
-                    "date": current_date.strftime("%Y-%m-%d"),
-                    "average_score": round(avg_score_result, 1),
-                    "total_submissions": total_submissions
-                })
+        by_stage = {row[0]: row for row in rows}
+        stages = []
+        for stage in PIPELINE_STAGES:
+            row = by_stage.get(stage)
+            stages.append({
+                "stage": stage,
+                "count": row[1] if row else 0,
+                "p50_ms": round(row[2], 1) if row else None,
+                "p95_ms": round(row[3], 1) if row else None,
+                "p99_ms": round(row[4], 1) if row else None,
+                "max_ms": row[5] if row else None
+            })
         
         return {
-            "distribution": distribution,
-            "trends": trends
+            "window_hours": hours,
+            "stages": stages
         }
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching scoring stats: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching pipeline latency: {str(e)}")
+
+
+@dashboard_router.get("/scheduled-tasks")
+async def get_scheduled_task_runs(
+    task_name: str = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Get recent scheduled task runs, newest first"""
+    try:
+        query = db.query(ScheduledTaskRun)
+        if task_name:
+            query = query.filter(ScheduledTaskRun.task_name == task_name)
+        runs = query.order_by(ScheduledTaskRun.started_at.desc()).limit(limit).all()
+        
+        return [
+            {
+                "id": str(run.id),
+                "task_name": run.task_name,
+                "node": run.node,
+                "status": run.status,
+                "started_at": run.started_at,
+                "finished_at": run.finished_at,
+                "duration_ms": run.duration_ms,
+                "result": run.result,
+                "error_message": run.error_message
+            }
+            for run in runs
+        ]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching scheduled task runs: {str(e)}")
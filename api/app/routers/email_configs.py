@@ -6,6 +6,7 @@ from app.auth import get_current_active_user
 from app.models.user import User
 from app.models.email_config import EmailConfig
 from app.schemas.email_config import EmailConfigCreate, EmailConfigUpdate, EmailConfigResponse
+from app.services.rollups import retract_mailbox
 
 router = APIRouter(prefix="/email-configs", tags=["email-configs"])
 
@@ -21,10 +22,16 @@ async def create_email_config(
         user_id=current_user.id,
         email_address=email_config.email_address,
         email_provider=email_config.email_provider,
+        ingest_protocol=email_config.ingest_protocol,
         pop3_host=email_config.pop3_host,
         pop3_port=email_config.pop3_port,
         pop3_username=email_config.pop3_username,
         pop3_password=email_config.pop3_password,
+        imap_host=email_config.imap_host,
+        imap_port=email_config.imap_port,
+        imap_username=email_config.imap_username,
+        imap_password=email_config.imap_password,
+        imap_folder=email_config.imap_folder,
         smtp_host=email_config.smtp_host,
         smtp_port=email_config.smtp_port,
         smtp_username=email_config.smtp_username,
@@ -119,6 +126,8 @@ async def delete_email_config(
             detail="Email configuration not found"
         )
     
+    # The mailbox's submissions go with it; take them out of the user's rollups first
+    retract_mailbox(db, db_email_config.id, current_user.id)
     db.delete(db_email_config)
     db.commit()
     
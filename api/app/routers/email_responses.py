@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.database import get_db
+from app.auth import get_current_active_user
+from app.models.user import User
+from app.models.email_config import EmailConfig
 from app.models.email_response import EmailResponse
-from app.schemas.email_response import EmailResponseResponse
+from app.models.resume_submission import ResumeSubmission
+from app.schemas.email_response import EmailResponseResponse, EmailResponseSendRequest, EmailResponseDelivery
+from app.services.pipeline import queue_email_responses
 
 router = APIRouter(prefix="/email-responses", tags=["email-responses"])
 
@@ -36,4 +42,25 @@ async def get_email_response(
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching email response: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching email response: {str(e)}")
+
+
+@router.post("/send", response_model=List[EmailResponseDelivery], status_code=status.HTTP_202_ACCEPTED)
+async def send_email_responses(
+    request: EmailResponseSendRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Queue stored responses to be sent or resent, now or at send_at.
+
+    The outbound mailer sends them within the SMTP rate limits and updates
+    each response's delivery_status.
+    """
+    owned = db.query(EmailResponse.id).join(ResumeSubmission).join(EmailConfig).filter(
+        EmailResponse.id.in_(request.email_response_ids),
+        EmailConfig.user_id == current_user.id
+    ).all()
+    if len(owned) != len(set(request.email_response_ids)):
+        raise HTTPException(status_code=404, detail="Email response not found")
+    
+    return await asyncio.to_thread(queue_email_responses, [str(row.id) for row in owned], request.send_at)
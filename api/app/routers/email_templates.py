@@ -1,15 +1,30 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.auth import get_current_active_user
 from app.models.user import User
 from app.models.email_template import EmailTemplate
 from app.schemas.email_template import EmailTemplateCreate, EmailTemplateUpdate, EmailTemplateResponse
+from app.services.template_engine import TemplateError, compile_template, get_template_engine
 
 router = APIRouter(prefix="/email-templates", tags=["email-templates"])
 
 
+def validate_templates(*sources: Optional[str]) -> None:
+    """Reject templates the engine cannot compile"""
+    for source in sources:
+        if source is None:
+            continue
+        try:
+            compile_template(source)
+        except TemplateError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Invalid template: {str(e)}"
+            )
+
+
 @router.post("/", response_model=EmailTemplateResponse)
 async def create_email_template(
     email_template: EmailTemplateCreate,
@@ -17,6 +32,7 @@ async def create_email_template(
     db: Session = Depends(get_db)
 ):
     """Create a new email template"""
+    validate_templates(email_template.subject_template, email_template.body_template)
     db_email_template = EmailTemplate(
         user_id=current_user.id,
         name=email_template.name,
@@ -29,6 +45,7 @@ async def create_email_template(
     db.add(db_email_template)
     db.commit()
     db.refresh(db_email_template)
+    get_template_engine().invalidate(current_user.id)
     
     return db_email_template
 
@@ -87,11 +104,13 @@ async def update_email_template(
         )
     
     update_data = email_template_update.dict(exclude_unset=True)
+    validate_templates(update_data.get('subject_template'), update_data.get('body_template'))
     for field, value in update_data.items():
         setattr(db_email_template, field, value)
     
     db.commit()
     db.refresh(db_email_template)
+    get_template_engine().invalidate(current_user.id)
     
     return db_email_template
 
@@ -116,5 +135,6 @@ async def delete_email_template(
     
     db.delete(db_email_template)
     db.commit()
+    get_template_engine().invalidate(current_user.id)
     
     return {"message": "Email template deleted successfully"} 
\ No newline at end of file
@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.database import get_db
 from app.auth import get_current_active_user
 from app.models.user import User
@@ -11,6 +11,7 @@ from app.schemas.job_description import (
     JobDescriptionResponse,
     JobKeywordCreate
 )
+from app.services.pagination import paginate
 
 router = APIRouter(prefix="/job-descriptions", tags=["job-descriptions"])
 
@@ -59,17 +60,24 @@ async def create_job_description(
 
 @router.get("/", response_model=List[JobDescriptionResponse])
 async def get_job_descriptions(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    is_active: Optional[bool] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all job descriptions for the current user"""
-    job_descriptions = db.query(JobDescription).filter(
+    """Get the current user's job descriptions, newest first.
+
+    Pass the X-Next-Cursor header of a page as cursor to get the next one.
+    """
+    query = db.query(JobDescription).filter(
         JobDescription.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    )
+    if is_active is not None:
+        query = query.filter(JobDescription.is_active == is_active)
     
-    return job_descriptions
+    return paginate(query, JobDescription, cursor, limit, response)
 
 
 @router.get("/{job_description_id}", response_model=JobDescriptionResponse)
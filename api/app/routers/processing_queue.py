@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.database import get_db
+from app.auth import get_current_active_user
+from app.models.user import User
+from app.models.processing_queue import ProcessingQueue
+from app.models.resume_submission import ResumeSubmission
+from app.models.email_config import EmailConfig
+from app.models.pipeline_stage_timing import PipelineStageTiming
+from app.schemas.processing_queue import ProcessingQueueResponse, TenantQueueStats
+from app.services.queue_backend import get_queue_backend
+from app.services.rollups import set_submission_status
+
+router = APIRouter(prefix="/processing-queue", tags=["processing-queue"])
+
+
+def _get_user_job(db: Session, job_id: str, user: User) -> ProcessingQueue:
+    """Get a queue job owned by the user or raise 404"""
+    job = db.query(ProcessingQueue).join(ResumeSubmission).join(EmailConfig).filter(
+        ProcessingQueue.id == job_id,
+        EmailConfig.user_id == user.id
+    ).first()
+    
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Queue job not found"
+        )
+    
+    return job
+
+
+@router.get("/dead-letter", response_model=List[ProcessingQueueResponse])
+async def get_dead_letter_jobs(
+    failure_class: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get dead-lettered jobs for the current user"""
+    query = db.query(ProcessingQueue).join(ResumeSubmission).join(EmailConfig).filter(
+        EmailConfig.user_id == current_user.id,
+        ProcessingQueue.status == "dead_letter"
+    )
+    if failure_class:
+        query = query.filter(ProcessingQueue.failure_class == failure_class)
+    
+    return query.order_by(ProcessingQueue.completed_at.desc()).offset(skip).limit(limit).all()
+
+
+@router.get("/tenants", response_model=List[TenantQueueStats])
+async def get_tenant_queue_stats(
+    hours: int = Query(1, ge=1, le=24 * 7),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get per-user queue backlog and recent queue wait times.
+
+    Admins see every user with queued or recently processed jobs; other
+    users see only their own row.
+    """
+    now = datetime.now(timezone.utc)
+    is_admin = current_user.role == "admin"
+    
+    ready = and_(ProcessingQueue.status == "queued", ProcessingQueue.scheduled_at <= now)
+    backlog_query = db.query(
+        ProcessingQueue.user_id,
+        func.count(ProcessingQueue.id).filter(ready),
+        func.count(ProcessingQueue.id).filter(
+            and_(ProcessingQueue.status == "queued", ProcessingQueue.scheduled_at > now)
+        ),
+        func.count(ProcessingQueue.id).filter(ProcessingQueue.status == "processing"),
+        func.min(ProcessingQueue.scheduled_at).filter(ready)
+    ).filter(ProcessingQueue.status.in_(["queued", "processing"]))
+    if not is_admin:
+        backlog_query = backlog_query.filter(ProcessingQueue.user_id == current_user.id)
+    backlog = {row[0]: row for row in backlog_query.group_by(ProcessingQueue.user_id).all()}
+    
+    # Wait times come from the "queued" stage timing of recently started jobs
+    duration = PipelineStageTiming.duration_ms
+    waits_query = db.query(
+        EmailConfig.user_id,
+        func.count(PipelineStageTiming.id),
+        func.percentile_cont(0.5).within_group(duration),
+        func.percentile_cont(0.95).within_group(duration)
+    ).join(
+        ResumeSubmission, PipelineStageTiming.resume_submission_id == ResumeSubmission.id
+    ).join(
+        EmailConfig, ResumeSubmission.email_config_id == EmailConfig.id
+    ).filter(
+        PipelineStageTiming.stage == "queued",
+        PipelineStageTiming.completed_at >= now - timedelta(hours=hours)
+    )
+    if not is_admin:
+        waits_query = waits_query.filter(EmailConfig.user_id == current_user.id)
+    waits = {row[0]: row for row in waits_query.group_by(EmailConfig.user_id).all()}
+    
+    user_ids = [user_id for user_id in set(backlog) | set(waits) if user_id is not None]
+    users = {user.id: user for user in db.query(User).filter(User.id.in_(user_ids)).all()} if user_ids else {}
+    
+    stats = []
+    for user_id in set(backlog) | set(waits):
+        backlog_row = backlog.get(user_id)
+        waits_row = waits.get(user_id)
+        user = users.get(user_id)
+        oldest_ready = backlog_row[4] if backlog_row else None
+        stats.append(TenantQueueStats(
+            user_id=user_id,
+            email=user.email if user else None,
+            queue_weight=(user.queue_weight if user else None) or 1,
+            max_concurrent_jobs=user.max_concurrent_jobs if user else None,
+            ready=backlog_row[1] if backlog_row else 0,
+            delayed=backlog_row[2] if backlog_row else 0,
+            in_flight=backlog_row[3] if backlog_row else 0,
+            oldest_ready_wait_seconds=(now - oldest_ready).total_seconds() if oldest_ready else None,
+            started_in_window=waits_row[1] if waits_row else 0,
+            wait_p50_seconds=round(waits_row[2] / 1000, 1) if waits_row else None,
+            wait_p95_seconds=round(waits_row[3] / 1000, 1) if waits_row else None
+        ))
+    
+    return sorted(stats, key=lambda entry: entry.oldest_ready_wait_seconds or 0, reverse=True)
+
+
+@router.get("/{job_id}", response_model=ProcessingQueueResponse)
+async def get_queue_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get a specific queue job"""
+    return _get_user_job(db, job_id, current_user)
+
+
+@router.post("/{job_id}/requeue", response_model=ProcessingQueueResponse)
+async def requeue_job(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Put a dead-lettered or failed job back in the queue"""
+    job = _get_user_job(db, job_id, current_user)
+    
+    if job.status not in ["dead_letter", "failed"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only dead-lettered or failed jobs can be requeued (status is {job.status})"
+        )
+    
+    get_queue_backend().requeue(str(job.id))
+    set_submission_status(db, job.resume_submission, "pending")
+    db.commit()
+    db.refresh(job)
+    
+    return job
@@ -1,23 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from pathlib import Path
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Response, UploadFile, status
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 from app.database import get_db
 from app.auth import get_current_active_user
 from app.models.user import User
 from app.models.resume_submission import ResumeSubmission
 from app.models.email_config import EmailConfig
+from app.models.job_description import JobDescription
+from app.models.upload_batch import UploadBatch
 from app.schemas.resume_submission import ResumeSubmissionResponse, ResumeSubmissionCreate
+from app.schemas.upload_batch import UploadBatchResponse, UploadBatchProgressResponse
+from app.services.bulk_upload import BulkUploadProcessor
+from app.services.pagination import paginate
+from app.services.rollups import bump_daily_rollup, retract_submission
 
 router = APIRouter(prefix="/resume-submissions", tags=["resume-submissions"])
 
 
+def _collapse_onto_existing(db: Session, email_config_id, idempotency_key: str) -> Optional[ResumeSubmission]:
+    """Get the submission already created with an idempotency key, counting the repeat"""
+    existing = db.query(ResumeSubmission).filter(
+        ResumeSubmission.email_config_id == email_config_id,
+        ResumeSubmission.idempotency_key == idempotency_key
+    ).first()
+    if existing is not None:
+        existing.duplicate_count = (existing.duplicate_count or 0) + 1
+        db.commit()
+        db.refresh(existing)
+    return existing
+
+
+def _replay_upload_batch(db: Session, existing: UploadBatch) -> Optional[UploadBatch]:
+    """Get the batch to answer a repeated Idempotency-Key with, or None to store its files again.
+
+    A batch whose ingest failed is claimed for the retry, so the retry
+    stores its files; one still being stored is a conflict.
+    """
+    if existing.status == "failed":
+        claimed = db.query(UploadBatch).filter(
+            UploadBatch.id == existing.id,
+            UploadBatch.status == "failed"
+        ).update({'status': "uploading", 'error_message': None}, synchronize_session=False)
+        db.commit()
+        db.refresh(existing)
+        if claimed:
+            return None
+    if existing.status == "uploading":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload batch is still being stored"
+        )
+    return existing
+
+
+async def _ingest_upload_batch(db: Session, upload_batch: UploadBatch, files: List[UploadFile]) -> UploadBatch:
+    """Store the uploaded files into a batch claimed for ingest"""
+    # Uploads are spooled to temporary files by the multipart parser; copying
+    # them into storage is blocking I/O, so it runs off the event loop
+    # Only the base name of a client-supplied filename is used, as for zip entries
+    uploads = [(Path(upload.filename or "").name, upload.file) for upload in files]
+    try:
+        await asyncio.to_thread(
+            BulkUploadProcessor().ingest,
+            str(upload_batch.id), str(upload_batch.email_config_id), str(upload_batch.job_description_id), uploads
+        )
+    except Exception as e:
+        # The batch is left marked failed with the error
+        raise HTTPException(status_code=500, detail=f"Error storing upload batch: {str(e)}")
+    
+    db.refresh(upload_batch)
+    return upload_batch
+
+
 @router.post("/", response_model=ResumeSubmissionResponse)
 async def create_resume_submission(
     resume_submission: ResumeSubmissionCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Create a new resume submission"""
+    """Create a new resume submission.
+
+    A repeated request with the same Idempotency-Key returns the submission
+    created by the first one instead of creating another.
+    """
     # Verify email config belongs to current user
     email_config = db.query(EmailConfig).filter(
         EmailConfig.id == resume_submission.email_config_id,
@@ -30,6 +101,11 @@ async def create_resume_submission(
             detail="Email configuration not found"
         )
     
+    if idempotency_key:
+        existing = _collapse_onto_existing(db, email_config.id, idempotency_key)
+        if existing is not None:
+            return existing
+    
     db_resume_submission = ResumeSubmission(
         email_config_id=resume_submission.email_config_id,
         job_description_id=resume_submission.job_description_id,
@@ -41,29 +117,164 @@ async def create_resume_submission(
         attachment_filename=resume_submission.attachment_filename,
         attachment_path=resume_submission.attachment_path,
         file_size_bytes=resume_submission.file_size_bytes,
-        file_type=resume_submission.file_type
+        file_type=resume_submission.file_type,
+        idempotency_key=idempotency_key
     )
     
     db.add(db_resume_submission)
-    db.commit()
+    bump_daily_rollup(db, current_user.id, submissions=1)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request with the same key committed first
+        db.rollback()
+        existing = _collapse_onto_existing(db, email_config.id, idempotency_key) if idempotency_key else None
+        if existing is None:
+            raise
+        return existing
     db.refresh(db_resume_submission)
     
     return db_resume_submission
 
 
+@router.post("/bulk", response_model=UploadBatchResponse, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_upload_resume_submissions(
+    job_description_id: UUID = Form(...),
+    email_config_id: UUID = Form(...),
+    files: List[UploadFile] = File(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Upload resumes or zip archives of resumes for one job description.
+
+    A retried upload with the same Idempotency-Key returns the original
+    batch without storing the files again. If storing the original failed,
+    the retry stores its files into that batch; files the failed attempt
+    already stored are skipped.
+    """
+    if idempotency_key:
+        existing = db.query(UploadBatch).filter(
+            UploadBatch.user_id == current_user.id,
+            UploadBatch.idempotency_key == idempotency_key
+        ).first()
+        if existing is not None:
+            replayed = _replay_upload_batch(db, existing)
+            if replayed is not None:
+                return replayed
+            return await _ingest_upload_batch(db, existing, files)
+    
+    email_config = db.query(EmailConfig).filter(
+        EmailConfig.id == email_config_id,
+        EmailConfig.user_id == current_user.id
+    ).first()
+    
+    if not email_config:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Email configuration not found"
+        )
+    
+    job_description = db.query(JobDescription).filter(
+        JobDescription.id == job_description_id,
+        JobDescription.user_id == current_user.id
+    ).first()
+    
+    if not job_description:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job description not found"
+        )
+    
+    upload_batch = UploadBatch(
+        user_id=current_user.id,
+        email_config_id=email_config.id,
+        job_description_id=job_description.id,
+        status="uploading",
+        idempotency_key=idempotency_key
+    )
+    db.add(upload_batch)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing = db.query(UploadBatch).filter(
+            UploadBatch.user_id == current_user.id,
+            UploadBatch.idempotency_key == idempotency_key
+        ).first()
+        if existing is None:
+            raise
+        replayed = _replay_upload_batch(db, existing)
+        if replayed is not None:
+            return replayed
+        upload_batch = existing
+    db.refresh(upload_batch)
+    return await _ingest_upload_batch(db, upload_batch, files)
+
+
+@router.get("/batches/{batch_id}", response_model=UploadBatchProgressResponse)
+async def get_upload_batch(
+    batch_id: str,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get the upload result and processing progress of a batch"""
+    upload_batch = db.query(UploadBatch).filter(
+        UploadBatch.id == batch_id,
+        UploadBatch.user_id == current_user.id
+    ).first()
+    
+    if not upload_batch:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload batch not found"
+        )
+    
+    status_counts = dict(
+        db.query(ResumeSubmission.status, func.count(ResumeSubmission.id)).filter(
+            ResumeSubmission.upload_batch_id == upload_batch.id
+        ).group_by(ResumeSubmission.status).all()
+    )
+    processed_files = sum(
+        count for submission_status, count in status_counts.items()
+        if submission_status in ("completed", "failed", "parsed")
+    )
+    
+    batch_status = upload_batch.status
+    if batch_status == "queued" and processed_files >= upload_batch.accepted_files:
+        batch_status = "completed"
+    
+    return UploadBatchProgressResponse(
+        **UploadBatchResponse.model_validate(upload_batch).model_dump(exclude={"status"}),
+        status=batch_status,
+        status_counts=status_counts,
+        processed_files=processed_files
+    )
+
+
 @router.get("/", response_model=List[ResumeSubmissionResponse])
 async def get_resume_submissions(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    job_description_id: Optional[UUID] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all resume submissions for the current user"""
-    resume_submissions = db.query(ResumeSubmission).join(EmailConfig).filter(
+    """Get the current user's resume submissions, newest first.
+
+    Pass the X-Next-Cursor header of a page as cursor to get the next one.
+    """
+    query = db.query(ResumeSubmission).join(EmailConfig).filter(
         EmailConfig.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    )
+    if status_filter:
+        query = query.filter(ResumeSubmission.status == status_filter)
+    if job_description_id:
+        query = query.filter(ResumeSubmission.job_description_id == job_description_id)
     
-    return resume_submissions
+    return paginate(query, ResumeSubmission, cursor, limit, response)
 
 
 @router.get("/{resume_submission_id}", response_model=ResumeSubmissionResponse)
@@ -105,6 +316,7 @@ async def delete_resume_submission(
             detail="Resume submission not found"
         )
     
+    retract_submission(db, resume_submission, current_user.id)
     db.delete(resume_submission)
     db.commit()
     
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from uuid import UUID
 from app.database import get_db
 from app.auth import get_current_active_user
 from app.models.user import User
@@ -8,23 +9,40 @@ from app.models.scoring_result import ScoringResult
 from app.models.resume_submission import ResumeSubmission
 from app.models.email_config import EmailConfig
 from app.schemas.scoring_result import ScoringResultResponse
+from app.services.pagination import paginate
 
 router = APIRouter(prefix="/scoring-results", tags=["scoring-results"])
 
 
 @router.get("/", response_model=List[ScoringResultResponse])
 async def get_scoring_results(
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    recommendation: Optional[str] = None,
+    job_description_id: Optional[UUID] = None,
+    min_score: Optional[int] = Query(None, ge=0, le=100),
+    max_score: Optional[int] = Query(None, ge=0, le=100),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get all scoring results for the current user"""
-    scoring_results = db.query(ScoringResult).join(ResumeSubmission).join(EmailConfig).filter(
+    """Get the current user's scoring results, newest first.
+
+    Pass the X-Next-Cursor header of a page as cursor to get the next one.
+    """
+    query = db.query(ScoringResult).join(ResumeSubmission).join(EmailConfig).filter(
         EmailConfig.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    )
+    if recommendation:
+        query = query.filter(ScoringResult.recommendation == recommendation)
+    if job_description_id:
+        query = query.filter(ScoringResult.job_description_id == job_description_id)
+    if min_score is not None:
+        query = query.filter(ScoringResult.total_score >= min_score)
+    if max_score is not None:
+        query = query.filter(ScoringResult.total_score <= max_score)
     
-    return scoring_results
+    return paginate(query, ScoringResult, cursor, limit, response)
 
 
 @router.get("/{scoring_result_id}", response_model=ScoringResultResponse)
@@ -4,7 +4,7 @@ from typing import List
 from app.database import get_db
 from app.auth import get_current_active_user, get_password_hash
 from app.models.user import User
-from app.schemas.user import UserCreate, UserUpdate, UserResponse
+from app.schemas.user import UserCreate, UserUpdate, UserResponse, UserQueueShareUpdate
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -70,4 +70,43 @@ async def get_user(
             detail="User not found"
         )
     
-    return user 
\ No newline at end of file
+    return user
+
+
+@router.put("/{user_id}/queue-share", response_model=UserResponse)
+async def update_user_queue_share(
+    user_id: str,
+    queue_share: UserQueueShareUpdate,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Set a user's fair-share weight and concurrent job cap (admin only)"""
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if queue_share.queue_weight < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="queue_weight must be at least 1"
+        )
+    if queue_share.max_concurrent_jobs is not None and queue_share.max_concurrent_jobs < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="max_concurrent_jobs cannot be negative"
+        )
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    user.queue_weight = queue_share.queue_weight
+    user.max_concurrent_jobs = queue_share.max_concurrent_jobs
+    db.commit()
+    db.refresh(user)
+    return user
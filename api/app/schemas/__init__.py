@@ -1,15 +1,18 @@
-from .user import UserCreate, UserUpdate, UserResponse, UserLogin
+from .user import UserCreate, UserUpdate, UserResponse, UserLogin, UserQueueShareUpdate
 from .job_description import JobDescriptionCreate, JobDescriptionUpdate, JobDescriptionResponse
 from .resume_submission import ResumeSubmissionResponse, ResumeSubmissionCreate
 from .scoring_result import ScoringResultResponse
 from .email_config import EmailConfigCreate, EmailConfigUpdate, EmailConfigResponse
 from .email_template import EmailTemplateCreate, EmailTemplateUpdate, EmailTemplateResponse
+from .processing_queue import ProcessingQueueResponse, TenantQueueStats
+from .upload_batch import UploadBatchResponse, UploadBatchProgressResponse
 
 __all__ = [
     "UserCreate",
     "UserUpdate", 
     "UserResponse",
     "UserLogin",
+    "UserQueueShareUpdate",
     "JobDescriptionCreate",
     "JobDescriptionUpdate",
     "JobDescriptionResponse",
@@ -21,5 +24,9 @@ __all__ = [
     "EmailConfigResponse",
     "EmailTemplateCreate",
     "EmailTemplateUpdate",
-    "EmailTemplateResponse"
+    "EmailTemplateResponse",
+    "ProcessingQueueResponse",
+    "TenantQueueStats",
+    "UploadBatchResponse",
+    "UploadBatchProgressResponse"
 ] 
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 from uuid import UUID
 
@@ -7,10 +7,16 @@ from uuid import UUID
 class EmailConfigBase(BaseModel):
     email_address: EmailStr
     email_provider: str
+    ingest_protocol: Literal["pop3", "imap"] = "pop3"
     pop3_host: Optional[str] = None
     pop3_port: int = 995
     pop3_username: Optional[str] = None
     pop3_password: Optional[str] = None
+    imap_host: Optional[str] = None
+    imap_port: int = 993
+    imap_username: Optional[str] = None
+    imap_password: Optional[str] = None
+    imap_folder: str = "INBOX"
     smtp_host: Optional[str] = None
     smtp_port: int = 587
     smtp_username: Optional[str] = None
@@ -24,10 +30,16 @@ class EmailConfigCreate(EmailConfigBase):
 class EmailConfigUpdate(BaseModel):
     email_address: Optional[EmailStr] = None
     email_provider: Optional[str] = None
+    ingest_protocol: Optional[Literal["pop3", "imap"]] = None
     pop3_host: Optional[str] = None
     pop3_port: Optional[int] = None
     pop3_username: Optional[str] = None
     pop3_password: Optional[str] = None
+    imap_host: Optional[str] = None
+    imap_port: Optional[int] = None
+    imap_username: Optional[str] = None
+    imap_password: Optional[str] = None
+    imap_folder: Optional[str] = None
     smtp_host: Optional[str] = None
     smtp_port: Optional[int] = None
     smtp_username: Optional[str] = None
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 
@@ -14,8 +14,22 @@ class EmailResponseResponse(BaseModel):
     template_used: Optional[str] = None
     sent_at: Optional[datetime] = None
     delivery_status: Optional[str] = None
+    send_after: Optional[datetime] = None
+    attempts: Optional[int] = None
     error_message: Optional[str] = None
     created_at: datetime
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+class EmailResponseSendRequest(BaseModel):
+    email_response_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+    # Defaults to now; later times schedule the send
+    send_at: Optional[datetime] = None
+
+
+class EmailResponseDelivery(BaseModel):
+    id: UUID
+    delivery_status: Optional[str] = None
+    send_after: Optional[datetime] = None
+    error_message: Optional[str] = None
@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from uuid import UUID
+
+
+class ProcessingQueueResponse(BaseModel):
+    id: UUID
+    resume_submission_id: UUID
+    priority: int = 0
+    status: str
+    stage: Optional[str] = None
+    retry_count: int = 0
+    max_retries: int = 3
+    scheduled_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    error_message: Optional[str] = None
+    failure_class: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class TenantQueueStats(BaseModel):
+    user_id: Optional[UUID] = None
+    email: Optional[str] = None
+    queue_weight: int = 1
+    max_concurrent_jobs: Optional[int] = None
+    ready: int = 0
+    delayed: int = 0
+    in_flight: int = 0
+    oldest_ready_wait_seconds: Optional[float] = None
+    started_in_window: int = 0
+    wait_p50_seconds: Optional[float] = None
+    wait_p95_seconds: Optional[float] = None
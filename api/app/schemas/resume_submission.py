@@ -24,6 +24,8 @@ class ResumeSubmissionCreate(ResumeSubmissionBase):
 class ResumeSubmissionResponse(ResumeSubmissionBase):
     id: UUID
     email_config_id: UUID
+    candidate_email: Optional[EmailStr] = None
+    upload_batch_id: Optional[UUID] = None
     original_email_subject: Optional[str] = None
     original_email_body: Optional[str] = None
     attachment_filename: Optional[str] = None
@@ -31,6 +33,9 @@ class ResumeSubmissionResponse(ResumeSubmissionBase):
     file_size_bytes: Optional[int] = None
     file_type: Optional[str] = None
     status: str
+    pipeline_stage: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    duplicate_count: Optional[int] = 0
     processing_started_at: Optional[datetime] = None
     processing_completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
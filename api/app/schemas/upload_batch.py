@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+from uuid import UUID
+
+
+class UploadRejection(BaseModel):
+    filename: str
+    reason: str
+
+
+class UploadBatchResponse(BaseModel):
+    id: UUID
+    email_config_id: UUID
+    job_description_id: UUID
+    status: str
+    total_files: int = 0
+    accepted_files: int = 0
+    rejected_files: int = 0
+    rejections: List[UploadRejection] = []
+    error_message: Optional[str] = None
+    created_at: datetime
+    uploaded_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class UploadBatchProgressResponse(UploadBatchResponse):
+    status_counts: Dict[str, int] = {}
+    processed_files: int = 0
@@ -23,6 +23,11 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class UserQueueShareUpdate(BaseModel):
+    queue_weight: int = 1
+    max_concurrent_jobs: Optional[int] = None
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -31,6 +36,8 @@ class UserLogin(BaseModel):
 class UserResponse(UserBase):
     id: UUID
     is_active: bool
+    queue_weight: Optional[int] = None
+    max_concurrent_jobs: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     
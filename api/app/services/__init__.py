@@ -1,11 +1,14 @@
-from .resume_parser import ResumeParser
+from .resume_parser import ResumeParser, ResumeParseError
 from .llm_scorer import LLMScorer
 from .email_processor import EmailProcessor
 from .file_processor import FileProcessor
+from .pipeline import ResumePipeline
 
 __all__ = [
     "ResumeParser",
+    "ResumeParseError",
     "LLMScorer", 
     "EmailProcessor",
-    "FileProcessor"
+    "FileProcessor",
+    "ResumePipeline"
 ] 
\ No newline at end of file
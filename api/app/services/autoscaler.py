@@ -0,0 +1,193 @@
+import json
+import math
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from app.config import settings
+from app.services.queue_backend import JOB_STAGE_PARSE, JOB_STAGE_SCORE, QueueBackend, get_queue_backend
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "worker.py")
+
+
+class WorkerAutoscaler:
+    """Spawns and retires parse and score workers based on queue backlog"""
+
+    def __init__(self, queue_backend: Optional[QueueBackend] = None):
+        self.queue_backend = queue_backend or get_queue_backend()
+        self.bounds = {
+            JOB_STAGE_PARSE: (settings.autoscaler_parse_min_workers, settings.autoscaler_parse_max_workers),
+            JOB_STAGE_SCORE: (settings.autoscaler_score_min_workers, settings.autoscaler_score_max_workers)
+        }
+        self.workers: Dict[str, List[subprocess.Popen]] = {role: [] for role in self.bounds}
+        # Retired workers finishing in-flight jobs, with their kill deadline
+        self.draining: List[Dict[str, Any]] = []
+        self.last_scaled: Dict[str, float] = {role: 0.0 for role in self.bounds}
+        self.last_metrics: Dict[str, Dict[str, Any]] = {}
+        self.decisions: deque = deque(maxlen=100)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def desired_workers(self, role: str, metrics: Dict[str, Any]) -> int:
+        """Get the worker count a stage's backlog calls for"""
+        min_workers, max_workers = self.bounds[role]
+        desired = math.ceil(metrics['ready'] / settings.autoscaler_jobs_per_worker)
+        # A stale head of queue means the current workers are not keeping up,
+        # even when the backlog is short
+        if metrics['oldest_ready_age_seconds'] > settings.autoscaler_max_job_age:
+            desired = max(desired, len(self.workers[role]) + 1)
+        return max(min_workers, min(max_workers, desired))
+
+    def _spawn(self, role: str) -> subprocess.Popen:
+        """Start a worker process for a role"""
+        process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, "--role", role],
+            cwd=os.path.dirname(WORKER_SCRIPT)
+        )
+        self.workers[role].append(process)
+        return process
+
+    def _retire(self, role: str) -> subprocess.Popen:
+        """Ask the newest worker for a role to drain and exit"""
+        process = self.workers[role].pop()
+        process.send_signal(signal.SIGTERM)
+        self.draining.append({
+            'role': role,
+            'process': process,
+            'deadline': time.monotonic() + settings.worker_drain_timeout
+        })
+        return process
+
+    def _reap(self) -> None:
+        """Forget exited workers and kill drains that overran their timeout"""
+        for role, processes in self.workers.items():
+            for process in [p for p in processes if p.poll() is not None]:
+                processes.remove(process)
+                self._record(role, "exited", None, f"worker {process.pid} exited with {process.returncode}")
+
+        now = time.monotonic()
+        still_draining = []
+        for entry in self.draining:
+            process = entry['process']
+            if process.poll() is not None:
+                continue
+            if now >= entry['deadline']:
+                process.kill()
+                process.wait()
+                self._record(entry['role'], "killed", None, f"worker {process.pid} did not drain in time")
+                continue
+            still_draining.append(entry)
+        self.draining = still_draining
+
+    def _record(self, role: str, action: str, metrics: Optional[Dict[str, Any]], reason: str) -> None:
+        """Keep a scaling decision for the metrics endpoint"""
+        decision = {
+            'at': datetime.now(timezone.utc).isoformat(),
+            'role': role,
+            'action': action,
+            'workers': len(self.workers[role]),
+            'ready': metrics['ready'] if metrics else None,
+            'oldest_ready_age_seconds': metrics['oldest_ready_age_seconds'] if metrics else None,
+            'reason': reason
+        }
+        self.decisions.append(decision)
+        print(f"Autoscaler: {role} {action} ({reason})")
+
+    def scale_role(self, role: str, metrics: Dict[str, Any]) -> None:
+        """Move a role's worker count one step toward the desired count"""
+        current = len(self.workers[role])
+        min_workers, _ = self.bounds[role]
+        desired = self.desired_workers(role, metrics)
+        since_last = time.monotonic() - self.last_scaled[role]
+
+        # Bounds are enforced immediately; everything else respects cooldowns
+        if current < min_workers or (desired > current and since_last >= settings.autoscaler_scale_up_cooldown):
+            count = desired - current
+            for _ in range(count):
+                self._spawn(role)
+            self.last_scaled[role] = time.monotonic()
+            self._record(role, "scale_up", metrics, f"{current} -> {desired} workers")
+        elif desired < current and since_last >= settings.autoscaler_scale_down_cooldown:
+            # Retire one worker at a time so a brief lull does not drop capacity
+            self._retire(role)
+            self.last_scaled[role] = time.monotonic()
+            self._record(role, "scale_down", metrics, f"{current} -> {current - 1} workers")
+
+    def tick(self) -> None:
+        """Run one reconcile pass over all roles"""
+        with self._lock:
+            self._reap()
+            metrics = self.queue_backend.stage_metrics()
+            self.last_metrics = metrics
+            for role in self.bounds:
+                self.scale_role(role, metrics.get(role, {'ready': 0, 'oldest_ready_age_seconds': 0.0}))
+
+    def run(self) -> None:
+        """Reconcile worker counts until stopped"""
+        while not self._stopping.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"Autoscaler tick failed: {e}")
+            self._stopping.wait(settings.autoscaler_interval)
+
+    def request_shutdown(self) -> None:
+        """Ask run() to return after the current tick; safe to call from a signal handler"""
+        self._stopping.set()
+
+    def stop(self) -> None:
+        """Drain every worker and wait for them to exit"""
+        self._stopping.set()
+        with self._lock:
+            for role in self.bounds:
+                while self.workers[role]:
+                    self._retire(role)
+            while self.draining:
+                self._reap()
+                time.sleep(1)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get current worker counts, queue metrics and recent decisions"""
+        return {
+            'workers': {
+                role: {
+                    'running': len(processes),
+                    'min': self.bounds[role][0],
+                    'max': self.bounds[role][1],
+                    'pids': [process.pid for process in processes]
+                }
+                for role, processes in self.workers.items()
+            },
+            'draining': [
+                {'role': entry['role'], 'pid': entry['process'].pid} for entry in self.draining
+            ],
+            'queue': self.last_metrics,
+            'decisions': list(self.decisions)
+        }
+
+    def serve_metrics(self, port: int) -> ThreadingHTTPServer:
+        """Serve get_metrics() as JSON on a background thread"""
+        autoscaler = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = json.dumps(autoscaler.get_metrics(), default=str).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, TextIO
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job_description import JobDescription
+from app.services.llm_scorer import FALLBACK_PROMPT, LLMScorer
+from app.services.pipeline import job_description_to_dict, parse_resume_file
+
+
+BATCH_SUPPORTED_TYPES = ['pdf', 'doc', 'docx']
+
+# Result fields written to each JSONL line; the prompt is left out since it
+# repeats the whole resume
+BATCH_RESULT_EXCLUDE = {'llm_prompt_used'}
+
+
+def load_job_description(source: str) -> Dict[str, Any]:
+    """Load scorer input for a job description from a JSON file or a database id"""
+    path = Path(source)
+    if path.is_file():
+        with open(path) as f:
+            data = json.load(f)
+        if not data.get('title') or not data.get('description'):
+            raise ValueError(f"{source}: job description needs a title and a description")
+        data.setdefault('skills_required', [])
+        return data
+
+    db = SessionLocal()
+    try:
+        job_description = db.query(JobDescription).filter(JobDescription.id == source).first()
+        if job_description is None:
+            raise ValueError(f"Job description not found: {source}")
+        return job_description_to_dict(job_description)
+    finally:
+        db.close()
+
+
+def find_resume_files(directory: str) -> List[Path]:
+    """List resume files under a directory, in a stable order"""
+    root = Path(directory)
+    if not root.is_dir():
+        raise ValueError(f"Not a directory: {directory}")
+    return sorted(
+        path for path in root.rglob("*")
+        if path.is_file() and path.suffix.lower().lstrip('.') in BATCH_SUPPORTED_TYPES
+    )
+
+
+class BatchScorer:
+    """Scores a directory of resume files offline, without the API or queue.
+
+    Files are parsed in a process pool and scored with bounded concurrency.
+    Each result is appended to a JSONL file as soon as it is ready, and the
+    file is then recorded in a checkpoint, so an interrupted run can be
+    started again and only scores what is left. Failed files are written to
+    the output but are retried on the next run. When scoring with the LLM,
+    rate limits and LLM errors count as failures rather than being scored
+    by the rule-based fallback, and each result records its scorer.
+    """
+
+    def __init__(self, job_description: Dict[str, Any], output_path: str,
+                 checkpoint_path: Optional[str] = None, parse_workers: Optional[int] = None,
+                 score_concurrency: Optional[int] = None, use_llm: bool = True):
+        self.job_description = job_description
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or f"{output_path}.checkpoint"
+        self.parse_workers = parse_workers or settings.pipeline_parse_workers
+        self.score_concurrency = score_concurrency or settings.pipeline_score_concurrency
+        self.llm_scorer = LLMScorer(use_llm=use_llm)
+        self.scorer = 'llm' if use_llm else 'rule_based'
+        self.stats = {
+            'total': 0,
+            'skipped': 0,
+            'scored': 0,
+            'failed': 0,
+            'parse_seconds': 0.0,
+            'score_seconds': 0.0
+        }
+        self._output: Optional[TextIO] = None
+        self._checkpoint: Optional[TextIO] = None
+
+    def load_checkpoint(self) -> Set[str]:
+        """Get the files a previous run already scored"""
+        done = set()
+        if not os.path.exists(self.checkpoint_path):
+            return done
+        with open(self.checkpoint_path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn last line from an interrupted run
+                    continue
+                if entry.get('status') == 'scored':
+                    done.add(entry['file'])
+                else:
+                    done.discard(entry['file'])
+        return done
+
+    def _record(self, result: Dict[str, Any]) -> None:
+        """Append a result to the output, then mark its file in the checkpoint"""
+        self._output.write(json.dumps(result, default=str) + "\n")
+        self._output.flush()
+        self._checkpoint.write(json.dumps({'file': result['file'], 'status': result['status']}) + "\n")
+        self._checkpoint.flush()
+        self.stats[result['status']] += 1
+
+    def _failure(self, file: str, stage: str, error: Exception) -> Dict[str, Any]:
+        """Build the output line for a file that could not be scored"""
+        return {'file': file, 'status': 'failed', 'stage': stage, 'error': str(error)}
+
+    async def _parse_worker(self, pool: ProcessPoolExecutor, paths: asyncio.Queue,
+                            parsed: asyncio.Queue, root: Path) -> None:
+        """Parse files from the path queue and pass them on for scoring"""
+        loop = asyncio.get_running_loop()
+        while True:
+            path = await paths.get()
+            try:
+                if path is None:
+                    return
+                file = str(path.relative_to(root))
+                started = time.perf_counter()
+                try:
+                    resume_data = await loop.run_in_executor(
+                        pool, parse_resume_file, str(path), path.suffix.lower().lstrip('.')
+                    )
+                except Exception as e:
+                    self._record(self._failure(file, 'parse', e))
+                    continue
+                finally:
+                    self.stats['parse_seconds'] += time.perf_counter() - started
+                await parsed.put((file, resume_data))
+            finally:
+                paths.task_done()
+
+    async def _score_worker(self, parsed: asyncio.Queue) -> None:
+        """Score parsed resumes and write their results"""
+        while True:
+            item = await parsed.get()
+            try:
+                if item is None:
+                    return
+                file, resume_data = item
+                started = time.perf_counter()
+                try:
+                    scoring = await asyncio.to_thread(
+                        self.llm_scorer.score_resume, resume_data, self.job_description,
+                        raise_on_rate_limit=True
+                    )
+                except Exception as e:
+                    self._record(self._failure(file, 'score', e))
+                    continue
+                finally:
+                    self.stats['score_seconds'] += time.perf_counter() - started
+                scorer = 'rule_based' if scoring.get('llm_prompt_used') == FALLBACK_PROMPT else 'llm'
+                if scorer != self.scorer:
+                    # The LLM call failed and the rule-based score came back instead
+                    self._record(self._failure(file, 'score', RuntimeError(scoring.get('llm_analysis_text'))))
+                    continue
+                self._record({
+                    'file': file,
+                    'status': 'scored',
+                    'scorer': scorer,
+                    'candidate_name': resume_data.get('extracted_name'),
+                    'candidate_email': resume_data.get('extracted_email'),
+                    'skills': resume_data.get('extracted_skills', []),
+                    'years_of_experience': resume_data.get('years_of_experience'),
+                    'total_score': scoring.get('total_score'),
+                    'recommendation': scoring.get('recommendation'),
+                    'scoring': {
+                        key: value for key, value in scoring.items() if key not in BATCH_RESULT_EXCLUDE
+                    }
+                })
+            finally:
+                parsed.task_done()
+
+    async def run(self, directory: str) -> Dict[str, Any]:
+        """Score every file in a directory that the checkpoint doesn't cover"""
+        root = Path(directory)
+        files = find_resume_files(directory)
+        done = self.load_checkpoint()
+        pending = [path for path in files if str(path.relative_to(root)) not in done]
+        self.stats['total'] = len(files)
+        self.stats['skipped'] = len(files) - len(pending)
+
+        # Both queues are bounded so parsed resumes never pile up in memory
+        # ahead of a slow scorer
+        paths: asyncio.Queue = asyncio.Queue(maxsize=self.parse_workers * 2)
+        parsed: asyncio.Queue = asyncio.Queue(maxsize=self.score_concurrency * 2)
+        started = time.perf_counter()
+
+        with open(self.output_path, 'a') as output, open(self.checkpoint_path, 'a') as checkpoint, \
+                ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+            self._output = output
+            self._checkpoint = checkpoint
+            parsers = [
+                asyncio.create_task(self._parse_worker(pool, paths, parsed, root))
+                for _ in range(self.parse_workers)
+            ]
+            scorers = [
+                asyncio.create_task(self._score_worker(parsed))
+                for _ in range(self.score_concurrency)
+            ]
+            try:
+                for path in pending:
+                    await paths.put(path)
+                for _ in parsers:
+                    await paths.put(None)
+                await asyncio.gather(*parsers)
+                for _ in scorers:
+                    await parsed.put(None)
+                await asyncio.gather(*scorers)
+            finally:
+                for task in parsers + scorers:
+                    task.cancel()
+                await asyncio.gather(*parsers, *scorers, return_exceptions=True)
+
+        return self.get_report(time.perf_counter() - started)
+
+    def get_report(self, elapsed_seconds: float) -> Dict[str, Any]:
+        """Get throughput figures for a finished run"""
+        processed = self.stats['scored'] + self.stats['failed']
+        return {
+            **self.stats,
+            'processed': processed,
+            'elapsed_seconds': round(elapsed_seconds, 2),
+            'files_per_second': round(processed / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0,
+            'avg_parse_ms': round(self.stats['parse_seconds'] * 1000 / processed, 1) if processed else 0.0,
+            'avg_score_ms': round(self.stats['score_seconds'] * 1000 / self.stats['scored'], 1)
+            if self.stats['scored'] else 0.0,
+            'parse_seconds': round(self.stats['parse_seconds'], 2),
+            'score_seconds': round(self.stats['score_seconds'], 2)
+        }
@@ -0,0 +1,240 @@
+import hashlib
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+import uuid
+from sqlalchemy import insert
+from app.config import settings
+from app.database import SessionLocal
+from app.models.pipeline_stage_timing import PipelineStageTiming
+from app.models.processing_queue import ProcessingQueue
+from app.models.resume_submission import ResumeSubmission
+from app.models.upload_batch import UploadBatch
+from app.services.file_processor import FileProcessor
+from app.services.pipeline import link_stored_file
+from app.services.queue_backend import QueueBackend, get_queue_backend
+from app.services.rollups import bump_daily_rollup, email_config_owner
+
+
+def upload_idempotency_key(batch_id: str, filename: str, file_hash: str) -> str:
+    """Derive a submission key from the batch, the file's name and its sha256"""
+    return hashlib.sha256(f"{batch_id}\n{filename}\n{file_hash}".encode()).hexdigest()
+
+
+class BulkUploadProcessor:
+    """Stores uploaded resumes and archives as submissions of an upload batch"""
+
+    def __init__(self, queue_backend: Optional[QueueBackend] = None):
+        self.file_processor = FileProcessor()
+        self.queue_backend = queue_backend or get_queue_backend()
+        self.max_files = settings.bulk_upload_max_files
+        self.insert_batch_size = settings.bulk_upload_insert_batch_size
+
+    def iter_files(self, uploads: List[Tuple[str, BinaryIO]]) -> Iterator[Tuple[str, Optional[BinaryIO], Optional[str]]]:
+        """Yield (filename, stream, rejection reason) for every uploaded file.
+
+        Zip archives are expanded entry by entry; each entry is decompressed
+        as it is read, so the archive is never loaded into memory.
+        """
+        for filename, stream in uploads:
+            if Path(filename).suffix.lower() != ".zip":
+                yield filename, stream, None
+                continue
+
+            try:
+                archive = zipfile.ZipFile(stream)
+            except zipfile.BadZipFile:
+                yield filename, None, "Not a valid zip archive"
+                continue
+
+            with archive:
+                for info in archive.infolist():
+                    entry_name = Path(info.filename).name
+                    if info.is_dir() or info.filename.startswith("__MACOSX/") or entry_name.startswith("."):
+                        continue
+                    if info.file_size > self.file_processor.max_file_size:
+                        yield entry_name, None, f"File size exceeds maximum limit of {self.file_processor.max_file_size} bytes"
+                        continue
+                    with archive.open(info) as entry:
+                        yield entry_name, entry, None
+
+    def ingest(self, batch_id: str, email_config_id: str, job_description_id: str,
+               uploads: List[Tuple[str, BinaryIO]]) -> Dict[str, Any]:
+        """Store every file of a batch and queue the accepted ones for processing.
+
+        If storing fails part way, the batch is marked failed with the error
+        before it is raised; chunks inserted before the failure stay queued.
+        Ingesting the same files into the batch again skips the ones already
+        stored, so a failed batch can be retried.
+        """
+        rejections = []
+        pending = []
+        total = accepted = 0
+
+        try:
+            for filename, stream, reason in self.iter_files(uploads):
+                total += 1
+                if reason is None and accepted >= self.max_files:
+                    reason = f"Batch is limited to {self.max_files} files"
+                if reason is None:
+                    stored_at = datetime.now(timezone.utc)
+                    file_type = self.file_processor.get_file_extension(filename)
+                    success, reason, saved = self.file_processor.save_stream(stream, filename, file_type)
+                    if success:
+                        reason = None
+                        accepted += 1
+                        pending.append({
+                            'id': uuid.uuid4(),
+                            'email_config_id': email_config_id,
+                            'job_description_id': job_description_id,
+                            'upload_batch_id': batch_id,
+                            'attachment_filename': filename[:255],
+                            'attachment_path': saved['path'],
+                            'file_size_bytes': saved['size'],
+                            'file_type': file_type,
+                            'status': "pending",
+                            'pipeline_stage': "stored",
+                            'idempotency_key': upload_idempotency_key(batch_id, filename, saved['sha256']),
+                            'stored_at': stored_at,
+                            'sha256': saved['sha256']
+                        })
+                if reason is not None:
+                    rejections.append({'filename': filename, 'reason': reason})
+
+                if len(pending) >= self.insert_batch_size:
+                    rows, pending = pending, []
+                    self._insert_submissions(rows)
+
+            if pending:
+                rows, pending = pending, []
+                self._insert_submissions(rows)
+        except Exception as e:
+            for row in pending:
+                self.file_processor.delete_file(row['attachment_path'])
+            self._update_batch(
+                batch_id,
+                status="failed",
+                error_message=f"Error storing files: {str(e)}",
+                uploaded_at=datetime.now(timezone.utc)
+            )
+            raise
+
+        summary = {
+            'status': "queued" if accepted else "rejected",
+            'total_files': total,
+            'accepted_files': accepted,
+            'rejected_files': len(rejections),
+            'rejections': rejections,
+            'uploaded_at': datetime.now(timezone.utc)
+        }
+        self._update_batch(batch_id, error_message=None, **summary)
+        return summary
+
+    def _update_batch(self, batch_id: str, **values: Any) -> None:
+        """Update the upload_batches row of a batch"""
+        db = SessionLocal()
+        try:
+            db.query(UploadBatch).filter(UploadBatch.id == batch_id).update(values, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _insert_submissions(self, rows: List[Dict[str, Any]]) -> None:
+        """Bulk insert submissions with their stored timings and queue jobs in one transaction.
+
+        Files stored by an earlier attempt at the batch are dropped, but
+        their submissions are queued if that attempt never got them into
+        the queue. Each new file is linked to the stored copy of its
+        content, like mailbox attachments are, so a CV already stored is not
+        kept twice and its earlier parse is reused.
+        """
+        email_config_id = rows[0]['email_config_id']
+        db = SessionLocal()
+        submissions = []
+        try:
+            stored_before = dict(db.query(ResumeSubmission.idempotency_key, ResumeSubmission.id).filter(
+                ResumeSubmission.email_config_id == email_config_id,
+                ResumeSubmission.idempotency_key.in_([row['idempotency_key'] for row in rows])
+            ).all())
+            unqueued, unpublished = self._stranded_jobs(db, list(stored_before.values()))
+            keys = set(stored_before)
+            # Stored files are locked in hash order, so concurrent batches sharing files can't deadlock
+            for row in sorted(rows, key=lambda row: row['sha256']):
+                # Also collapses a file repeated under the same name within the batch
+                if row['idempotency_key'] in keys:
+                    continue
+                keys.add(row['idempotency_key'])
+                stored_file_id, stored_path = link_stored_file(db, {
+                    'path': row['attachment_path'],
+                    'size': row['file_size_bytes'],
+                    'sha256': row['sha256']
+                }, row['file_type'])
+                submissions.append({
+                    **{key: value for key, value in row.items() if key not in ('stored_at', 'sha256')},
+                    'stored_file_id': stored_file_id,
+                    'attachment_path': stored_path
+                })
+
+            if submissions:
+                completed_at = datetime.now(timezone.utc)
+                stored_at = {row['id']: row['stored_at'] for row in rows}
+                db.execute(insert(ResumeSubmission), submissions)
+                # Every row of a batch comes from the same mailbox
+                bump_daily_rollup(db, email_config_owner(email_config_id), submissions=len(submissions))
+                db.execute(insert(PipelineStageTiming), [
+                    {
+                        'id': uuid.uuid4(),
+                        'resume_submission_id': submission['id'],
+                        'stage': "stored",
+                        'started_at': stored_at[submission['id']],
+                        'completed_at': completed_at,
+                        'duration_ms': int((completed_at - stored_at[submission['id']]).total_seconds() * 1000)
+                    }
+                    for submission in submissions
+                ])
+            jobs = self.queue_backend.add_jobs(db, [submission['id'] for submission in submissions] + unqueued)
+            db.commit()
+        except Exception:
+            db.rollback()
+            for row in rows:
+                self.file_processor.delete_file(row['attachment_path'])
+            raise
+        finally:
+            db.close()
+
+        # Spooled copies of files stored before, or of content already stored, are not kept
+        kept_paths = {submission['attachment_path'] for submission in submissions}
+        for row in rows:
+            if row['attachment_path'] not in kept_paths:
+                self.file_processor.delete_file(row['attachment_path'])
+
+        self.queue_backend.publish(jobs + unpublished)
+
+    @staticmethod
+    def _stranded_jobs(db, submission_ids: List[Any]) -> Tuple[List[Any], List[Dict[str, Any]]]:
+        """Find which submissions stored by an earlier attempt still need queueing.
+
+        Returns the ids of those with no queue job at all, and the queued
+        jobs of the rest, to publish again in case they never reached the
+        queue backend.
+        """
+        if not submission_ids:
+            return [], []
+        jobs = db.query(ProcessingQueue).filter(ProcessingQueue.resume_submission_id.in_(submission_ids)).all()
+        queued = {job.resume_submission_id for job in jobs}
+        unqueued = [submission_id for submission_id in submission_ids if submission_id not in queued]
+        unpublished = [
+            {
+                'id': job.id,
+                'resume_submission_id': job.resume_submission_id,
+                'user_id': job.user_id,
+                'priority': job.priority,
+                'stage': job.stage,
+                'retry_count': job.retry_count,
+                'max_retries': job.max_retries,
+                'scheduled_at': job.scheduled_at
+            }
+            for job in jobs if job.status == "queued"
+        ]
+        return unqueued, unpublished
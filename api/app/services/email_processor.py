@@ -1,173 +1,408 @@
 import smtplib
 import poplib
+import imaplib
+import base64
+import quopri
+import socket
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email import message_from_bytes
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from email.header import decode_header, make_header
+from email.utils import decode_rfc2231
+from urllib.parse import unquote
+from pathlib import Path
+from typing import Iterator, List, Dict, Any, Optional, Set, Tuple
 from app.config import settings
+from app.services.file_processor import FileProcessor
+from app.services.mail_classifier import CLASSIFIER_HEADERS, MAIL_APPLICATION, get_mail_classifier
+from app.services.mime_stream import StreamingMimeParser
+from app.services.smtp_pool import get_smtp_pool, resolve_smtp_settings
+
+
+# Attachment types worth downloading from IMAP; other parts are never fetched
+RESUME_ATTACHMENT_TYPES = ['pdf', 'doc', 'docx']
+
+IMAP_HEADER_FIELDS = f"BODY.PEEK[HEADER.FIELDS (SUBJECT FROM TO DATE MESSAGE-ID {' '.join(CLASSIFIER_HEADERS)})]"
 
 
 class EmailProcessor:
     """Service for processing emails (POP3 and SMTP)"""
     
     def __init__(self):
-        self.smtp_host = settings.smtp_host
-        self.smtp_port = settings.smtp_port
-        self.smtp_username = settings.smtp_username
-        self.smtp_password = settings.smtp_password
+        self.smtp_pool = get_smtp_pool()
+        self.file_processor = FileProcessor()
+        self.mail_classifier = get_mail_classifier()
     
-    def send_email(self, to_email: str, subject: str, body: str, from_email: Optional[str] = None) -> bool:
-        """Send an email using SMTP"""
-        try:
+    def send_email(self, to_email: str, subject: str, body: str, from_email: Optional[str] = None,
+                   email_config: Optional[Dict[str, Any]] = None) -> bool:
+        """Send an email over a pooled SMTP session for the mailbox, or the global account"""
+        result = self.send_many(
+            [{'to_email': to_email, 'subject': subject, 'body': body, 'from_email': from_email}], email_config
+        )[0]
+        if result['status'] != "sent":
+            print(f"Error sending email: {result['error']}")
+        return result['status'] == "sent"
+    
+    def send_many(self, emails: List[Dict[str, Any]],
+                  email_config: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Send emails one after another over a single pooled SMTP session.
+
+        Each email is a dict with to_email, subject, body and optionally
+        from_email. Returns {'status': "sent" or "failed", 'error',
+        'permanent'} for each email, in order; one refused recipient doesn't
+        stop the rest.
+        """
+        smtp_settings = resolve_smtp_settings(email_config)
+        sender = smtp_settings['username']
+        messages = []
+        for email_data in emails:
             msg = MIMEMultipart()
-            msg['From'] = from_email or self.smtp_username
-            msg['To'] = to_email
-            msg['Subject'] = subject
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-            server.starttls()
-            server.login(self.smtp_username, self.smtp_password)
-            
-            text = msg.as_string()
-            server.sendmail(self.smtp_username, to_email, text)
-            server.quit()
-            
-            return True
-            
-        except Exception as e:
-            print(f"Error sending email: {str(e)}")
-            return False
+            msg['From'] = email_data.get('from_email') or sender
+            msg['To'] = email_data['to_email']
+            msg['Subject'] = email_data['subject']
+            msg.attach(MIMEText(email_data['body'], 'plain'))
+            messages.append((msg, sender, [email_data['to_email']]))
+        return self.smtp_pool.send_many(smtp_settings, messages)
     
-    def fetch_emails(self, email_config: Dict[str, Any], last_fetch_time: Optional[datetime] = None) -> List[Dict[str, Any]]:
-        """Fetch new emails using POP3"""
+    def fetch_emails(self, email_config: Dict[str, Any], skip_uids: Optional[Set[str]] = None,
+                     batch_size: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Fetch up to batch_size messages whose POP3 UIDL is not in skip_uids.
+
+        Each message's headers are read with TOP first and classified, and
+        only likely applications are downloaded in full. The
+        rest is parsed as RETR streams in, with resume attachments spooled
+        to the upload directory; each attachment carries its 'path', 'size'
+        and 'sha256' rather than its content. Returns
+        the parsed emails (each with its 'uid'), the uids that were screened
+        out or could not be parsed, every uid on the server (None if the
+        listing failed), how many unseen messages are left for another batch
+        and the error that ended the session, if any. timeout applies to
+        each socket operation.
+        """
+        skip_uids = skip_uids or set()
+        batch_size = batch_size or settings.email_fetch_batch_size
+        result = {'emails': [], 'skipped_uids': [], 'server_uids': None, 'remaining': 0, 'error': None}
+        server = None
         try:
-            # Connect to POP3 server
-            server = poplib.POP3_SSL(
-                email_config['pop3_host'],
-                email_config['pop3_port']
-            )
+            server = self.open_pop3(email_config, timeout)
             
-            # Authenticate
-            server.user(email_config['pop3_username'])
-            server.pass_(email_config['pop3_password'])
+            # Message numbers are only valid for this session; uids are stable
+            messages = []
+            for line in server.uidl()[1]:
+                number, uid = line.decode('ascii', errors='ignore').split(None, 1)
+                messages.append((int(number), uid.strip()))
+            result['server_uids'] = [uid for _, uid in messages]
+            sizes = {}
+            for line in server.list()[1]:
+                number, size = line.decode('ascii', errors='ignore').split(None, 1)
+                sizes[int(number)] = int(size.split()[0])
             
-            # Get email count
-            num_messages = len(server.list()[1])
+            unseen = [(number, uid) for number, uid in messages if uid not in skip_uids]
+            result['remaining'] = max(0, len(unseen) - batch_size)
             
-            emails = []
-            
-            # Fetch recent emails (last 10 for now)
-            for i in range(max(1, num_messages - 9), num_messages + 1):
+            for number, uid in unseen[:batch_size]:
                 try:
-                    # Get email
-                    response, lines, octets = server.retr(i)
+                    if not self._screen(server, number, sizes.get(number), email_config):
+                        result['skipped_uids'].append(uid)
+                        continue
                     
-                    # Parse email
-                    email_data = self._parse_email(lines, email_config)
+                    email_data = self._retr_email(server, number, email_config)
+                    if email_data is None:
+                        # Unparseable mail would fail the same way on every poll
+                        result['skipped_uids'].append(uid)
+                        continue
+                    
+                    email_data['uid'] = uid
+                    result['emails'].append(email_data)
                     
-                    if email_data:
-                        emails.append(email_data)
-                        
                 except Exception as e:
-                    print(f"Error processing email {i}: {str(e)}")
+                    print(f"Error processing email {uid}: {str(e)}")
                     continue
             
-            server.quit()
-            return emails
+            return result
             
         except Exception as e:
             print(f"Error fetching emails: {str(e)}")
-            return []
+            result['error'] = str(e)
+            return result
+        finally:
+            if server is not None:
+                try:
+                    server.quit()
+                except Exception:
+                    pass
+    
+    def open_pop3(self, email_config: Dict[str, Any], timeout: Optional[float] = None) -> poplib.POP3:
+        """Connect and log in to a POP3 mailbox"""
+        pop3_class = poplib.POP3_SSL if settings.pop3_use_ssl else poplib.POP3
+        server = pop3_class(
+            email_config['pop3_host'],
+            email_config['pop3_port'],
+            **({'timeout': timeout} if timeout else {})
+        )
+        try:
+            server.user(email_config['pop3_username'])
+            server.pass_(email_config['pop3_password'])
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    def _retr_email(self, server: poplib.POP3, number: int,
+                    email_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Download one message, feeding each line to the parser as it arrives"""
+        parser = StreamingMimeParser(self.file_processor)
+        try:
+            for line in self._retr_lines(server, number):
+                parser.feed(line)
+        except Exception:
+            parser.discard()
+            raise
+        email_data = parser.close()
+        if email_data is not None:
+            email_data['email_config_id'] = email_config['id']
+        return email_data
+    
+    @staticmethod
+    def _retr_lines(server: poplib.POP3, number: int) -> Iterator[bytes]:
+        """Issue RETR and yield the message lines, instead of collecting them like retr()"""
+        server._putcmd(f'RETR {number}')
+        server._getresp()
+        while True:
+            line, octets = server._getline()
+            if line == b'.':
+                return
+            # Undo the byte-stuffing of lines that start with a dot
+            if line.startswith(b'..'):
+                line = line[1:]
+            yield line
+    
+    def _screen(self, server: poplib.POP3, number: int, size: Optional[int],
+                email_config: Dict[str, Any]) -> bool:
+        """Classify a message from its TOP headers, returning whether to download it"""
+        try:
+            response, lines, octets = server.top(number, 0)
+        except poplib.error_proto:
+            # TOP is optional in POP3; without it every message is downloaded
+            return True
+        
+        headers = message_from_bytes(b'\n'.join(lines))
+        mail_class = self.mail_classifier.classify(email_config['id'], headers, size, header_bytes=octets)
+        return mail_class == MAIL_APPLICATION
+    
+    def open_imap(self, email_config: Dict[str, Any], timeout: Optional[float] = None) -> imaplib.IMAP4:
+        """Log in to an IMAP mailbox and select its folder read-only"""
+        imap_class = imaplib.IMAP4_SSL if settings.imap_use_ssl else imaplib.IMAP4
+        connection = imap_class(email_config['imap_host'], email_config['imap_port'], timeout=timeout)
+        try:
+            connection.login(email_config['imap_username'], email_config['imap_password'])
+            folder = email_config.get('imap_folder') or 'INBOX'
+            typ, data = connection.select(f'"{folder}"', readonly=True)
+            if typ != 'OK':
+                raise imaplib.IMAP4.error(f"Cannot select folder {folder}: {data}")
+        except Exception:
+            self.close_imap(connection)
+            raise
+        return connection
+    
+    def close_imap(self, connection: imaplib.IMAP4) -> None:
+        """Log out of an IMAP connection, ignoring one that is already broken"""
+        try:
+            connection.logout()
+        except Exception:
+            try:
+                connection.shutdown()
+            except Exception:
+                pass
+    
+    def interrupt_imap(self, connection: imaplib.IMAP4) -> None:
+        """Unblock a thread waiting in wait_for_imap_mail from another thread"""
+        try:
+            connection.sock.shutdown(socket.SHUT_RDWR)
+        except Exception:
+            pass
+    
+    def wait_for_imap_mail(self, connection: imaplib.IMAP4, timeout: float) -> bool:
+        """Wait in IDLE (RFC 2177) until the server reports new mail or timeout passes.
+
+        Returns True on new mail, with the connection ready for the next
+        command. On timeout the connection is closed and False is returned:
+        imaplib cannot read from a socket again after a timeout, so the
+        caller reconnects, which also renews the IDLE before servers drop it.
+        """
+        tag = connection._new_tag()
+        connection.send(tag + b' IDLE\r\n')
+        response = connection.readline()
+        if not response.startswith(b'+'):
+            raise imaplib.IMAP4.error(f"IDLE not accepted: {response.strip()!r}")
+        
+        connection.sock.settimeout(timeout)
+        try:
+            while True:
+                line = connection.readline()
+                if not line:
+                    raise imaplib.IMAP4.abort("Connection closed during IDLE")
+                if line.startswith(b'* ') and line.rstrip().upper().endswith(b' EXISTS'):
+                    break
+        except socket.timeout:
+            self.close_imap(connection)
+            return False
+        connection.sock.settimeout(None)
+        
+        connection.send(b'DONE\r\n')
+        while True:
+            line = connection.readline()
+            if not line:
+                raise imaplib.IMAP4.abort("Connection closed while ending IDLE")
+            if line.startswith(tag):
+                return True
     
-    def _parse_email(self, lines: List[bytes], email_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Parse email content and extract relevant information"""
+    def fetch_imap_emails(self, email_config: Dict[str, Any], skip_uids: Optional[Set[str]] = None,
+                          batch_size: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Fetch up to batch_size IMAP messages whose uid is not in skip_uids.
+
+        Returns the same result as fetch_emails. Uids are "UIDVALIDITY:UID",
+        so a rebuilt folder is fetched again. Only the BODYSTRUCTURE and a few
+        headers are read for every message. Messages the classifier screens
+        out, including any with no resume attachment, are skipped without
+        downloading anything else; the text body and resume attachments of
+        the rest are downloaded part by part.
+        """
+        skip_uids = skip_uids or set()
+        batch_size = batch_size or settings.email_fetch_batch_size
+        result = {'emails': [], 'skipped_uids': [], 'server_uids': None, 'remaining': 0, 'error': None}
+        connection = None
         try:
-            # Convert bytes to string
-            email_content = b'\n'.join(lines).decode('utf-8', errors='ignore')
+            connection = self.open_imap(email_config, timeout)
+            uidvalidity = connection.response('UIDVALIDITY')[1][-1].decode()
             
-            # Parse email message
-            msg = message_from_bytes(b'\n'.join(lines))
+            typ, data = connection.uid('SEARCH', 'ALL')
+            uids = [uid.decode() for uid in data[0].split()]
+            result['server_uids'] = [f"{uidvalidity}:{uid}" for uid in uids]
             
-            # Extract basic information
-            subject = msg.get('Subject', '')
-            from_email = msg.get('From', '')
-            to_email = msg.get('To', '')
-            date = msg.get('Date', '')
+            unseen = [uid for uid in uids if f"{uidvalidity}:{uid}" not in skip_uids]
+            result['remaining'] = max(0, len(unseen) - batch_size)
+            batch = unseen[:batch_size]
+            if not batch:
+                return result
             
-            # Extract body
-            body = self._extract_email_body(msg)
+            typ, data = connection.uid('FETCH', ','.join(batch), f"(UID RFC822.SIZE BODYSTRUCTURE {IMAP_HEADER_FIELDS})")
+            messages = {}
+            for fields in parse_imap_fetch_response(data):
+                messages[fields['UID'].decode()] = fields
             
-            # Extract attachments
-            attachments = self._extract_attachments(msg)
+            for uid in batch:
+                if uid not in messages:
+                    # Expunged since the search
+                    continue
+                try:
+                    email_data = self._fetch_imap_message(connection, uid, messages[uid], email_config)
+                    if email_data is None:
+                        result['skipped_uids'].append(f"{uidvalidity}:{uid}")
+                        continue
+                    
+                    email_data['uid'] = f"{uidvalidity}:{uid}"
+                    result['emails'].append(email_data)
+                    
+                except Exception as e:
+                    print(f"Error processing IMAP message {uid}: {str(e)}")
+                    continue
             
-            return {
-                'subject': subject,
-                'from_email': from_email,
-                'to_email': to_email,
-                'date': date,
-                'body': body,
-                'attachments': attachments,
-                'email_config_id': email_config['id']
-            }
+            return result
             
         except Exception as e:
-            print(f"Error parsing email: {str(e)}")
-            return None
+            print(f"Error fetching IMAP emails: {str(e)}")
+            result['error'] = str(e)
+            return result
+        finally:
+            if connection is not None:
+                self.close_imap(connection)
     
-    def _extract_email_body(self, msg) -> str:
-        """Extract email body text"""
-        body = ""
+    def _fetch_imap_message(self, connection: imaplib.IMAP4, uid: str, fields: Dict[str, Any],
+                            email_config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Download the text body and resume attachments of one message"""
+        attachments = []
+        body_part = None
+        for number, part in iter_imap_body_parts(fields['BODYSTRUCTURE']):
+            filename = imap_part_filename(part)
+            if filename:
+                if Path(filename).suffix.lower().lstrip('.') in RESUME_ATTACHMENT_TYPES:
+                    attachments.append((number, part, filename))
+            elif body_part is None and imap_part_type(part) == 'text/plain':
+                body_part = (number, part)
         
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    try:
-                        body += part.get_payload(decode=True).decode('utf-8', errors='ignore')
-                    except:
-                        continue
-        else:
+        # Servers echo the section spec back in their own format
+        header_bytes = next((value for key, value in fields.items() if key.startswith('BODY[HEADER')), None) or b''
+        headers = message_from_bytes(header_bytes)
+        size = int(fields['RFC822.SIZE']) if fields.get('RFC822.SIZE') else None
+        mail_class = self.mail_classifier.classify(
+            email_config['id'], headers, size, header_bytes=len(header_bytes), resume_parts=len(attachments)
+        )
+        if mail_class != MAIL_APPLICATION:
+            return None
+        body = ""
+        if body_part is not None:
+            number, part = body_part
+            charset = imap_part_params(part).get('charset', 'utf-8')
+            content = decode_imap_part(self._fetch_imap_section(connection, uid, number), part)
             try:
-                body = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
-            except:
-                body = str(msg.get_payload())
-        
-        return body
-    
-    def _extract_attachments(self, msg) -> List[Dict[str, Any]]:
-        """Extract email attachments"""
-        attachments = []
+                body = content.decode(charset, errors='ignore')
+            except LookupError:
+                body = content.decode('utf-8', errors='ignore')
         
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_filename():
-                    try:
-                        filename = part.get_filename()
-                        content = part.get_payload(decode=True)
-                        
-                        attachments.append({
-                            'filename': filename,
-                            'content': content,
-                            'content_type': part.get_content_type()
-                        })
-                    except Exception as e:
-                        print(f"Error extracting attachment: {str(e)}")
-                        continue
+        # Each attachment is fetched on its own and written to its spool
+        # file before the next, so only one part is in memory at a time
+        spooled = []
+        try:
+            for number, part, filename in attachments:
+                file_type = Path(filename).suffix.lower().lstrip('.')
+                success, message, spool = self.file_processor.open_spool(filename, file_type)
+                if not success:
+                    print(f"Skipping attachment {filename}: {message}")
+                    continue
+                try:
+                    spool.write(decode_imap_part(self._fetch_imap_section(connection, uid, number), part))
+                except Exception:
+                    spool.discard()
+                    raise
+                success, message = spool.finish()
+                if not success:
+                    print(f"Skipping attachment {filename}: {message}")
+                    continue
+                spooled.append({
+                    'filename': filename,
+                    'content_type': imap_part_type(part),
+                    'path': str(spool.path),
+                    'size': spool.size,
+                    'sha256': spool.sha256.hexdigest()
+                })
+        except Exception:
+            for attachment in spooled:
+                self.file_processor.delete_file(attachment['path'])
+            raise
         
-        return attachments
+        return {
+            'subject': headers.get('Subject', ''),
+            'from_email': headers.get('From', ''),
+            'to_email': headers.get('To', ''),
+            'date': headers.get('Date', ''),
+            'message_id': headers.get('Message-ID', '').strip(),
+            'body': body,
+            'attachments': spooled,
+            'email_config_id': email_config['id']
+        }
+    
+    @staticmethod
+    def _fetch_imap_section(connection: imaplib.IMAP4, uid: str, number: str) -> bytes:
+        """Download one body part of a message without setting \\Seen"""
+        typ, data = connection.uid('FETCH', uid, f'(BODY.PEEK[{number}])')
+        return parse_imap_fetch_response(data)[0].get(f'BODY[{number}]') or b''
     
     def validate_email_config(self, email_config: Dict[str, Any]) -> bool:
         """Validate email configuration by testing connection"""
         try:
             # Test POP3 connection
-            pop3_server = poplib.POP3_SSL(
-                email_config['pop3_host'],
-                email_config['pop3_port']
-            )
-            pop3_server.user(email_config['pop3_username'])
-            pop3_server.pass_(email_config['pop3_password'])
+            pop3_server = self.open_pop3(email_config)
             pop3_server.quit()
             
             # Test SMTP connection
@@ -183,4 +418,148 @@ class EmailProcessor:
             
         except Exception as e:
             print(f"Email config validation failed: {str(e)}")
-            return False 
\ No newline at end of file
+            return False
+
+
+def _parse_imap_value(data: bytes, pos: int) -> Tuple[Any, int]:
+    """Parse one IMAP value (list, quoted string, literal, NIL or atom) at pos"""
+    while data[pos:pos + 1] == b' ':
+        pos += 1
+    char = data[pos:pos + 1]
+    if char == b'(':
+        values = []
+        pos += 1
+        while True:
+            while data[pos:pos + 1] == b' ':
+                pos += 1
+            if data[pos:pos + 1] == b')':
+                return values, pos + 1
+            if pos >= len(data):
+                raise ValueError("Unterminated IMAP list")
+            value, pos = _parse_imap_value(data, pos)
+            values.append(value)
+    if char == b'"':
+        value = bytearray()
+        pos += 1
+        while data[pos:pos + 1] != b'"':
+            if pos >= len(data):
+                raise ValueError("Unterminated IMAP string")
+            if data[pos:pos + 1] == b'\\':
+                pos += 1
+            value += data[pos:pos + 1]
+            pos += 1
+        return bytes(value), pos + 1
+    if char == b'{':
+        end = data.index(b'}', pos)
+        size = int(data[pos + 1:end])
+        start = end + 3  # skip "}\r\n"
+        return data[start:start + size], start + size
+    # Atom; section specs like BODY[HEADER.FIELDS (SUBJECT)] keep their spaces
+    start = pos
+    depth = 0
+    while pos < len(data):
+        char = data[pos:pos + 1]
+        if char == b'[':
+            depth += 1
+        elif char == b']':
+            depth -= 1
+        elif depth == 0 and char in (b' ', b'(', b')'):
+            break
+        pos += 1
+    atom = data[start:pos]
+    return (None if atom.upper() == b'NIL' else atom), pos
+
+
+def parse_imap_fetch_response(data: List[Any]) -> List[Dict[str, Any]]:
+    """Turn imaplib FETCH response data into one {item name: value} dict per message"""
+    # imaplib splits literals out as (line ending in {n}, literal) tuples
+    raw = b''.join(
+        piece[0] + b'\r\n' + piece[1] if isinstance(piece, tuple) else piece
+        for piece in data if piece is not None
+    )
+    messages = []
+    pos = 0
+    while pos < len(raw):
+        while raw[pos:pos + 1] in (b' ', b'\r', b'\n'):
+            pos += 1
+        if pos >= len(raw):
+            break
+        sequence_number, pos = _parse_imap_value(raw, pos)
+        items, pos = _parse_imap_value(raw, pos)
+        messages.append({
+            items[i].decode().upper(): items[i + 1] for i in range(0, len(items) - 1, 2)
+        })
+    return messages
+
+
+def iter_imap_body_parts(structure: List[Any], number: str = ""):
+    """Yield (part number, part) for each leaf of a BODYSTRUCTURE"""
+    if structure and isinstance(structure[0], list):
+        # Multipart: child bodies followed by the subtype and extension data
+        index = 0
+        for child in structure:
+            if not isinstance(child, list):
+                break
+            index += 1
+            yield from iter_imap_body_parts(child, f"{number}.{index}" if number else str(index))
+    else:
+        yield number or "1", structure
+
+
+def imap_part_type(part: List[Any]) -> str:
+    """Get a body part's MIME type"""
+    return f"{(part[0] or b'').decode()}/{(part[1] or b'').decode()}".lower()
+
+
+def _imap_params(values: Optional[List[Any]]) -> Dict[str, str]:
+    """Turn an IMAP parameter list into a dict with lower-case keys"""
+    values = values or []
+    return {
+        values[i].decode().lower(): (values[i + 1] or b'').decode('utf-8', errors='ignore')
+        for i in range(0, len(values) - 1, 2)
+    }
+
+
+def imap_part_params(part: List[Any]) -> Dict[str, str]:
+    """Get a body part's Content-Type parameters"""
+    return _imap_params(part[2] if isinstance(part[2], list) else None)
+
+
+def imap_part_filename(part: List[Any]) -> Optional[str]:
+    """Get a body part's attachment filename, from its disposition or its type"""
+    filename = None
+    # Extension data follows the seven basic fields; the disposition is the
+    # ("attachment" (params)) pair among it
+    for value in part[7:]:
+        if (isinstance(value, list) and len(value) == 2 and isinstance(value[0], bytes)
+                and (value[1] is None or isinstance(value[1], list))):
+            filename = _imap_filename_param(_imap_params(value[1]), 'filename')
+            break
+    filename = filename or _imap_filename_param(imap_part_params(part), 'name')
+    if not filename:
+        return None
+    return str(make_header(decode_header(filename)))
+
+
+def _imap_filename_param(params: Dict[str, str], name: str) -> Optional[str]:
+    """Get a filename parameter, decoding the RFC 2231 name*=charset''value form"""
+    if params.get(name):
+        return params[name]
+    if params.get(f"{name}*"):
+        charset, language, value = decode_rfc2231(params[f"{name}*"])
+        try:
+            return unquote(value, encoding=charset or 'utf-8', errors='replace')
+        except LookupError:
+            return unquote(value)
+    return None
+
+
+def decode_imap_part(content: bytes, part: List[Any]) -> bytes:
+    """Undo a body part's Content-Transfer-Encoding"""
+    encoding = (part[5] or b'').decode().lower()
+    if encoding == 'base64':
+        return base64.b64decode(content)
+    if encoding == 'quoted-printable':
+        return quopri.decodestring(content)
+    return content
+
@@ -1,10 +1,55 @@
 import os
 import uuid
-from typing import Optional, Tuple
+import hashlib
+from typing import Any, BinaryIO, Dict, Optional, Tuple
 from pathlib import Path
 from app.config import settings
 
 
+class FileSpool:
+    """A file written to the upload directory chunk by chunk and hashed as it goes"""
+
+    def __init__(self, path: Path, max_size: int):
+        self.path = path
+        self.max_size = max_size
+        self.size = 0
+        self.sha256 = hashlib.sha256()
+        self._file = open(path, 'wb')
+
+    @property
+    def too_large(self) -> bool:
+        return self.size > self.max_size
+
+    def write(self, data: bytes) -> None:
+        """Append data, dropping everything once the size limit is passed"""
+        if not data:
+            return
+        self.size += len(data)
+        if self.too_large:
+            return
+        self.sha256.update(data)
+        self._file.write(data)
+
+    def finish(self) -> Tuple[bool, str]:
+        """Close the file, removing it if it is empty or over the size limit"""
+        self._file.close()
+        if self.too_large:
+            self.discard()
+            return False, f"File size exceeds maximum limit of {self.max_size} bytes"
+        if self.size == 0:
+            self.discard()
+            return False, "File is empty"
+        return True, "File saved successfully"
+
+    def discard(self) -> None:
+        """Close and remove the file"""
+        self._file.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
 class FileProcessor:
     """Service for processing file uploads and validation"""
     
@@ -12,6 +57,7 @@ class FileProcessor:
         self.upload_dir = Path(settings.upload_dir)
         self.max_file_size = settings.max_file_size
         self.supported_types = ['pdf', 'doc', 'docx']
+        self.chunk_size = 64 * 1024
         
         # Create upload directory if it doesn't exist
         self.upload_dir.mkdir(exist_ok=True)
@@ -28,8 +74,9 @@ class FileProcessor:
                 return False, f"File size exceeds maximum limit of {self.max_file_size} bytes", None
             
             # Generate unique filename
-            unique_filename = self._generate_unique_filename(filename)
-            file_path = self.upload_dir / unique_filename
+            file_path = self._upload_path(filename)
+            if file_path is None:
+                return False, "Invalid filename", None
             
             # Save file
             with open(file_path, 'wb') as f:
@@ -39,7 +86,54 @@ class FileProcessor:
             
         except Exception as e:
             return False, f"Error saving file: {str(e)}", None
-    
+
+    def save_stream(self, stream: BinaryIO, filename: str, file_type: str) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        """Copy a file-like object to the upload directory in chunks.
+
+        Returns success status, message and the saved file's 'path', 'size'
+        and 'sha256'. The file is written through a FileSpool, so the size
+        limit is enforced while copying and oversized files are never held
+        in memory.
+        """
+        success, message, spool = self.open_spool(filename, file_type)
+        if not success:
+            return False, message, None
+        try:
+            while not spool.too_large:
+                chunk = stream.read(self.chunk_size)
+                if not chunk:
+                    break
+                spool.write(chunk)
+        except Exception as e:
+            spool.discard()
+            return False, f"Error saving file: {str(e)}", None
+
+        success, message = spool.finish()
+        if not success:
+            return False, message, None
+        return True, message, {'path': str(spool.path), 'size': spool.size, 'sha256': spool.sha256.hexdigest()}
+
+    def open_spool(self, filename: str, file_type: str) -> Tuple[bool, str, Optional[FileSpool]]:
+        """Start a file in the upload directory that is written as data arrives.
+
+        Returns success status, message and the spool, which enforces the
+        size limit and computes the file's sha256 while it is written.
+        """
+        if not self._is_valid_file_type(file_type):
+            return False, f"Unsupported file type: {file_type}", None
+        if not filename or len(filename) > 255:
+            return False, "Invalid filename", None
+        if self._is_malicious_file(filename):
+            return False, "File type not allowed for security reasons", None
+        path = self._upload_path(filename)
+        if path is None:
+            return False, "Invalid filename", None
+        try:
+            spool = FileSpool(path, self.max_file_size)
+        except Exception as e:
+            return False, f"Error saving file: {str(e)}", None
+        return True, "File spool opened", spool
+
     def delete_file(self, file_path: str) -> bool:
         """Delete a file from the upload directory"""
         try:
@@ -65,7 +159,7 @@ class FileProcessor:
                 'size_bytes': stat.st_size,
                 'created_time': stat.st_ctime,
                 'modified_time': stat.st_mtime,
-                'file_type': self._get_file_extension(path.name)
+                'file_type': self.get_file_extension(path.name)
             }
         except Exception as e:
             print(f"Error getting file info: {str(e)}")
@@ -106,12 +200,20 @@ class FileProcessor:
         return file_ext in dangerous_extensions
     
     def _generate_unique_filename(self, original_filename: str) -> str:
-        """Generate a unique filename"""
-        name, ext = os.path.splitext(original_filename)
+        """Generate a unique filename from the last component of an untrusted name"""
+        # Names come from emails and uploads; drop any directory part, in either style
+        name, ext = os.path.splitext(Path(original_filename.replace('\\', '/')).name)
         unique_id = str(uuid.uuid4())
         return f"{name}_{unique_id}{ext}"
     
-    def _get_file_extension(self, filename: str) -> str:
+    def _upload_path(self, filename: str) -> Optional[Path]:
+        """Get a new path in the upload directory for a file, or None if it would land outside it"""
+        path = self.upload_dir / self._generate_unique_filename(filename)
+        if not path.resolve().is_relative_to(self.upload_dir.resolve()):
+            return None
+        return path
+    
+    def get_file_extension(self, filename: str) -> str:
         """Get file extension from filename"""
         return Path(filename).suffix.lower().lstrip('.')
     
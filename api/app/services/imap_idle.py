@@ -0,0 +1,174 @@
+import asyncio
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+from sqlalchemy import text
+from app.config import settings
+from app.database import engine
+
+
+class ImapIdleWatcher:
+    """Holds an IMAP IDLE connection for each active IMAP mailbox.
+
+    Whenever the server reports new mail, the mailbox is queued on the
+    pipeline's ingest stage, which fetches only unseen uids. Every
+    (re)connect also queues the mailbox, to catch up on mail that arrived
+    while it was not watched. Each mailbox is watched by the process that
+    holds its Postgres advisory lock, so extra ingest workers give failover
+    rather than duplicate connections.
+    """
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.email_processor = pipeline.email_processor
+        self.watched: Dict[str, Dict[str, Any]] = {}
+        self.watchers: Dict[str, asyncio.Task] = {}
+        self.connections: Dict[str, Any] = {}
+        self._stop_event: Optional[asyncio.Event] = None
+        self._refresher: Optional[asyncio.Task] = None
+        # Advisory locks are per session, so all of this process's mailbox
+        # locks live on one connection instead of one pooled connection each
+        self._lock_connection = None
+        self._lock_mutex = threading.Lock()
+
+    async def start(self) -> None:
+        """Start watching, and keep the watched set in step with the database"""
+        self._stop_event = asyncio.Event()
+        self._refresher = asyncio.create_task(self._refresh_loop(), name="imap-idle-refresh")
+
+    async def stop(self) -> None:
+        """Close every IDLE connection and release the mailbox locks"""
+        if self._stop_event is None:
+            return
+        self._stop_event.set()
+        for mailbox_id in list(self.watchers):
+            self._stop_watcher(mailbox_id)
+        tasks = [self._refresher, *self.watchers.values()]
+        await asyncio.gather(*[task for task in tasks if task is not None], return_exceptions=True)
+        self.watchers = {}
+        self.watched = {}
+        if self._lock_connection is not None:
+            await asyncio.to_thread(self._lock_connection.close)
+            self._lock_connection = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get which mailboxes have a watcher and which hold an open connection"""
+        return {
+            'mailboxes': len(self.watchers),
+            'connected': [self.watched[mailbox_id]['email_address'] for mailbox_id in self.connections]
+        }
+
+    async def _refresh_loop(self) -> None:
+        """Start watchers for new IMAP mailboxes and restart changed ones"""
+        while not self._stop_event.is_set():
+            try:
+                email_configs = await asyncio.to_thread(self.pipeline._load_active_email_configs, "imap")
+                current = {email_config['id']: email_config for email_config in email_configs}
+                for mailbox_id in list(self.watchers):
+                    if current.get(mailbox_id) != self.watched[mailbox_id] or self.watchers[mailbox_id].done():
+                        self._stop_watcher(mailbox_id)
+                        await asyncio.gather(self.watchers.pop(mailbox_id), return_exceptions=True)
+                        del self.watched[mailbox_id]
+                for mailbox_id, email_config in current.items():
+                    if mailbox_id not in self.watchers:
+                        self.watched[mailbox_id] = email_config
+                        self.watchers[mailbox_id] = asyncio.create_task(
+                            self._watch(email_config), name=f"imap-idle-{mailbox_id}"
+                        )
+            except Exception as e:
+                print(f"Error refreshing IMAP mailboxes: {str(e)}")
+            await self._sleep(settings.imap_reconnect_delay)
+
+    def _stop_watcher(self, mailbox_id: str) -> None:
+        """Interrupt a watcher's blocking IDLE wait and cancel it"""
+        connection = self.connections.get(mailbox_id)
+        if connection is not None:
+            self.email_processor.interrupt_imap(connection)
+        self.watchers[mailbox_id].cancel()
+
+    async def _sleep(self, seconds: float) -> None:
+        """Sleep unless the watcher is stopped first"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _watch(self, email_config: Dict[str, Any]) -> None:
+        """Watch one mailbox while this process holds its lock"""
+        mailbox_id = email_config['id']
+        locked = False
+        try:
+            while not self._stop_event.is_set():
+                if not locked:
+                    try:
+                        locked = await asyncio.to_thread(self._try_lock, mailbox_id)
+                    except Exception as e:
+                        print(f"Error locking IMAP mailbox {email_config['email_address']}: {str(e)}")
+                    if not locked:
+                        # Another process is watching this mailbox
+                        await self._sleep(settings.imap_reconnect_delay)
+                        continue
+
+                try:
+                    connection = await asyncio.to_thread(self.email_processor.open_imap, email_config)
+                except Exception as e:
+                    print(f"Error connecting to IMAP for {email_config['email_address']}: {str(e)}")
+                    await self._sleep(settings.imap_reconnect_delay)
+                    continue
+
+                self.connections[mailbox_id] = connection
+                try:
+                    await self.pipeline.submit_mailbox(email_config)
+                    while not self._stop_event.is_set():
+                        has_mail = await asyncio.to_thread(
+                            self.email_processor.wait_for_imap_mail, connection, settings.imap_idle_timeout
+                        )
+                        if not has_mail:
+                            break
+                        await self.pipeline.submit_mailbox(email_config)
+                except Exception as e:
+                    if not self._stop_event.is_set():
+                        print(f"IMAP IDLE error for {email_config['email_address']}: {str(e)}")
+                        await self._sleep(settings.imap_reconnect_delay)
+                finally:
+                    self.connections.pop(mailbox_id, None)
+                    await asyncio.to_thread(self.email_processor.close_imap, connection)
+        finally:
+            if locked:
+                await asyncio.to_thread(self._unlock, mailbox_id)
+
+    @staticmethod
+    def lock_key(mailbox_id: str) -> int:
+        """Postgres advisory lock key for watching a mailbox"""
+        digest = hashlib.sha256(f"imap_idle:{mailbox_id}".encode()).digest()
+        return int.from_bytes(digest[:8], "big", signed=True)
+
+    def _try_lock(self, mailbox_id: str) -> bool:
+        """Take a mailbox's advisory lock on the shared lock connection"""
+        with self._lock_mutex:
+            if self._lock_connection is None:
+                self._lock_connection = engine.connect()
+            try:
+                locked = self._lock_connection.execute(
+                    text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key(mailbox_id)}
+                ).scalar()
+                self._lock_connection.commit()
+                return bool(locked)
+            except Exception:
+                # A dropped connection loses every lock it held; start over
+                self._lock_connection.close()
+                self._lock_connection = None
+                raise
+
+    def _unlock(self, mailbox_id: str) -> None:
+        """Release a mailbox's advisory lock"""
+        with self._lock_mutex:
+            if self._lock_connection is None:
+                return
+            try:
+                self._lock_connection.execute(
+                    text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key(mailbox_id)}
+                )
+                self._lock_connection.commit()
+            except Exception as e:
+                print(f"Error releasing IMAP mailbox lock: {str(e)}")
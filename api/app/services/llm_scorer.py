@@ -1,14 +1,21 @@
 import json
 from typing import Dict, List, Any, Optional
-from openai import OpenAI
+from openai import APIConnectionError, OpenAI, RateLimitError
 from app.config import settings
 
 
+# llm_prompt_used of results from the rule-based scorer
+FALLBACK_PROMPT = "Fallback scoring"
+
+
 class LLMScorer:
     """Service for scoring resumes using LLM"""
     
-    def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
+    def __init__(self, use_llm: bool = True):
+        # Without the LLM every resume gets the rule-based score, and no
+        # API key is needed
+        self.use_llm = use_llm
+        self.client = OpenAI(api_key=settings.openai_api_key) if use_llm else None
         self.model = settings.openai_model
         
         # Scoring weights
@@ -27,8 +34,16 @@ class LLMScorer:
             'consider_caution': 40
         }
     
-    def score_resume(self, resume_data: Dict[str, Any], job_description: Dict[str, Any]) -> Dict[str, Any]:
-        """Score a resume against a job description"""
+    def score_resume(self, resume_data: Dict[str, Any], job_description: Dict[str, Any],
+                     raise_on_rate_limit: bool = False) -> Dict[str, Any]:
+        """Score a resume against a job description.
+
+        With raise_on_rate_limit, rate limit and connection errors are raised
+        instead of falling back to rule-based scoring, so a queue worker can
+        retry the job later.
+        """
+        if not self.use_llm:
+            return self._fallback_scoring(resume_data, job_description)
         
         # Create prompt for LLM
         prompt = self._create_scoring_prompt(resume_data, job_description)
@@ -58,6 +73,10 @@ class LLMScorer:
                 'llm_prompt_used': prompt
             }
             
+        except (RateLimitError, APIConnectionError):
+            if raise_on_rate_limit:
+                raise
+            return self._fallback_scoring(resume_data, job_description)
         except Exception as e:
             # Fallback scoring if LLM fails
             return self._fallback_scoring(resume_data, job_description)
@@ -297,5 +316,5 @@ Please respond with a JSON object containing:
             'stability_analysis': {"tenure": "", "gaps": [], "progression": ""},
             'red_flags': [],
             'llm_analysis_text': "Fallback scoring used due to LLM failure",
-            'llm_prompt_used': "Fallback scoring"
+            'llm_prompt_used': FALLBACK_PROMPT
         } 
\ No newline at end of file
@@ -0,0 +1,137 @@
+import re
+import threading
+from email.header import decode_header, make_header
+from email.message import Message
+from email.utils import parseaddr
+from typing import Any, Dict, Optional
+from app.config import settings
+
+
+MAIL_APPLICATION = "application"
+MAIL_BOUNCE = "bounce"
+MAIL_AUTO_REPLY = "auto_reply"
+MAIL_NEWSLETTER = "newsletter"
+MAIL_NO_ATTACHMENT = "no_attachment"
+MAIL_OVERSIZED = "oversized"
+
+# Headers the classifier reads, fetched along with the ones kept for the submission
+CLASSIFIER_HEADERS = [
+    "CONTENT-TYPE", "RETURN-PATH", "AUTO-SUBMITTED", "X-AUTOREPLY", "X-AUTORESPOND",
+    "PRECEDENCE", "LIST-ID", "LIST-UNSUBSCRIBE"
+]
+
+BOUNCE_SENDER = re.compile(r"^(mailer-daemon|postmaster)@", re.IGNORECASE)
+BOUNCE_SUBJECT = re.compile(
+    r"^\s*(undeliverable|undelivered mail|delivery status notification|mail delivery failed|returned mail)",
+    re.IGNORECASE
+)
+AUTO_REPLY_SUBJECT = re.compile(
+    r"^\s*(out of (the )?office|automatic reply|auto[- ]?reply|autoreply|away from (the )?office)",
+    re.IGNORECASE
+)
+
+
+def _subject(headers: Message) -> str:
+    try:
+        return str(make_header(decode_header(headers.get('Subject', ''))))
+    except Exception:
+        return headers.get('Subject', '')
+
+
+def classify_headers(headers: Message, size: Optional[int] = None, resume_parts: Optional[int] = None) -> str:
+    """Classify a message from its headers and size, before its body is downloaded.
+
+    resume_parts is the number of PDF/DOC/DOCX attachments when the
+    message structure is known (IMAP BODYSTRUCTURE). Without it, only
+    multipart mail other than multipart/alternative is taken to possibly
+    carry a resume. Mail that may carry a resume is not screened out as an
+    auto-reply or newsletter, as job boards forward applications with bulk
+    and list headers; it is downloaded and kept only if it has a resume.
+    """
+    sender = parseaddr(headers.get('From', ''))[1]
+    subject = _subject(headers)
+    null_sender = headers.get('Return-Path', '').strip() == '<>'
+
+    if (headers.get_content_type() == 'multipart/report' or BOUNCE_SENDER.match(sender)
+            or (null_sender and BOUNCE_SUBJECT.match(subject))):
+        return MAIL_BOUNCE
+
+    if resume_parts is not None:
+        may_carry_resume = resume_parts > 0
+    else:
+        may_carry_resume = (headers.get_content_maintype() == 'multipart'
+                            and headers.get_content_subtype() != 'alternative')
+    if not may_carry_resume:
+        auto_submitted = headers.get('Auto-Submitted', 'no').strip().lower()
+        precedence = headers.get('Precedence', '').strip().lower()
+        if (auto_submitted != 'no' or headers.get('X-Autoreply') or headers.get('X-Autorespond')
+                or precedence == 'auto_reply' or AUTO_REPLY_SUBJECT.match(subject)):
+            return MAIL_AUTO_REPLY
+        if headers.get('List-Unsubscribe') or headers.get('List-Id') or precedence in ('bulk', 'list', 'junk'):
+            return MAIL_NEWSLETTER
+        return MAIL_NO_ATTACHMENT
+    if size is not None and size > settings.mail_max_message_size:
+        return MAIL_OVERSIZED
+    return MAIL_APPLICATION
+
+
+class MailClassifier:
+    """Screens incoming mail from its headers so only likely applications are downloaded.
+
+    Bounces, auto-replies, newsletters, mail that cannot carry a resume and
+    messages over MAIL_MAX_MESSAGE_SIZE are skipped after reading just their
+    headers. Per mailbox, it counts messages screened and skipped by class,
+    and the bytes not downloaded: the message size less the headers read.
+    """
+
+    def __init__(self):
+        self._mailboxes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def classify(self, mailbox_id: str, headers: Message, size: Optional[int] = None,
+                 header_bytes: int = 0, resume_parts: Optional[int] = None) -> str:
+        """Classify a message and count the outcome against its mailbox"""
+        mail_class = classify_headers(headers, size, resume_parts)
+        with self._lock:
+            stats = self._mailboxes.setdefault(str(mailbox_id), {
+                'screened': 0, 'skipped': 0, 'bytes_saved': 0, 'by_class': {}
+            })
+            stats['screened'] += 1
+            stats['by_class'][mail_class] = stats['by_class'].get(mail_class, 0) + 1
+            if mail_class != MAIL_APPLICATION:
+                stats['skipped'] += 1
+                if size is not None:
+                    stats['bytes_saved'] += max(0, size - header_bytes)
+        return mail_class
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get skip rates and bytes saved per mailbox and in total"""
+        with self._lock:
+            mailboxes = {
+                mailbox_id: {
+                    **stats,
+                    'by_class': dict(stats['by_class']),
+                    'skip_rate': round(stats['skipped'] / stats['screened'], 3) if stats['screened'] else 0.0
+                }
+                for mailbox_id, stats in self._mailboxes.items()
+            }
+        screened = sum(stats['screened'] for stats in mailboxes.values())
+        skipped = sum(stats['skipped'] for stats in mailboxes.values())
+        return {
+            'screened': screened,
+            'skipped': skipped,
+            'skip_rate': round(skipped / screened, 3) if screened else 0.0,
+            'bytes_saved': sum(stats['bytes_saved'] for stats in mailboxes.values()),
+            'mailboxes': mailboxes
+        }
+
+
+_mail_classifier: Optional[MailClassifier] = None
+
+
+def get_mail_classifier() -> MailClassifier:
+    """Get the process-wide mail classifier"""
+    global _mail_classifier
+    if _mail_classifier is None:
+        _mail_classifier = MailClassifier()
+    return _mail_classifier
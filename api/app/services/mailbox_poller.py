@@ -0,0 +1,172 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from app.config import settings
+
+
+MailboxIngest = Callable[[Dict[str, Any]], Awaitable[Dict[str, int]]]
+
+
+class MailboxPoller:
+    """Polls many mailboxes concurrently with bounded connections.
+
+    A sweep starts one task per due mailbox. Every POP3/IMAP session goes
+    through fetch(), which holds a slot of the global connection limit and
+    of the per-host limit, so one provider hosting many tenants is not
+    opened more than POLLER_MAX_CONNECTIONS_PER_HOST times at once. Socket
+    operations time out after POLLER_MAILBOX_TIMEOUT seconds and a whole
+    session after twice that. A mailbox that
+    had no new mail is polled less often, doubling its interval up to
+    POLLER_MAX_INTERVAL, and drops back to the base interval as soon as
+    mail arrives. The duration of every sweep is kept as the cycle time.
+    """
+
+    def __init__(self, base_interval: Optional[int] = None):
+        self.base_interval = base_interval or settings.pipeline_poll_interval
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.cycles: deque = deque(maxlen=100)
+        self.in_use: Dict[str, int] = {}
+        self._connections: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def mailbox_host(email_config: Dict[str, Any]) -> str:
+        """Get the server a mailbox connects to"""
+        if email_config.get('ingest_protocol') == "imap":
+            return (email_config.get('imap_host') or "").lower()
+        return (email_config.get('pop3_host') or "").lower()
+
+    async def fetch(self, email_config: Dict[str, Any], fetch_func: Callable[..., Dict[str, Any]],
+                    *args: Any) -> Dict[str, Any]:
+        """Run one blocking mailbox session within the connection limits and timeout"""
+        if self._connections is None:
+            # Created lazily so they bind to the running event loop
+            self._connections = asyncio.Semaphore(settings.poller_max_connections)
+        host = self.mailbox_host(email_config)
+        host_limit = self._host_limits.setdefault(
+            host, asyncio.Semaphore(settings.poller_max_connections_per_host)
+        )
+        # Take the host slot first, so waiting on a busy host doesn't hold
+        # a global slot that another host could use
+        async with host_limit:
+            async with self._connections:
+                self.in_use[host] = self.in_use.get(host, 0) + 1
+                try:
+                    # The socket timeout ends the blocking call; wait_for only
+                    # stops a stuck thread from holding the slot past it
+                    return await asyncio.wait_for(
+                        asyncio.to_thread(fetch_func, email_config, *args, timeout=settings.poller_mailbox_timeout),
+                        timeout=settings.poller_mailbox_timeout * 2
+                    )
+                finally:
+                    self.in_use[host] -= 1
+
+    def _state(self, mailbox_id: str) -> Dict[str, Any]:
+        return self.states.setdefault(mailbox_id, {
+            'interval': self.base_interval,
+            'next_due': 0.0,
+            'last_polled_at': None,
+            'last_duration_seconds': None,
+            'last_new_messages': None,
+            'quiet_polls': 0,
+            'last_error': None
+        })
+
+    def due(self, email_configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Get the mailboxes whose next poll is due, forgetting removed ones"""
+        now = time.monotonic()
+        current = {email_config['id'] for email_config in email_configs}
+        for mailbox_id in list(self.states):
+            if mailbox_id not in current:
+                del self.states[mailbox_id]
+        return [
+            email_config for email_config in email_configs
+            if self._state(email_config['id'])['next_due'] <= now
+        ]
+
+    def seconds_until_due(self) -> float:
+        """Get how long until the next mailbox is due"""
+        if not self.states:
+            return float(self.base_interval)
+        return max(0.0, min(state['next_due'] for state in self.states.values()) - time.monotonic())
+
+    def _record_poll(self, mailbox_id: str, started: float, new_messages: int,
+                     error: Optional[str]) -> None:
+        """Reschedule a mailbox based on what its poll found"""
+        state = self._state(mailbox_id)
+        if new_messages and not error:
+            state['interval'] = self.base_interval
+            state['quiet_polls'] = 0
+        else:
+            max_interval = max(self.base_interval, settings.poller_max_interval)
+            state['interval'] = min(max_interval, state['interval'] * settings.poller_backoff_factor)
+            state['quiet_polls'] += 1
+        finished = time.monotonic()
+        state['next_due'] = finished + state['interval']
+        state['last_polled_at'] = datetime.now(timezone.utc)
+        state['last_duration_seconds'] = round(finished - started, 3)
+        state['last_new_messages'] = new_messages
+        state['last_error'] = error
+
+    async def _poll_one(self, email_config: Dict[str, Any], ingest: MailboxIngest) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            result = await ingest(email_config)
+            new_messages = result.get('fetched', 0) + result.get('skipped', 0)
+            error = result.get('error')
+        except Exception as e:
+            new_messages, error = 0, str(e)
+        self._record_poll(email_config['id'], started, new_messages, error)
+        return {'new_messages': new_messages, 'error': error}
+
+    async def sweep(self, email_configs: List[Dict[str, Any]], ingest: MailboxIngest) -> Dict[str, Any]:
+        """Poll every due mailbox concurrently and record the cycle time"""
+        due = self.due(email_configs)
+        started_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        results = await asyncio.gather(*[self._poll_one(email_config, ingest) for email_config in due])
+        cycle = {
+            'started_at': started_at.isoformat(),
+            'cycle_seconds': round(time.monotonic() - started, 3),
+            'mailboxes': len(email_configs),
+            'polled': len(due),
+            'new_messages': sum(result['new_messages'] for result in results),
+            'errors': sum(1 for result in results if result['error']),
+            'timeouts': sum(1 for result in results if result['error'] == "timeout")
+        }
+        if due:
+            self.cycles.append(cycle)
+        return cycle
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cycle time percentiles over recent sweeps and per-mailbox schedule state"""
+        durations = sorted(cycle['cycle_seconds'] for cycle in self.cycles)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not durations:
+                return None
+            return durations[min(len(durations) - 1, int(fraction * len(durations)))]
+
+        return {
+            'last_cycle': self.cycles[-1] if self.cycles else None,
+            'cycle_seconds': {
+                'p50': percentile(0.5),
+                'p95': percentile(0.95),
+                'max': durations[-1] if durations else None,
+                'sweeps': len(durations)
+            },
+            'connections_in_use': {host: count for host, count in self.in_use.items() if count},
+            'mailboxes': {
+                mailbox_id: {
+                    'interval_seconds': state['interval'],
+                    'quiet_polls': state['quiet_polls'],
+                    'last_polled_at': state['last_polled_at'],
+                    'last_duration_seconds': state['last_duration_seconds'],
+                    'last_new_messages': state['last_new_messages'],
+                    'last_error': state['last_error']
+                }
+                for mailbox_id, state in self.states.items()
+            }
+        }
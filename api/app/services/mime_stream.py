@@ -0,0 +1,231 @@
+import binascii
+from email.message import Message
+from email.parser import BytesHeaderParser
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from app.services.file_processor import FileProcessor, FileSpool
+
+
+# Limits on what is kept in memory for one message; attachment bodies are
+# never held, only written through to their spool files
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class TransferDecoder:
+    """Decodes a Content-Transfer-Encoding one line at a time"""
+
+    def __init__(self, encoding: Optional[str]):
+        self.encoding = (encoding or '7bit').strip().lower()
+        self._pending = b''
+        self._newline = False
+
+    def feed(self, line: bytes) -> bytes:
+        """Decode one line of the part body, without its line ending"""
+        if self.encoding == 'base64':
+            self._pending += b''.join(line.split())
+            usable = len(self._pending) - len(self._pending) % 4
+            chunk, self._pending = self._pending[:usable], self._pending[usable:]
+            return binascii.a2b_base64(chunk) if chunk else b''
+
+        # The line break before a boundary belongs to the boundary, so each
+        # line's break is only written once another line follows it
+        out = b'\n' if self._newline else b''
+        if self.encoding == 'quoted-printable':
+            if line.endswith(b'='):
+                # Soft line break
+                self._newline = False
+                return out + binascii.a2b_qp(line[:-1])
+            self._newline = True
+            return out + binascii.a2b_qp(line)
+        self._newline = True
+        return out + line
+
+    def flush(self) -> bytes:
+        """Decode whatever is left at the end of the part"""
+        if self.encoding != 'base64' or not self._pending:
+            return b''
+        pending, self._pending = self._pending, b''
+        try:
+            return binascii.a2b_base64(pending + b'=' * (-len(pending) % 4))
+        except binascii.Error:
+            return b''
+
+
+class StreamingMimeParser:
+    """Parses a message fed line by line, spooling resume attachments to disk.
+
+    Only the headers of each part and up to MAX_BODY_BYTES of plain text
+    body are kept. Attachments of a supported file type are decoded as the
+    lines arrive and written straight to the upload directory through
+    FileProcessor, with their sha256 computed on the way, so memory stays
+    bounded however many or large the attachments are. Other attachments
+    are read past without being stored.
+    """
+
+    def __init__(self, file_processor: FileProcessor):
+        self.file_processor = file_processor
+        self.headers: Optional[Message] = None
+        self.attachments: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self._boundaries: List[bytes] = []
+        self._state = 'headers'
+        self._header_lines: List[bytes] = []
+        self._header_size = 0
+        self._decoder: Optional[TransferDecoder] = None
+        self._spool: Optional[FileSpool] = None
+        self._attachment: Optional[Dict[str, Any]] = None
+        self._body_part: Optional[bytearray] = None
+        self._body_charset = 'utf-8'
+        self._body: List[str] = []
+        self._body_size = 0
+
+    def feed(self, line: bytes) -> None:
+        """Consume one line of the message, without its line ending.
+
+        After an error the remaining lines are still accepted and ignored,
+        so a caller reading from a mail session keeps it in step.
+        """
+        if self.error is not None:
+            return
+        try:
+            self._feed(line)
+        except Exception as e:
+            self.error = str(e)
+            self.discard()
+
+    def _feed(self, line: bytes) -> None:
+        if self._boundaries and line.startswith(b'--'):
+            marker = line.rstrip()
+            # A boundary of an outer multipart also closes every inner one
+            for depth in range(len(self._boundaries) - 1, -1, -1):
+                boundary = self._boundaries[depth]
+                if marker == b'--' + boundary:
+                    self._end_part()
+                    del self._boundaries[depth + 1:]
+                    self._start_headers()
+                    return
+                if marker == b'--' + boundary + b'--':
+                    self._end_part()
+                    del self._boundaries[depth:]
+                    self._state = 'skip'
+                    return
+
+        if self._state == 'headers':
+            if not line.rstrip(b'\r'):
+                self._end_headers()
+            elif self._header_size < MAX_HEADER_BYTES:
+                self._header_lines.append(line)
+                self._header_size += len(line)
+        elif self._state == 'body':
+            self._write(self._decoder.feed(line))
+
+    def _start_headers(self) -> None:
+        self._state = 'headers'
+        self._header_lines = []
+        self._header_size = 0
+
+    def _end_headers(self) -> None:
+        """Decide from a part's headers what happens to its body"""
+        part = BytesHeaderParser().parsebytes(b'\n'.join(self._header_lines) + b'\n\n')
+        if self.headers is None:
+            self.headers = part
+        self._header_lines = []
+        self._state = 'skip'
+
+        if part.get_content_maintype() == 'multipart':
+            boundary = part.get_boundary()
+            if boundary:
+                # The preamble up to the first boundary is skipped
+                self._boundaries.append(boundary.encode('ascii', errors='ignore'))
+            return
+        if part.get_content_type() == 'message/rfc822':
+            # An attached message's own headers follow straight away
+            self._start_headers()
+            return
+
+        decoder = TransferDecoder(part.get('Content-Transfer-Encoding'))
+        filename = part.get_filename() if self._boundaries else None
+        if filename:
+            file_type = Path(filename).suffix.lower().lstrip('.')
+            if file_type not in self.file_processor.supported_types:
+                return
+            success, message, spool = self.file_processor.open_spool(filename, file_type)
+            if not success:
+                print(f"Skipping attachment {filename}: {message}")
+                return
+            self._spool = spool
+            self._attachment = {'filename': filename, 'content_type': part.get_content_type()}
+        elif not self._boundaries or part.get_content_type() == 'text/plain':
+            self._body_part = bytearray()
+            self._body_charset = part.get_content_charset() or 'utf-8'
+        else:
+            return
+        self._decoder = decoder
+        self._state = 'body'
+
+    def _write(self, data: bytes) -> None:
+        if self._spool is not None:
+            self._spool.write(data)
+        elif self._body_part is not None and self._body_size < MAX_BODY_BYTES:
+            data = data[:MAX_BODY_BYTES - self._body_size]
+            self._body_part.extend(data)
+            self._body_size += len(data)
+
+    def _end_part(self) -> None:
+        """Finish the part being read, completing its spool file or body text"""
+        if self._state != 'body':
+            return
+        self._write(self._decoder.flush())
+        if self._spool is not None:
+            spool, self._spool = self._spool, None
+            success, message = spool.finish()
+            if success:
+                self.attachments.append({
+                    **self._attachment,
+                    'path': str(spool.path),
+                    'size': spool.size,
+                    'sha256': spool.sha256.hexdigest()
+                })
+            else:
+                print(f"Skipping attachment {self._attachment['filename']}: {message}")
+        elif self._body_part is not None:
+            try:
+                self._body.append(self._body_part.decode(self._body_charset, errors='ignore'))
+            except LookupError:
+                self._body.append(self._body_part.decode('utf-8', errors='ignore'))
+            self._body_part = None
+        self._decoder = None
+        self._state = 'skip'
+
+    def close(self) -> Optional[Dict[str, Any]]:
+        """Finish the message and get its fields, or None if it could not be parsed"""
+        if self.error is None:
+            try:
+                self._end_part()
+            except Exception as e:
+                self.error = str(e)
+                self.discard()
+        if self.error is not None:
+            print(f"Error parsing email: {self.error}")
+            return None
+        if self.headers is None:
+            return None
+        return {
+            'subject': self.headers.get('Subject', ''),
+            'from_email': self.headers.get('From', ''),
+            'to_email': self.headers.get('To', ''),
+            'date': self.headers.get('Date', ''),
+            'message_id': self.headers.get('Message-ID', '').strip(),
+            'body': ''.join(self._body),
+            'attachments': self.attachments
+        }
+
+    def discard(self) -> None:
+        """Remove every file spooled for this message"""
+        if self._spool is not None:
+            self._spool.discard()
+            self._spool = None
+        for attachment in self.attachments:
+            self.file_processor.delete_file(attachment['path'])
+        self.attachments = []
@@ -0,0 +1,345 @@
+import asyncio
+import hashlib
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import or_, text
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models.email_config import EmailConfig
+from app.models.email_response import EmailResponse
+from app.models.resume_submission import ResumeSubmission
+from app.services.smtp_pool import SmtpConnectionPool, resolve_smtp_settings
+
+
+DELIVERY_PENDING = "pending"
+DELIVERY_SENDING = "sending"
+DELIVERY_SENT = "sent"
+DELIVERY_FAILED = "failed"
+
+
+class TokenBucket:
+    """Allows a steady number of sends per minute with short bursts"""
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * settings.outbox_burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self) -> bool:
+        self._refill()
+        return self.tokens >= 1
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def seconds_until_available(self) -> float:
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class OutboundMailer:
+    """Sends queued candidate responses within SMTP rate limits.
+
+    The respond stage only queues EmailResponse rows as pending, with a
+    send_after time. This mailer sends rows once send_after has passed,
+    keeping each sending account under OUTBOX_ACCOUNT_RATE_LIMIT and each
+    provider (EmailConfig.email_provider) under its OUTBOX_PROVIDER_RATE_LIMITS
+    entry. Rows over the limit are pushed back to when a token frees up.
+    Failed sends retry with backoff up to OUTBOX_MAX_ATTEMPTS, and 5xx
+    rejections fail at once. Only the process holding the mailer's advisory
+    lock sends, so the limits hold across the cluster. The lock is checked
+    before every batch, and rows claimed for sending are only sent again
+    once their claim is older than OUTBOX_CLAIM_TIMEOUT.
+    """
+
+    def __init__(self, pipeline):
+        self.email_processor = pipeline.email_processor
+        self.smtp_pool: SmtpConnectionPool = self.email_processor.smtp_pool
+        self.account_buckets: Dict[Any, TokenBucket] = {}
+        self.provider_buckets: Dict[str, TokenBucket] = {}
+        self.is_leader = False
+        self.stats = {'sent': 0, 'failed': 0, 'retried': 0, 'deferred': 0}
+        self._stop_event: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock_connection = None
+
+    async def start(self) -> None:
+        """Start sending in the background"""
+        self._stop_event = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="outbound-mailer")
+
+    async def stop(self) -> None:
+        """Finish the batch being sent, then stop and give up the lock"""
+        if self._stop_event is None:
+            return
+        self._stop_event.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.to_thread(self._release_lead)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get send counters and whether this process is the sender"""
+        return {**self.stats, 'is_leader': self.is_leader}
+
+    async def _run(self) -> None:
+        while not self._stop_event.is_set():
+            wait = settings.outbox_poll_interval
+            try:
+                if self.is_leader and not await asyncio.to_thread(self._still_leading):
+                    print("Outbound mailer lost its lock; stopping sends")
+                    await asyncio.to_thread(self._release_lead)
+                if not self.is_leader:
+                    self.is_leader = await asyncio.to_thread(self._try_lead)
+                if self.is_leader:
+                    # Claims of a sender that died mid-batch are free again once they time out
+                    await asyncio.to_thread(self._release_stale_claims)
+                    wait = await self.dispatch_once()
+            except Exception as e:
+                print(f"Error sending queued email: {str(e)}")
+                # Start over on a fresh lock connection
+                await asyncio.to_thread(self._release_lead)
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def _bucket(self, buckets: Dict[Any, TokenBucket], key: Any, per_minute: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None or bucket.rate != per_minute / 60.0:
+            bucket = buckets[key] = TokenBucket(per_minute)
+        return bucket
+
+    async def dispatch_once(self) -> float:
+        """Send one batch of due responses and return how long to wait before the next"""
+        due = await asyncio.to_thread(self._load_due, settings.outbox_batch_size)
+        batches: Dict[Any, List[Dict[str, Any]]] = {}
+        deferred: Dict[str, float] = {}
+        for response in due:
+            smtp_settings = resolve_smtp_settings(response['email_config'])
+            account = self.smtp_pool.pool_key(smtp_settings)
+            provider = response['email_provider']
+            account_bucket = self._bucket(self.account_buckets, account, settings.outbox_account_rate_limit)
+            provider_bucket = self._bucket(
+                self.provider_buckets, provider,
+                settings.outbox_provider_rate_limits.get(provider, settings.outbox_default_provider_rate_limit)
+            )
+            if not (account_bucket.available() and provider_bucket.available()):
+                deferred[response['id']] = max(
+                    account_bucket.seconds_until_available(), provider_bucket.seconds_until_available()
+                )
+                continue
+            account_bucket.take()
+            provider_bucket.take()
+            batches.setdefault(account, []).append(response)
+
+        if deferred:
+            self.stats['deferred'] += len(deferred)
+            await asyncio.to_thread(self._defer, deferred)
+        claimed = await asyncio.to_thread(
+            self._claim, [response['id'] for batch in batches.values() for response in batch]
+        )
+        await asyncio.gather(*[
+            self._send_batch([response for response in batch if response['id'] in claimed])
+            for batch in batches.values()
+        ])
+
+        if len(due) >= settings.outbox_batch_size:
+            # More is due already
+            return 0.0
+        return settings.outbox_poll_interval
+
+    async def _send_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """Send one account's responses over a single pooled session"""
+        if not batch:
+            return
+        deliveries = await asyncio.to_thread(self.email_processor.send_many, [
+            {'to_email': response['recipient_email'], 'subject': response['subject'], 'body': response['body']}
+            for response in batch
+        ], batch[0]['email_config'])
+        await asyncio.to_thread(self._record, batch, deliveries)
+
+    def retry_delay(self, attempts: int) -> float:
+        """Get a jittered exponential backoff delay before the next attempt"""
+        ceiling = min(settings.outbox_retry_max_delay, settings.outbox_retry_base_delay * (2 ** (attempts - 1)))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    # Database helpers (run in worker threads)
+
+    def _load_due(self, limit: int) -> List[Dict[str, Any]]:
+        """Load pending responses whose send time has come, oldest first"""
+        db = SessionLocal()
+        try:
+            rows = db.query(EmailResponse, EmailConfig).outerjoin(
+                ResumeSubmission, EmailResponse.resume_submission_id == ResumeSubmission.id
+            ).outerjoin(
+                EmailConfig, ResumeSubmission.email_config_id == EmailConfig.id
+            ).filter(
+                EmailResponse.delivery_status == DELIVERY_PENDING,
+                EmailResponse.send_after <= datetime.now(timezone.utc)
+            ).order_by(EmailResponse.send_after).limit(limit).all()
+            return [
+                {
+                    'id': str(email_response.id),
+                    'resume_submission_id': email_response.resume_submission_id,
+                    'recipient_email': email_response.recipient_email,
+                    'subject': email_response.subject or '',
+                    'body': email_response.body or '',
+                    'attempts': email_response.attempts or 0,
+                    'created_at': email_response.created_at,
+                    'email_provider': (email_config.email_provider or "").lower() if email_config is not None else "",
+                    'email_config': {
+                        'smtp_host': email_config.smtp_host,
+                        'smtp_port': email_config.smtp_port,
+                        'smtp_username': email_config.smtp_username,
+                        'smtp_password': email_config.smtp_password
+                    } if email_config is not None else None
+                }
+                for email_response, email_config in rows
+            ]
+        finally:
+            db.close()
+
+    def _defer(self, deferred: Dict[str, float]) -> None:
+        """Push rate-limited responses back until their limit frees up"""
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            for email_response_id, delay in deferred.items():
+                db.query(EmailResponse).filter(
+                    EmailResponse.id == email_response_id,
+                    EmailResponse.delivery_status == DELIVERY_PENDING
+                ).update({'send_after': now + timedelta(seconds=delay)}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _claim(self, email_response_ids: List[str]) -> set:
+        """Mark responses as being sent, returning the ids that were still pending"""
+        if not email_response_ids:
+            return set()
+        db = SessionLocal()
+        try:
+            claimed = db.execute(
+                EmailResponse.__table__.update().where(
+                    EmailResponse.id.in_(email_response_ids),
+                    EmailResponse.delivery_status == DELIVERY_PENDING
+                ).values(
+                    delivery_status=DELIVERY_SENDING, claimed_at=datetime.now(timezone.utc)
+                ).returning(EmailResponse.id)
+            ).scalars().all()
+            db.commit()
+            return {str(email_response_id) for email_response_id in claimed}
+        finally:
+            db.close()
+
+    def _record(self, batch: List[Dict[str, Any]], deliveries: List[Dict[str, Any]]) -> None:
+        """Write each send outcome, rescheduling failures that have attempts left"""
+        # The pipeline module imports this one
+        from app.services.pipeline import record_stage_timing
+
+        db = SessionLocal()
+        try:
+            now = datetime.now(timezone.utc)
+            for response, delivery in zip(batch, deliveries):
+                email_response = db.query(EmailResponse).filter(EmailResponse.id == response['id']).first()
+                if email_response is None:
+                    continue
+                email_response.attempts = (email_response.attempts or 0) + 1
+                email_response.error_message = delivery['error']
+                if delivery['status'] == DELIVERY_SENT:
+                    email_response.delivery_status = DELIVERY_SENT
+                    email_response.sent_at = now
+                    self.stats['sent'] += 1
+                    if email_response.resume_submission_id is not None:
+                        record_stage_timing(db, email_response.resume_submission_id, "sent",
+                                            email_response.created_at, now)
+                elif delivery['permanent'] or email_response.attempts >= settings.outbox_max_attempts:
+                    email_response.delivery_status = DELIVERY_FAILED
+                    self.stats['failed'] += 1
+                else:
+                    email_response.delivery_status = DELIVERY_PENDING
+                    email_response.send_after = now + timedelta(seconds=self.retry_delay(email_response.attempts))
+                    self.stats['retried'] += 1
+            db.commit()
+        finally:
+            db.close()
+
+    def _release_stale_claims(self) -> None:
+        """Return responses left in sending by a dead sender to the queue.
+
+        Only claims older than OUTBOX_CLAIM_TIMEOUT are released: a sender
+        that lost the lock may still be sending younger ones.
+        """
+        db = SessionLocal()
+        try:
+            stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.outbox_claim_timeout)
+            db.query(EmailResponse).filter(
+                EmailResponse.delivery_status == DELIVERY_SENDING,
+                or_(EmailResponse.claimed_at.is_(None), EmailResponse.claimed_at < stale_before)
+            ).update({'delivery_status': DELIVERY_PENDING}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def lock_key() -> int:
+        """Postgres advisory lock key held by the sending process"""
+        digest = hashlib.sha256(b"outbound_mailer").digest()
+        return int.from_bytes(digest[:8], "big", signed=True)
+
+    def _try_lead(self) -> bool:
+        """Take the mailer's advisory lock on a dedicated connection"""
+        connection = engine.connect()
+        try:
+            locked = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": self.lock_key()}
+            ).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not locked:
+            connection.close()
+            return False
+        self._lock_connection = connection
+        return True
+
+    def _still_leading(self) -> bool:
+        """Check that the lock connection is alive and its session still holds the lock"""
+        key = self.lock_key()
+        try:
+            # pg_locks shows a bigint advisory key as its high and low 32 bits
+            held = self._lock_connection.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_locks WHERE locktype = 'advisory' AND granted"
+                " AND pid = pg_backend_pid() AND classid = CAST(:high AS oid)"
+                " AND objid = CAST(:low AS oid) AND objsubid = 1)"
+            ), {"high": (key >> 32) & 0xFFFFFFFF, "low": key & 0xFFFFFFFF}).scalar()
+            self._lock_connection.commit()
+            return bool(held)
+        except Exception as e:
+            print(f"Error checking outbound mailer lock: {str(e)}")
+            return False
+
+    def _release_lead(self) -> None:
+        """Release the mailer's advisory lock and its connection"""
+        self.is_leader = False
+        if self._lock_connection is None:
+            return
+        try:
+            # Pooled connections outlive close(), so the lock is released explicitly
+            self._lock_connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.lock_key()})
+            self._lock_connection.commit()
+        except Exception as e:
+            print(f"Error releasing outbound mailer lock: {str(e)}")
+        finally:
+            self._lock_connection.close()
+            self._lock_connection = None
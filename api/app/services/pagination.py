@@ -0,0 +1,43 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id) -> str:
+    """An opaque token for the position after a row"""
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Get the (created_at, id) position a cursor points after"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), uuid.UUID(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def paginate(query, model, cursor: Optional[str], limit: int, response: Response) -> List[Any]:
+    """Get one page of a query, newest first, by keyset on (created_at, id).
+
+    Each page starts where the previous one ended instead of skipping rows,
+    so a deep page costs the same as the first. When there are more rows,
+    the cursor for the next page is set in the X-Next-Cursor header.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, row_id))
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows
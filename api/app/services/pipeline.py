@@ -0,0 +1,1109 @@
+import asyncio
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from app.config import settings
+from app.database import SessionLocal
+from app.models.email_config import EmailConfig
+from app.models.email_seen_uid import EmailSeenUid
+from app.models.email_response import EmailResponse
+from app.models.job_description import JobDescription
+from app.models.parsed_resume import ParsedResume
+from app.models.pipeline_stage_timing import PipelineStageTiming
+from app.models.resume_submission import ResumeSubmission
+from app.models.scoring_result import ScoringResult
+from app.models.stored_file import StoredFile
+from app.services.email_processor import EmailProcessor
+from app.services.file_processor import FileProcessor
+from app.services.imap_idle import ImapIdleWatcher
+from app.services.llm_scorer import LLMScorer
+from app.services.mailbox_poller import MailboxPoller
+from app.services.outbound_mailer import OutboundMailer
+from app.services.queue_backend import JOB_STAGE_PARSE, JOB_STAGE_SCORE, JOB_STAGES, QueueBackend, get_queue_backend
+from app.services.retry_policy import RetryPolicy
+from app.services.rollups import bump_daily_rollup, set_submission_status, submission_day
+from app.services.resume_parser import ResumeParser
+from app.services.template_engine import TemplateEngine, build_template_fields, get_template_engine
+
+
+StageHandler = Callable[[Dict[str, Any]], Awaitable[Optional[List[Dict[str, Any]]]]]
+ErrorHandler = Callable[[Dict[str, Any], Exception], Awaitable[None]]
+
+# Stages run by each worker role. Separate parse and score workers let the
+# autoscaler size the CPU bound and the LLM bound pools independently.
+ROLE_STAGES = {
+    "all": ["ingest", "store", "parse", "score", "respond"],
+    "ingest": ["ingest", "store"],
+    "parse": ["parse"],
+    "score": ["score", "respond"]
+}
+
+# Queue job stages leased by each worker role
+ROLE_JOB_STAGES = {
+    "all": JOB_STAGES,
+    "ingest": [],
+    "parse": [JOB_STAGE_PARSE],
+    "score": [JOB_STAGE_SCORE]
+}
+
+# Per-submission checkpoints, in order. Each is written in the same
+# transaction as the stage output, so a redelivered job resumes after the
+# last one instead of starting over from the attachment.
+CHECKPOINT_STORED = "stored"
+CHECKPOINT_PARSED = "parsed"
+CHECKPOINT_SCORED = "scored"
+CHECKPOINT_RESPONDED = "responded"
+CHECKPOINTS = [CHECKPOINT_STORED, CHECKPOINT_PARSED, CHECKPOINT_SCORED, CHECKPOINT_RESPONDED]
+
+# ParsedResume columns written from ResumeParser output, and copied when a
+# parse is reused for the same file content
+PARSED_RESUME_FIELDS = [
+    'raw_text', 'extracted_name', 'extracted_email', 'extracted_phone', 'extracted_linkedin',
+    'extracted_skills', 'extracted_experience', 'extracted_education', 'extracted_certifications',
+    'years_of_experience'
+]
+
+_running_pipeline: Optional["ResumePipeline"] = None
+
+
+def get_running_pipeline() -> Optional["ResumePipeline"]:
+    """Get the pipeline running in this process, if any"""
+    return _running_pipeline
+
+
+def parse_resume_file(file_path: str, file_type: str) -> Dict[str, Any]:
+    """Parse a stored resume file (runs inside the parse process pool)"""
+    with open(file_path, 'rb') as f:
+        file_content = f.read()
+    return ResumeParser().parse_resume(file_content, file_type)
+
+
+class PipelineStage:
+    """A pipeline stage with its own bounded queue and worker pool"""
+
+    def __init__(self, name: str, handler: StageHandler, concurrency: int, queue_size: int,
+                 error_handler: Optional[ErrorHandler] = None):
+        self.name = name
+        self.handler = handler
+        self.error_handler = error_handler
+        self.concurrency = concurrency
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.next_stage: Optional["PipelineStage"] = None
+        self.in_flight = 0
+        self.processed = 0
+        self.failed = 0
+        self._workers: List[asyncio.Task] = []
+
+    async def put(self, item: Dict[str, Any]) -> None:
+        """Enqueue an item, waiting while the stage queue is full"""
+        await self.queue.put(item)
+
+    def start(self) -> None:
+        """Start the stage workers"""
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"pipeline-{self.name}-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the stage workers"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _worker(self) -> None:
+        """Process items from the stage queue and hand results downstream"""
+        while True:
+            item = await self.queue.get()
+            self.in_flight += 1
+            try:
+                outputs = await self.handler(item)
+                self.processed += 1
+                # Putting into a full downstream queue blocks this worker, which
+                # in turn lets this stage's queue fill up: that is the backpressure.
+                if self.next_stage is not None:
+                    for output in outputs or []:
+                        await self.next_stage.put(output)
+            except Exception as e:
+                self.failed += 1
+                print(f"Error in pipeline stage {self.name}: {str(e)}")
+                if self.error_handler is not None:
+                    try:
+                        await self.error_handler(item, e)
+                    except Exception as handler_error:
+                        print(f"Error handling failure in stage {self.name}: {str(handler_error)}")
+            finally:
+                self.in_flight -= 1
+                self.queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and counters for monitoring"""
+        return {
+            'queue_depth': self.queue.qsize(),
+            'queue_size': self.queue.maxsize,
+            'concurrency': self.concurrency,
+            'in_flight': self.in_flight,
+            'processed': self.processed,
+            'failed': self.failed
+        }
+
+
+class ResumePipeline:
+    """Staged ingest -> store -> parse -> score -> respond runtime.
+
+    I/O bound stages run as asyncio workers (blocking calls are pushed to
+    threads), parsing runs in a process pool. Every stage has a bounded queue,
+    so a slow scoring stage eventually stalls mailbox ingestion.
+
+    Stored submissions go through the durable processing queue: the store
+    stage enqueues them and a dispatcher leases jobs into the parse stage
+    only as fast as the parse queue has room. A pipeline can run a single
+    role (see ROLE_STAGES); a parse worker then hands parsed jobs to the score
+    workers through the queue instead of in memory.
+    """
+
+    def __init__(self, queue_backend: Optional[QueueBackend] = None, role: str = "all"):
+        if role not in ROLE_STAGES:
+            raise ValueError(f"Unknown pipeline role: {role}")
+        self.role = role
+        self.email_processor = EmailProcessor()
+        self.file_processor = FileProcessor()
+        self.template_engine: TemplateEngine = get_template_engine()
+        self.queue_backend = queue_backend or get_queue_backend()
+        self.retry_policy = RetryPolicy()
+        self.llm_scorer: Optional[LLMScorer] = None
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.imap_watcher: Optional[ImapIdleWatcher] = None
+        self.outbound_mailer: Optional[OutboundMailer] = None
+        self.poller = MailboxPoller()
+        self.dedup_stats = {'files_reused': 0, 'bytes_saved': 0, 'parses_reused': 0}
+        self.stages: List[PipelineStage] = []
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        # Ids of leased jobs held by this process, whose leases the heartbeat extends
+        self._leased_jobs: set = set()
+        self._stop_event: Optional[asyncio.Event] = None
+        # Mailboxes being ingested, and per mailbox the uids handed to the
+        # store stage but not yet marked seen, so a poll doesn't refetch them
+        self._ingesting: set = set()
+        self._ingest_again: set = set()
+        self._in_flight_uids: Dict[str, set] = {}
+
+    def _build_stages(self) -> None:
+        """Create and link the pipeline stages"""
+        queue_size = settings.pipeline_queue_size
+        stages = [
+            PipelineStage("ingest", self._ingest, settings.pipeline_ingest_concurrency, queue_size),
+            PipelineStage("store", self._store, settings.pipeline_store_concurrency, queue_size),
+            PipelineStage("parse", self._parse, settings.pipeline_parse_workers, queue_size,
+                          error_handler=self._handle_job_failure),
+            PipelineStage("score", self._score, settings.pipeline_score_concurrency, queue_size,
+                          error_handler=self._handle_job_failure),
+            PipelineStage("respond", self._respond, settings.pipeline_respond_concurrency, queue_size,
+                          error_handler=self._handle_job_failure),
+        ]
+        self.stages = [stage for stage in stages if stage.name in ROLE_STAGES[self.role]]
+        # The store stage hands off through the processing queue, not in memory
+        for stage, next_stage in zip(self.stages, self.stages[1:]):
+            if stage.name != "store":
+                stage.next_stage = next_stage
+
+    def has_stage(self, name: str) -> bool:
+        """Check whether this pipeline runs a stage"""
+        return any(stage.name == name for stage in self.stages)
+
+    def get_stage(self, name: str) -> PipelineStage:
+        """Get a stage by name"""
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-stage queue depths and counters"""
+        return {stage.name: stage.get_stats() for stage in self.stages}
+
+    async def _dispatch(self) -> None:
+        """Lease queued jobs into the parse or score stage as they free up"""
+        job_stages = ROLE_JOB_STAGES[self.role]
+        targets = [self.get_stage(job_stage) for job_stage in job_stages]
+        while True:
+            # Only lease once there is room, so leases don't expire while waiting in memory
+            if any(target.queue.full() for target in targets):
+                await asyncio.sleep(settings.pipeline_dispatch_idle_interval)
+                continue
+
+            try:
+                job = await asyncio.to_thread(self.queue_backend.lease, job_stages)
+            except Exception as e:
+                print(f"Error leasing job: {str(e)}")
+                job = None
+
+            if job is None:
+                await asyncio.sleep(settings.pipeline_dispatch_idle_interval)
+                continue
+
+            self._leased_jobs.add(job['id'])
+            await self.get_stage(job['stage']).put({'submission_id': job['resume_submission_id'], 'job': job})
+
+    async def _extend_leases(self) -> None:
+        """Keep extending the leases of held jobs until they are settled.
+
+        A job stays leased from dispatch until its last stage settles it, and
+        may wait in a stage queue for longer than the visibility timeout. Jobs
+        still held when the process dies are redelivered once their leases expire.
+        """
+        while True:
+            await asyncio.sleep(settings.queue_lease_heartbeat_interval)
+            for job_id in list(self._leased_jobs):
+                try:
+                    await asyncio.to_thread(self.queue_backend.extend, job_id)
+                except Exception as e:
+                    print(f"Error extending lease of job {job_id}: {str(e)}")
+
+    async def _settle_job(self, job_id: str, operation: Callable[..., None], *args: Any) -> None:
+        """Stop heartbeating a held job and ack, advance, retry or fail it"""
+        self._leased_jobs.discard(job_id)
+        await asyncio.to_thread(operation, job_id, *args)
+
+    async def start(self) -> None:
+        """Start the process pool and all stage workers"""
+        global _running_pipeline
+        self._build_stages()
+        if self.has_stage("score"):
+            self.llm_scorer = LLMScorer()
+        if self.has_stage("parse"):
+            self.process_pool = ProcessPoolExecutor(max_workers=settings.pipeline_parse_workers)
+        for stage in self.stages:
+            stage.start()
+        if ROLE_JOB_STAGES[self.role]:
+            self._dispatcher = asyncio.create_task(self._dispatch(), name="pipeline-dispatcher")
+            self._heartbeat = asyncio.create_task(self._extend_leases(), name="pipeline-lease-heartbeat")
+        self._stop_event = asyncio.Event()
+        if self.has_stage("ingest"):
+            self.imap_watcher = ImapIdleWatcher(self)
+            await self.imap_watcher.start()
+        if self.has_stage("respond"):
+            self.outbound_mailer = OutboundMailer(self)
+            await self.outbound_mailer.start()
+        _running_pipeline = self
+
+    def request_shutdown(self) -> None:
+        """Ask a running pipeline to stop taking work and drain"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    async def _drain_for_shutdown(self) -> None:
+        """Stop leasing new jobs and let in-flight items finish"""
+        if self.imap_watcher is not None:
+            await self.imap_watcher.stop()
+        if self.outbound_mailer is not None:
+            await self.outbound_mailer.stop()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        try:
+            await asyncio.wait_for(self.drain(), timeout=settings.worker_drain_timeout)
+        except asyncio.TimeoutError:
+            # Unfinished jobs are redelivered once their leases expire
+            print("Pipeline drain timed out, stopping with work in flight")
+
+    async def stop(self) -> None:
+        """Stop all stage workers and the process pool"""
+        global _running_pipeline
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self.imap_watcher is not None:
+            await self.imap_watcher.stop()
+            self.imap_watcher = None
+        if self.outbound_mailer is not None:
+            await self.outbound_mailer.stop()
+            self.outbound_mailer = None
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for stage in self.stages:
+            await stage.stop()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            await asyncio.gather(self._heartbeat, return_exceptions=True)
+            self._heartbeat = None
+        self._leased_jobs.clear()
+        await asyncio.to_thread(self.email_processor.smtp_pool.close_all)
+        if self.process_pool is not None:
+            self.process_pool.shutdown(wait=True)
+            self.process_pool = None
+        if _running_pipeline is self:
+            _running_pipeline = None
+
+    async def drain(self) -> None:
+        """Wait until every stage queue is empty"""
+        for stage in self.stages:
+            await stage.queue.join()
+
+    async def submit_mailbox(self, email_config: Dict[str, Any]) -> None:
+        """Queue a mailbox for ingestion, waiting if ingestion is backed up"""
+        await self.get_stage("ingest").put({'email_config': email_config})
+
+    async def poll_mailboxes(self) -> Dict[str, Any]:
+        """Sweep the active POP3 mailboxes that are due (IMAP ones are watched with IDLE).
+
+        Returns the sweep's cycle time and counts.
+        """
+        email_configs = await asyncio.to_thread(self._load_active_email_configs, "pop3")
+        return await self.poller.sweep(email_configs, self._ingest_mailbox)
+
+    async def run(self, poll_interval: Optional[int] = None, poll_mailboxes: bool = True) -> None:
+        """Run the pipeline until request_shutdown.
+
+        If this role ingests, POP3 mailboxes are swept whenever one is due,
+        with poll_interval as the base interval that quiet mailboxes back off
+        from. With poll_mailboxes False, polling is left to the task scheduler.
+        """
+        poll_interval = poll_interval or settings.pipeline_poll_interval
+        self.poller.base_interval = poll_interval
+        await self.start()
+        try:
+            while not self._stop_event.is_set():
+                wait = poll_interval
+                if poll_mailboxes and self.has_stage("ingest"):
+                    await self.poll_mailboxes()
+                    wait = max(1.0, min(poll_interval, self.poller.seconds_until_due()))
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+            await self._drain_for_shutdown()
+        finally:
+            await self.stop()
+
+    # Stage handlers
+
+    async def _ingest(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Ingest a mailbox queued by the IMAP IDLE watcher"""
+        await self._ingest_mailbox(item['email_config'])
+        return []
+
+    async def _ingest_mailbox(self, email_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Fetch a mailbox's unseen emails batch by batch into the store stage.
+
+        Each batch is a separate mail session run through the poller's
+        connection limits, and the next one is only fetched once the store
+        stage has taken this one, so a burst of mail drains at the pace the
+        pipeline can absorb. Returns how many messages were handed on or
+        skipped, and the error that cut the fetch short, if any.
+        """
+        mailbox_id = email_config['id']
+        counts = {'fetched': 0, 'skipped': 0, 'batches': 0, 'error': None}
+        if mailbox_id in self._ingesting:
+            # The running ingest fetches once more before it finishes, so
+            # mail that arrived after its uid listing is not missed
+            self._ingest_again.add(mailbox_id)
+            return counts
+
+        self._ingesting.add(mailbox_id)
+        try:
+            seen_uids = await asyncio.to_thread(self._load_seen_uids, mailbox_id)
+            in_flight = self._in_flight_uids.setdefault(mailbox_id, set())
+            store_stage = self.get_stage("store")
+            pruned = False
+            if email_config.get('ingest_protocol') == "imap":
+                fetch_emails = self.email_processor.fetch_imap_emails
+            else:
+                fetch_emails = self.email_processor.fetch_emails
+            while True:
+                self._ingest_again.discard(mailbox_id)
+                try:
+                    result = await self.poller.fetch(email_config, fetch_emails, seen_uids | in_flight)
+                except asyncio.TimeoutError:
+                    counts['error'] = "timeout"
+                    break
+                fetched_at = datetime.now(timezone.utc)
+                counts['batches'] += 1
+                if result['error']:
+                    counts['error'] = "timeout" if "timed out" in result['error'].lower() else result['error']
+                if result['server_uids'] is not None and not pruned:
+                    await asyncio.to_thread(self._prune_seen_uids, mailbox_id, result['server_uids'])
+                    pruned = True
+
+                skipped_uids = list(result['skipped_uids'])
+                for email_data in result['emails']:
+                    attachments = []
+                    for attachment in email_data.get('attachments', []):
+                        file_type = Path(attachment['filename']).suffix.lower().lstrip('.')
+                        if file_type in self.file_processor.supported_types:
+                            attachments.append({'attachment': attachment, 'file_type': file_type})
+                    if not attachments:
+                        skipped_uids.append(email_data['uid'])
+                        continue
+
+                    in_flight.add(email_data['uid'])
+                    seen_uids.add(email_data['uid'])
+                    counts['fetched'] += 1
+                    await store_stage.put({
+                        'email_config': email_config,
+                        'email': email_data,
+                        'attachments': attachments,
+                        'received_at': parse_email_date(email_data.get('date')),
+                        'fetched_at': fetched_at
+                    })
+
+                if skipped_uids:
+                    await asyncio.to_thread(self._mark_uids_seen, mailbox_id, skipped_uids)
+                    seen_uids.update(skipped_uids)
+                    counts['skipped'] += len(skipped_uids)
+                if self._stop_event.is_set() or result['error']:
+                    break
+                if not result['remaining'] and mailbox_id not in self._ingest_again:
+                    break
+        finally:
+            self._ingesting.discard(mailbox_id)
+        return counts
+
+    async def _store(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Save an email's resume attachments, enqueue them, then mark the email seen.
+
+        The uid is only marked once every attachment is stored, so mail that
+        fails part way is fetched again on the next poll; attachments that
+        did get stored then collapse as duplicates.
+        """
+        mailbox_id = item['email_config']['id']
+        uid = item['email']['uid']
+        stored = 0
+        try:
+            for attachment in item['attachments']:
+                submission_id = await asyncio.to_thread(self._store_submission, {**item, **attachment})
+                stored += 1
+                if submission_id:
+                    await asyncio.to_thread(self.queue_backend.enqueue, submission_id)
+            await asyncio.to_thread(self._mark_uids_seen, mailbox_id, [uid])
+        except Exception:
+            # The refetch spools its own copies of the attachments not yet stored
+            for attachment in item['attachments'][stored:]:
+                self.file_processor.delete_file(attachment['attachment']['path'])
+            raise
+        finally:
+            self._in_flight_uids.get(mailbox_id, set()).discard(uid)
+        return []
+
+    async def _parse(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Parse the stored resume in the process pool"""
+        submission = await asyncio.to_thread(self._start_processing, item['submission_id'])
+        if submission is None:
+            await self._settle_job(item['job']['id'], self.queue_backend.fail, "Resume submission not found")
+            return []
+
+        if reached_checkpoint(submission['pipeline_stage'], CHECKPOINT_PARSED):
+            # Parsed before the previous attempt stopped; go straight to scoring
+            has_job = submission['job_description_id'] is not None
+        else:
+            parse_started_at = datetime.now(timezone.utc)
+            parsed_data = None
+            if submission['stored_file_id'] is not None:
+                # The same file may have been parsed for another submission
+                parsed_data = await asyncio.to_thread(self._load_stored_parse, submission['stored_file_id'])
+            if parsed_data is None:
+                loop = asyncio.get_running_loop()
+                parsed_data = await loop.run_in_executor(
+                    self.process_pool, parse_resume_file, submission['attachment_path'], submission['file_type']
+                )
+            has_job = await asyncio.to_thread(
+                self._save_parsed_resume, item['submission_id'], parsed_data, parse_started_at
+            )
+
+        if not has_job:
+            await self._settle_job(item['job']['id'], self.queue_backend.ack)
+            return []
+        if not self.has_stage("score"):
+            await self._settle_job(item['job']['id'], self.queue_backend.advance, JOB_STAGE_SCORE)
+            return []
+        return [item]
+
+    async def _score(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Score the parsed resume against its job description"""
+        # A stored result means the LLM call already happened on an earlier attempt
+        scoring_result_id = await asyncio.to_thread(self._load_stored_scoring_result, item['submission_id'])
+        if scoring_result_id is None:
+            scoring_input = await asyncio.to_thread(self._load_scoring_input, item['submission_id'])
+            if scoring_input is None:
+                await self._settle_job(item['job']['id'], self.queue_backend.fail, "Nothing to score")
+                return []
+
+            resume_data, job_description = scoring_input
+            score_started_at = datetime.now(timezone.utc)
+            scoring_data = await asyncio.to_thread(
+                self.llm_scorer.score_resume, resume_data, job_description, raise_on_rate_limit=True
+            )
+            scoring_result_id = await asyncio.to_thread(
+                self._save_scoring_result, item['submission_id'], scoring_data, score_started_at
+            )
+        return [{**item, 'scoring_result_id': scoring_result_id}]
+
+    async def _respond(self, item: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Queue the candidate response for the outbound mailer, then complete the job"""
+        respond_started_at = datetime.now(timezone.utc)
+        await asyncio.to_thread(
+            self._queue_email_response, item['submission_id'], item['scoring_result_id'], respond_started_at
+        )
+        # The job is only acked once its last stage is done, so a crash before
+        # this point redelivers it and it resumes from its checkpoint
+        await self._settle_job(item['job']['id'], self.queue_backend.ack)
+        return []
+
+    async def _handle_job_failure(self, item: Dict[str, Any], error: Exception) -> None:
+        """Retry a failed job with backoff, or dead-letter it once retries run out"""
+        job = item['job']
+        decision = self.retry_policy.decide(error, job)
+        error_message = f"{decision['failure_class']}: {str(error)}"
+
+        if decision['retry']:
+            await self._settle_job(
+                job['id'], self.queue_backend.retry, decision['delay_seconds'],
+                error_message, decision['failure_class']
+            )
+            await asyncio.to_thread(self._mark_retrying, item['submission_id'], error_message)
+        else:
+            await self._settle_job(
+                job['id'], self.queue_backend.dead_letter, error_message, decision['failure_class']
+            )
+            await asyncio.to_thread(self._mark_failed, item['submission_id'], error_message)
+
+    # Database helpers (run in worker threads)
+
+    def _load_active_email_configs(self, ingest_protocol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Load active mailboxes as plain dicts, optionally only those using one protocol"""
+        db = SessionLocal()
+        try:
+            query = db.query(EmailConfig).filter(EmailConfig.is_active == True)
+            if ingest_protocol is not None:
+                query = query.filter(func.coalesce(EmailConfig.ingest_protocol, "pop3") == ingest_protocol)
+            email_configs = query.all()
+            return [email_config_to_dict(email_config) for email_config in email_configs]
+        finally:
+            db.close()
+
+    def _load_seen_uids(self, email_config_id: str) -> set:
+        """Load the uids of a mailbox's messages that were already handled"""
+        db = SessionLocal()
+        try:
+            rows = db.query(EmailSeenUid.uid).filter(EmailSeenUid.email_config_id == email_config_id).all()
+            return {row.uid for row in rows}
+        finally:
+            db.close()
+
+    def _mark_uids_seen(self, email_config_id: str, uids: List[str]) -> None:
+        """Record messages as handled so later polls skip them"""
+        db = SessionLocal()
+        try:
+            statement = insert(EmailSeenUid).values([
+                {'email_config_id': email_config_id, 'uid': uid} for uid in uids
+            ]).on_conflict_do_nothing(index_elements=[EmailSeenUid.email_config_id, EmailSeenUid.uid])
+            db.execute(statement)
+            db.commit()
+        finally:
+            db.close()
+
+    def _prune_seen_uids(self, email_config_id: str, server_uids: List[str]) -> None:
+        """Forget seen uids of messages that are no longer on the server"""
+        db = SessionLocal()
+        try:
+            query = db.query(EmailSeenUid).filter(EmailSeenUid.email_config_id == email_config_id)
+            if server_uids:
+                query = query.filter(EmailSeenUid.uid.notin_(server_uids))
+            query.delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _store_submission(self, item: Dict[str, Any]) -> Optional[str]:
+        """Create the submission for an attachment spooled to disk at fetch time.
+
+        Returns None when the attachment is a duplicate of an existing
+        submission, so nothing new is queued and the spooled file is removed.
+        An attachment whose content is already stored is linked to that file,
+        and its spooled copy is removed once the submission is committed.
+        """
+        email_data = item['email']
+        attachment = item['attachment']
+        email_config_id = item['email_config']['id']
+        file_path = attachment['path']
+        store_started_at = datetime.now(timezone.utc)
+        idempotency_key = email_idempotency_key(email_data, attachment['sha256'])
+
+        if self._collapse_duplicate(email_config_id, idempotency_key):
+            self.file_processor.delete_file(file_path)
+            return None
+
+        db = SessionLocal()
+        try:
+            # A concurrent store of the same email wins the unique index; this
+            # insert then turns into a duplicate_count bump on its row
+            statement = insert(ResumeSubmission).values(
+                email_config_id=email_config_id,
+                candidate_email=parse_address(email_data.get('from_email', '')),
+                original_email_subject=(email_data.get('subject') or '')[:500],
+                original_email_body=email_data.get('body'),
+                attachment_filename=attachment['filename'],
+                attachment_path=file_path,
+                file_size_bytes=attachment['size'],
+                file_type=item['file_type'],
+                status="pending",
+                idempotency_key=idempotency_key
+            ).on_conflict_do_update(
+                index_elements=[ResumeSubmission.email_config_id, ResumeSubmission.idempotency_key],
+                set_={'duplicate_count': ResumeSubmission.duplicate_count + 1}
+            ).returning(ResumeSubmission.id, literal_column("xmax = 0"))
+            submission_id, inserted = db.execute(statement).one()
+            if not inserted:
+                db.commit()
+                self.file_processor.delete_file(file_path)
+                return None
+
+            bump_daily_rollup(db, item['email_config']['user_id'], submissions=1)
+            stored_file_id, stored_path = link_stored_file(db, attachment, item['file_type'])
+            db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).update(
+                {'stored_file_id': stored_file_id, 'attachment_path': stored_path},
+                synchronize_session=False
+            )
+            if item.get('received_at') is not None:
+                record_stage_timing(db, submission_id, "received", item['received_at'], item['fetched_at'])
+            record_stage_timing(db, submission_id, "stored", store_started_at, datetime.now(timezone.utc))
+            db.commit()
+            if stored_path != file_path:
+                self.file_processor.delete_file(file_path)
+                self.dedup_stats['files_reused'] += 1
+                self.dedup_stats['bytes_saved'] += attachment['size']
+            return str(submission_id)
+        except Exception:
+            db.rollback()
+            self.file_processor.delete_file(file_path)
+            raise
+        finally:
+            db.close()
+
+    def _collapse_duplicate(self, email_config_id: str, idempotency_key: str) -> bool:
+        """Count a repeat delivery against its existing submission, if there is one"""
+        db = SessionLocal()
+        try:
+            updated = db.query(ResumeSubmission).filter(
+                ResumeSubmission.email_config_id == email_config_id,
+                ResumeSubmission.idempotency_key == idempotency_key
+            ).update(
+                {'duplicate_count': ResumeSubmission.duplicate_count + 1},
+                synchronize_session=False
+            )
+            db.commit()
+            return updated > 0
+        finally:
+            db.close()
+
+    def _start_processing(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """Mark a submission as processing, or restore its status when resuming past a checkpoint"""
+        db = SessionLocal()
+        try:
+            submission = db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).first()
+            if submission is None:
+                return None
+
+            now = datetime.now(timezone.utc)
+            set_submission_status(db, submission, resumed_status(submission))
+            if not reached_checkpoint(submission.pipeline_stage, CHECKPOINT_PARSED):
+                submission.processing_started_at = now
+            # Time from enqueue until a worker first picked the job up. Recorded
+            # once per job, so redeliveries and retries don't add samples.
+            queue_entry = submission.processing_queue
+            if queue_entry is not None and queue_entry.created_at is not None:
+                already_recorded = db.query(PipelineStageTiming.id).filter(
+                    PipelineStageTiming.resume_submission_id == submission.id,
+                    PipelineStageTiming.stage == "queued"
+                ).first() is not None
+                if not already_recorded:
+                    record_stage_timing(db, submission.id, "queued", queue_entry.created_at, now)
+            db.commit()
+            return {
+                'attachment_path': submission.attachment_path,
+                'file_type': submission.file_type,
+                'stored_file_id': submission.stored_file_id,
+                'pipeline_stage': submission.pipeline_stage,
+                'job_description_id': submission.job_description_id
+            }
+        finally:
+            db.close()
+
+    def _load_stored_parse(self, stored_file_id) -> Optional[Dict[str, Any]]:
+        """Copy the parse of another submission of the same file, if there is one"""
+        db = SessionLocal()
+        try:
+            parsed_resume = db.query(ParsedResume).join(
+                ResumeSubmission, ParsedResume.resume_submission_id == ResumeSubmission.id
+            ).filter(
+                ResumeSubmission.stored_file_id == stored_file_id
+            ).order_by(ParsedResume.parsed_at.desc()).first()
+            if parsed_resume is None:
+                return None
+            self.dedup_stats['parses_reused'] += 1
+            return {field: getattr(parsed_resume, field) for field in PARSED_RESUME_FIELDS}
+        finally:
+            db.close()
+
+    def _save_parsed_resume(self, submission_id: str, parsed_data: Dict[str, Any], started_at: datetime) -> bool:
+        """Store the parse result, returning whether the submission can be scored"""
+        db = SessionLocal()
+        try:
+            submission = db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).first()
+            db.add(ParsedResume(resume_submission_id=submission.id, **parsed_data))
+            submission.pipeline_stage = CHECKPOINT_PARSED
+
+            if parsed_data.get('extracted_name') and not submission.candidate_name:
+                submission.candidate_name = parsed_data['extracted_name']
+            if parsed_data.get('extracted_email') and not submission.candidate_email:
+                submission.candidate_email = parsed_data['extracted_email']
+
+            job_description = resolve_job_description(db, submission)
+            if job_description is None:
+                # Nothing to score against; the submission waits for manual assignment
+                set_submission_status(db, submission, "parsed")
+            else:
+                submission.job_description_id = job_description.id
+            record_stage_timing(db, submission.id, "parsed", started_at, datetime.now(timezone.utc))
+            db.commit()
+            return job_description is not None
+        finally:
+            db.close()
+
+    def _load_scoring_input(self, submission_id: str) -> Optional[tuple]:
+        """Load the parsed resume and job description as scorer inputs"""
+        db = SessionLocal()
+        try:
+            submission = db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).first()
+            if submission is None or submission.parsed_resume is None or submission.job_description is None:
+                return None
+            return parsed_resume_to_dict(submission.parsed_resume), job_description_to_dict(submission.job_description)
+        finally:
+            db.close()
+
+    def _load_stored_scoring_result(self, submission_id: str) -> Optional[str]:
+        """Get the id of a scoring result stored by an earlier attempt"""
+        db = SessionLocal()
+        try:
+            submission = db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).first()
+            if submission is None or not reached_checkpoint(submission.pipeline_stage, CHECKPOINT_SCORED):
+                return None
+            scoring_result = db.query(ScoringResult).filter(
+                ScoringResult.resume_submission_id == submission.id,
+                ScoringResult.job_description_id == submission.job_description_id
+            ).order_by(ScoringResult.created_at.desc()).first()
+            return str(scoring_result.id) if scoring_result else None
+        finally:
+            db.close()
+
+    def _save_scoring_result(self, submission_id: str, scoring_data: Dict[str, Any], started_at: datetime) -> str:
+        """Store the scoring result and complete the submission"""
+        db = SessionLocal()
+        try:
+            submission = db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).first()
+            red_flags = scoring_data.get('red_flags') or []
+            scoring_result = ScoringResult(
+                resume_submission_id=submission.id,
+                job_description_id=submission.job_description_id,
+                total_score=scoring_data.get('total_score', 0),
+                confidence_level=scoring_data.get('confidence_level'),
+                job_match_score=scoring_data.get('job_match_score'),
+                experience_score=scoring_data.get('experience_score'),
+                education_score=scoring_data.get('education_score'),
+                stability_score=scoring_data.get('stability_score'),
+                presentation_score=scoring_data.get('presentation_score'),
+                recommendation=scoring_data.get('recommendation'),
+                keyword_matches=scoring_data.get('keyword_matches'),
+                skill_gaps=scoring_data.get('skill_gaps'),
+                experience_analysis=scoring_data.get('experience_analysis'),
+                education_analysis=scoring_data.get('education_analysis'),
+                stability_analysis=scoring_data.get('stability_analysis'),
+                red_flags=red_flags,
+                red_flag_count=len(red_flags),
+                llm_analysis_text=scoring_data.get('llm_analysis_text'),
+                llm_prompt_used=scoring_data.get('llm_prompt_used')
+            )
+            db.add(scoring_result)
+            set_submission_status(
+                db, submission, "completed", score_sum=scoring_result.total_score, score_count=1
+            )
+
+            now = datetime.now(timezone.utc)
+            submission.pipeline_stage = CHECKPOINT_SCORED
+            submission.processing_completed_at = now
+            record_stage_timing(db, submission.id, "scored", started_at, now)
+            db.commit()
+            return str(scoring_result.id)
+        finally:
+            db.close()
+
+    def _queue_email_response(self, submission_id: str, scoring_result_id: str, started_at: datetime) -> None:
+        """Render the user's template for this recommendation into a pending EmailResponse row"""
+        db = SessionLocal()
+        try:
+            submission = db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).first()
+            scoring_result = db.query(ScoringResult).filter(ScoringResult.id == scoring_result_id).first()
+            if submission is None or scoring_result is None or submission.email_config is None:
+                return
+            if not submission.candidate_email:
+                return
+
+            existing = db.query(EmailResponse).filter(
+                EmailResponse.scoring_result_id == scoring_result.id
+            ).first()
+            if existing is not None:
+                # Queued by an attempt that stopped before acking its job
+                return
+
+            template = self.template_engine.select(
+                db, submission.email_config.user_id, scoring_result.recommendation
+            )
+            if template is None:
+                return
+
+            now = datetime.now(timezone.utc)
+            rendered = template.render(build_template_fields(submission, scoring_result))
+            db.add(EmailResponse(
+                resume_submission_id=submission.id,
+                scoring_result_id=scoring_result.id,
+                recipient_email=submission.candidate_email,
+                subject=rendered['subject'],
+                body=rendered['body'],
+                template_used=rendered['template_name'],
+                delivery_status="pending",
+                send_after=now + timedelta(seconds=settings.outbox_response_delay)
+            ))
+            bump_daily_rollup(db, submission.email_config.user_id, submission_day(submission), responses=1)
+            submission.pipeline_stage = CHECKPOINT_RESPONDED
+            record_stage_timing(db, submission.id, "responded", started_at, now)
+            db.commit()
+        finally:
+            db.close()
+
+    def _mark_retrying(self, submission_id: str, error_message: str) -> None:
+        """Return a submission to pending while its job waits for a retry.
+
+        A scored submission stays completed; only its response is retried.
+        """
+        db = SessionLocal()
+        try:
+            submission = db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).first()
+            if submission is None:
+                return
+            if not reached_checkpoint(submission.pipeline_stage, CHECKPOINT_SCORED):
+                set_submission_status(db, submission, "pending")
+            submission.error_message = error_message
+            db.commit()
+        finally:
+            db.close()
+
+    def _mark_failed(self, submission_id: str, error_message: str) -> None:
+        """Mark a submission as failed"""
+        db = SessionLocal()
+        try:
+            submission = db.query(ResumeSubmission).filter(ResumeSubmission.id == submission_id).first()
+            if submission is None:
+                return
+            set_submission_status(db, submission, "failed")
+            submission.error_message = error_message
+            db.commit()
+        finally:
+            db.close()
+
+
+def queue_email_responses(email_response_ids: List[str], send_at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Queue stored responses for the outbound mailer to send (again).
+
+    Responses already sent or being sent are left alone. Returns each
+    response's resulting {'id', 'delivery_status', 'send_after', 'error_message'}.
+    """
+    db = SessionLocal()
+    try:
+        send_after = send_at or datetime.now(timezone.utc)
+        email_responses = db.query(EmailResponse).filter(EmailResponse.id.in_(email_response_ids)).all()
+        for email_response in email_responses:
+            if email_response.delivery_status in ("sent", "sending"):
+                continue
+            email_response.delivery_status = "pending"
+            email_response.send_after = send_after
+            email_response.attempts = 0
+            email_response.error_message = None
+        db.commit()
+        return [
+            {
+                'id': str(email_response.id),
+                'delivery_status': email_response.delivery_status,
+                'send_after': email_response.send_after,
+                'error_message': email_response.error_message
+            }
+            for email_response in email_responses
+        ]
+    finally:
+        db.close()
+
+
+def reached_checkpoint(pipeline_stage: Optional[str], checkpoint: str) -> bool:
+    """Check whether a submission's stage marker is at or past a checkpoint"""
+    if pipeline_stage not in CHECKPOINTS:
+        return False
+    return CHECKPOINTS.index(pipeline_stage) >= CHECKPOINTS.index(checkpoint)
+
+
+def resumed_status(submission: ResumeSubmission) -> str:
+    """The status of a submission whose job is (re)starting, from its last checkpoint"""
+    if reached_checkpoint(submission.pipeline_stage, CHECKPOINT_SCORED):
+        return "completed"
+    if reached_checkpoint(submission.pipeline_stage, CHECKPOINT_PARSED) and submission.job_description_id is None:
+        # Parsed with nothing to score against; waits for manual assignment
+        return "parsed"
+    return "processing"
+
+
+def email_config_to_dict(email_config: EmailConfig) -> Dict[str, Any]:
+    """Convert an EmailConfig row into the dict EmailProcessor expects"""
+    return {
+        'id': str(email_config.id),
+        'user_id': str(email_config.user_id),
+        'email_address': email_config.email_address,
+        'email_provider': email_config.email_provider,
+        'pop3_host': email_config.pop3_host,
+        'pop3_port': email_config.pop3_port,
+        'pop3_username': email_config.pop3_username,
+        'pop3_password': email_config.pop3_password,
+        'ingest_protocol': email_config.ingest_protocol or "pop3",
+        'imap_host': email_config.imap_host,
+        'imap_port': email_config.imap_port,
+        'imap_username': email_config.imap_username,
+        'imap_password': email_config.imap_password,
+        'imap_folder': email_config.imap_folder or "INBOX",
+        'smtp_host': email_config.smtp_host,
+        'smtp_port': email_config.smtp_port,
+        'smtp_username': email_config.smtp_username,
+        'smtp_password': email_config.smtp_password
+    }
+
+
+def parsed_resume_to_dict(parsed_resume: ParsedResume) -> Dict[str, Any]:
+    """Convert a ParsedResume row into scorer input"""
+    return {
+        'raw_text': parsed_resume.raw_text or '',
+        'extracted_name': parsed_resume.extracted_name,
+        'extracted_email': parsed_resume.extracted_email,
+        'extracted_skills': parsed_resume.extracted_skills or [],
+        'extracted_experience': parsed_resume.extracted_experience or [],
+        'extracted_education': parsed_resume.extracted_education or [],
+        'extracted_certifications': parsed_resume.extracted_certifications or [],
+        'years_of_experience': parsed_resume.years_of_experience or 0
+    }
+
+
+def job_description_to_dict(job_description: JobDescription) -> Dict[str, Any]:
+    """Convert a JobDescription row into scorer input"""
+    return {
+        'title': job_description.title,
+        'company': job_description.company,
+        'description': job_description.description,
+        'requirements': job_description.requirements,
+        'skills_required': job_description.skills_required or [],
+        'experience_level': job_description.experience_level
+    }
+
+
+def record_stage_timing(db, submission_id, stage: str, started_at: datetime, completed_at: datetime) -> None:
+    """Add a stage timing row to the session"""
+    db.add(PipelineStageTiming(
+        resume_submission_id=submission_id,
+        stage=stage,
+        started_at=started_at,
+        completed_at=completed_at,
+        duration_ms=max(0, int((completed_at - started_at).total_seconds() * 1000))
+    ))
+
+
+def link_stored_file(db, attachment: Dict[str, Any], file_type: str) -> tuple:
+    """Find or record the stored copy of a spooled file's content.
+
+    attachment holds the spooled file's 'path', 'size' and 'sha256'.
+    Returns the stored file's id and path. Content stored before is reused
+    while its file is still on disk; otherwise the spooled file becomes the
+    stored copy. The caller removes the spooled file if the paths differ.
+    """
+    stored_file_id = db.execute(
+        insert(StoredFile).values(
+            sha256=attachment['sha256'],
+            file_path=attachment['path'],
+            file_size_bytes=attachment['size'],
+            file_type=file_type
+        ).on_conflict_do_nothing(index_elements=[StoredFile.sha256]).returning(StoredFile.id)
+    ).scalar()
+    if stored_file_id is not None:
+        return stored_file_id, attachment['path']
+
+    stored_file = db.query(StoredFile).filter(
+        StoredFile.sha256 == attachment['sha256']
+    ).with_for_update().one()
+    stored_file.last_seen_at = datetime.now(timezone.utc)
+    try:
+        # Upload retention then counts from the latest submission using the file
+        os.utime(stored_file.file_path)
+    except OSError:
+        # Removed by upload retention; the spooled copy takes its place
+        stored_file.file_path = attachment['path']
+        return stored_file.id, attachment['path']
+    stored_file.reuse_count = (stored_file.reuse_count or 0) + 1
+    return stored_file.id, stored_file.file_path
+
+
+def email_idempotency_key(email_data: Dict[str, Any], attachment_hash: str) -> str:
+    """Derive a submission key from the email's Message-ID and the attachment's sha256"""
+    message_id = email_data.get('message_id')
+    if not message_id:
+        # Without a Message-ID, fall back to headers that are stable across re-polls
+        message_id = "|".join(email_data.get(header) or '' for header in ('from_email', 'date', 'subject'))
+    return hashlib.sha256(f"{message_id}\n{attachment_hash}".encode()).hexdigest()
+
+
+def parse_email_date(header_value: Optional[str]) -> Optional[datetime]:
+    """Parse an email Date header into an aware datetime"""
+    from email.utils import parsedate_to_datetime
+    if not header_value:
+        return None
+    try:
+        date = parsedate_to_datetime(header_value)
+    except (TypeError, ValueError):
+        return None
+    return date if date.tzinfo else date.replace(tzinfo=timezone.utc)
+
+
+def parse_address(header_value: str) -> str:
+    """Extract the bare address from a From header"""
+    from email.utils import parseaddr
+    return parseaddr(header_value)[1] or header_value
+
+
+def resolve_job_description(db, submission: ResumeSubmission) -> Optional[JobDescription]:
+    """Find the job description a submission applies to"""
+    if submission.job_description_id:
+        return submission.job_description
+    if submission.email_config is None:
+        return None
+
+    # Match active job titles of the mailbox owner against the email subject
+    subject = (submission.original_email_subject or '').lower()
+    job_descriptions = db.query(JobDescription).filter(
+        JobDescription.user_id == submission.email_config.user_id,
+        JobDescription.is_active == True
+    ).all()
+    for job_description in job_descriptions:
+        if job_description.title and job_description.title.lower() in subject:
+            return job_description
+    return None
@@ -0,0 +1,802 @@
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+import redis
+from sqlalchemy import and_, func, insert, or_
+from app.config import settings
+from app.database import SessionLocal
+from app.models.email_config import EmailConfig
+from app.models.processing_queue import ProcessingQueue
+from app.models.resume_submission import ResumeSubmission
+from app.models.user import User
+
+
+# Worker pools lease jobs by stage. Listed in the order a worker that handles
+# every stage prefers them: finishing parsed resumes comes before parsing more.
+JOB_STAGE_SCORE = "score"
+JOB_STAGE_PARSE = "parse"
+JOB_STAGES = [JOB_STAGE_SCORE, JOB_STAGE_PARSE]
+
+# Tenant key for legacy jobs queued before jobs carried their owner
+SHARED_TENANT = "shared"
+
+
+def _job_to_dict(job: ProcessingQueue) -> Dict[str, Any]:
+    """Convert a ProcessingQueue row into a job dict"""
+    return {
+        'id': str(job.id),
+        'resume_submission_id': str(job.resume_submission_id),
+        'priority': job.priority or 0,
+        'stage': job.stage or JOB_STAGE_PARSE,
+        'retry_count': job.retry_count or 0,
+        'max_retries': job.max_retries if job.max_retries is not None else 3,
+        'user_id': str(job.user_id) if job.user_id else None
+    }
+
+
+def tenant_key(user_id: Optional[Any]) -> str:
+    """Get the fair-share tenant a job's owner is scheduled as"""
+    return str(user_id) if user_id else SHARED_TENANT
+
+
+def fair_share_order(tenants: Dict[str, Dict[str, Any]], shares: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Order tenants with ready jobs by weighted fair share.
+
+    A tenant's share is its in-flight job count divided by its weight; the
+    tenant furthest below its share goes first, and ties go to the tenant
+    whose oldest ready job has waited longest. Tenants at their concurrency
+    cap are left out.
+    """
+    eligible = []
+    for tenant, state in tenants.items():
+        share = shares.get(tenant, {})
+        weight = share.get('weight') or settings.queue_default_tenant_weight
+        cap = share.get('max_concurrent_jobs')
+        if cap is None:
+            cap = settings.queue_default_tenant_concurrency
+        if cap and state['in_flight'] >= cap:
+            continue
+        eligible.append((state['in_flight'] / weight, state['oldest_ready'], tenant))
+    return [tenant for _, _, tenant in sorted(eligible)]
+
+
+def load_tenant_shares(db, tenants: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Load the fair-share weight and concurrency cap of tenants"""
+    user_ids = [tenant for tenant in tenants if tenant != SHARED_TENANT]
+    if not user_ids:
+        return {}
+    rows = db.query(User.id, User.queue_weight, User.max_concurrent_jobs).filter(User.id.in_(user_ids)).all()
+    return {
+        str(user_id): {'weight': weight, 'max_concurrent_jobs': max_concurrent_jobs}
+        for user_id, weight, max_concurrent_jobs in rows
+    }
+
+
+class QueueBackend(ABC):
+    """Interface for the resume processing queue.
+
+    Jobs are leased with a visibility timeout: a leased job that is neither
+    acked nor retried before the timeout expires becomes available again.
+    The processing_queue table is always written, so it remains the durable
+    record of every job whichever backend does the dispatching.
+    """
+
+    def __init__(self, visibility_timeout: Optional[int] = None):
+        self.visibility_timeout = visibility_timeout or settings.queue_visibility_timeout
+
+    @abstractmethod
+    def enqueue(self, resume_submission_id: str, priority: int = 0, delay_seconds: int = 0) -> str:
+        """Add a submission to the queue and return the job id"""
+
+    @abstractmethod
+    def enqueue_many(self, resume_submission_ids: List[str], priority: int = 0) -> List[str]:
+        """Add many submissions to the queue in one insert and return the job ids"""
+
+    def add_jobs(self, db, resume_submission_ids: List[str], priority: int = 0) -> List[Dict[str, Any]]:
+        """Insert processing_queue rows for new jobs in the caller's transaction.
+
+        Submissions inserted in the same transaction can be queued this way,
+        so they are never committed without a job. Once the caller commits,
+        publish() the returned rows to make them dispatchable.
+        """
+        if not resume_submission_ids:
+            return []
+        owners = self._submission_owners(db, resume_submission_ids)
+        rows = [
+            {
+                'id': uuid.uuid4(),
+                'resume_submission_id': resume_submission_id,
+                'user_id': owners.get(str(resume_submission_id)),
+                'priority': priority,
+                'status': "queued",
+                'stage': JOB_STAGE_PARSE,
+                'retry_count': 0,
+                'max_retries': 3,
+                'scheduled_at': datetime.now(timezone.utc)
+            }
+            for resume_submission_id in resume_submission_ids
+        ]
+        db.execute(insert(ProcessingQueue), rows)
+        return rows
+
+    def publish(self, jobs: List[Dict[str, Any]]) -> None:
+        """Make committed queued jobs dispatchable; the table itself is the queue unless overridden"""
+
+    @abstractmethod
+    def lease(self, stages: Optional[List[str]] = None,
+              visibility_timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Lease the next ready job of the given stages, or return None if nothing is ready"""
+
+    @abstractmethod
+    def advance(self, job_id: str, stage: str) -> None:
+        """Hand a leased job over to the worker pool of the next stage"""
+
+    @abstractmethod
+    def extend(self, job_id: str, visibility_timeout: Optional[int] = None) -> None:
+        """Extend the lease of a job that is still being worked on"""
+
+    @abstractmethod
+    def ack(self, job_id: str) -> None:
+        """Mark a leased job as completed"""
+
+    @abstractmethod
+    def retry(self, job_id: str, delay_seconds: float = 0, error_message: Optional[str] = None,
+              failure_class: Optional[str] = None) -> None:
+        """Return a leased job to the queue after a delay"""
+
+    @abstractmethod
+    def fail(self, job_id: str, error_message: Optional[str] = None) -> None:
+        """Mark a leased job as permanently failed"""
+
+    @abstractmethod
+    def dead_letter(self, job_id: str, error_message: Optional[str] = None,
+                    failure_class: Optional[str] = None) -> None:
+        """Park a job that exhausted its retries so it stops being dispatched"""
+
+    @abstractmethod
+    def requeue(self, job_id: str) -> None:
+        """Put a dead-lettered or failed job back in the queue with fresh retries"""
+
+    @abstractmethod
+    def depth(self) -> Dict[str, int]:
+        """Get the number of ready, delayed and leased jobs"""
+
+    @abstractmethod
+    def stage_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get ready job count and age of the oldest ready job per stage"""
+
+    def _submission_owners(self, db, resume_submission_ids: List[str]) -> Dict[str, Any]:
+        """Map submission ids to the id of the user whose mailbox received them"""
+        rows = db.query(ResumeSubmission.id, EmailConfig.user_id).join(
+            EmailConfig, ResumeSubmission.email_config_id == EmailConfig.id
+        ).filter(ResumeSubmission.id.in_(resume_submission_ids)).all()
+        return {str(submission_id): user_id for submission_id, user_id in rows}
+
+    def _create_job(self, resume_submission_id: str, priority: int, scheduled_at: datetime) -> ProcessingQueue:
+        """Insert the processing_queue row for a new job"""
+        db = SessionLocal()
+        try:
+            owners = self._submission_owners(db, [resume_submission_id])
+            job = ProcessingQueue(
+                resume_submission_id=resume_submission_id,
+                user_id=owners.get(str(resume_submission_id)),
+                priority=priority,
+                status="queued",
+                scheduled_at=scheduled_at
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            return job
+        finally:
+            db.close()
+
+    def _create_jobs(self, resume_submission_ids: List[str], priority: int = 0) -> List[Dict[str, Any]]:
+        """Bulk insert processing_queue rows for new jobs in a transaction of their own"""
+        if not resume_submission_ids:
+            return []
+        db = SessionLocal()
+        try:
+            rows = self.add_jobs(db, resume_submission_ids, priority)
+            db.commit()
+            return rows
+        finally:
+            db.close()
+
+    def _extend_lease(self, job_id: str, lease_expires_at: datetime) -> None:
+        """Move the lease deadline of a job that is still leased"""
+        db = SessionLocal()
+        try:
+            # A job acked or retried while its heartbeat was in flight keeps its new status
+            db.query(ProcessingQueue).filter(
+                ProcessingQueue.id == job_id,
+                ProcessingQueue.status == "processing"
+            ).update({'lease_expires_at': lease_expires_at}, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def _update_job(self, job_id: str, **values: Any) -> None:
+        """Update the processing_queue row of a job"""
+        db = SessionLocal()
+        try:
+            db.query(ProcessingQueue).filter(ProcessingQueue.id == job_id).update(values, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+class PostgresQueueBackend(QueueBackend):
+    """Queue backend that dispatches straight from the processing_queue table"""
+
+    def enqueue(self, resume_submission_id: str, priority: int = 0, delay_seconds: int = 0) -> str:
+        """Add a submission to the queue and return the job id"""
+        scheduled_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+        return str(self._create_job(resume_submission_id, priority, scheduled_at).id)
+
+    def enqueue_many(self, resume_submission_ids: List[str], priority: int = 0) -> List[str]:
+        """Add many submissions to the queue in one insert and return the job ids"""
+        rows = self._create_jobs(resume_submission_ids, priority)
+        return [str(row['id']) for row in rows]
+
+    def lease(self, stages: Optional[List[str]] = None,
+              visibility_timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Lease the next ready job of the tenant furthest below its fair share.
+
+        Within a tenant, jobs go by priority and then age. Concurrency caps
+        are checked against a snapshot, so workers leasing at the same
+        moment can overshoot a cap by the number of racing workers.
+        """
+        now = datetime.now(timezone.utc)
+        stage_filter = ProcessingQueue.stage.in_(stages or JOB_STAGES)
+        ready_filter = or_(
+            and_(ProcessingQueue.status == "queued", ProcessingQueue.scheduled_at <= now),
+            and_(ProcessingQueue.status == "processing", ProcessingQueue.lease_expires_at < now)
+        )
+        db = SessionLocal()
+        try:
+            tenants = {
+                tenant_key(user_id): {'user_id': user_id, 'in_flight': 0, 'oldest_ready': oldest}
+                for user_id, oldest in db.query(
+                    ProcessingQueue.user_id, func.min(ProcessingQueue.scheduled_at)
+                ).filter(stage_filter, ready_filter).group_by(ProcessingQueue.user_id).all()
+            }
+            if not tenants:
+                db.rollback()
+                return None
+
+            in_flight = db.query(ProcessingQueue.user_id, func.count(ProcessingQueue.id)).filter(
+                ProcessingQueue.status == "processing",
+                ProcessingQueue.lease_expires_at >= now
+            ).group_by(ProcessingQueue.user_id).all()
+            for user_id, count in in_flight:
+                if tenant_key(user_id) in tenants:
+                    tenants[tenant_key(user_id)]['in_flight'] = count
+
+            job = None
+            for tenant in fair_share_order(tenants, load_tenant_shares(db, list(tenants))):
+                user_id = tenants[tenant]['user_id']
+                owner_filter = ProcessingQueue.user_id.is_(None) if user_id is None else ProcessingQueue.user_id == user_id
+                job = db.query(ProcessingQueue).filter(
+                    stage_filter, ready_filter, owner_filter
+                ).order_by(
+                    ProcessingQueue.priority.desc(),
+                    ProcessingQueue.scheduled_at
+                ).with_for_update(skip_locked=True).first()
+                if job is not None:
+                    break
+
+            if job is None:
+                db.rollback()
+                return None
+
+            job.status = "processing"
+            job.started_at = now
+            job.lease_expires_at = now + timedelta(seconds=visibility_timeout or self.visibility_timeout)
+            db.commit()
+            return _job_to_dict(job)
+        finally:
+            db.close()
+
+    def advance(self, job_id: str, stage: str) -> None:
+        """Hand a leased job over to the worker pool of the next stage"""
+        self._update_job(
+            job_id,
+            stage=stage,
+            status="queued",
+            scheduled_at=datetime.now(timezone.utc),
+            lease_expires_at=None
+        )
+
+    def extend(self, job_id: str, visibility_timeout: Optional[int] = None) -> None:
+        """Extend the lease of a job that is still being worked on"""
+        lease_expires_at = datetime.now(timezone.utc) + timedelta(seconds=visibility_timeout or self.visibility_timeout)
+        self._extend_lease(job_id, lease_expires_at)
+
+    def ack(self, job_id: str) -> None:
+        """Mark a leased job as completed"""
+        self._update_job(job_id, status="completed", completed_at=datetime.now(timezone.utc), lease_expires_at=None)
+
+    def retry(self, job_id: str, delay_seconds: float = 0, error_message: Optional[str] = None,
+              failure_class: Optional[str] = None) -> None:
+        """Return a leased job to the queue after a delay"""
+        self._update_job(
+            job_id,
+            status="queued",
+            retry_count=ProcessingQueue.retry_count + 1,
+            scheduled_at=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds),
+            lease_expires_at=None,
+            error_message=error_message,
+            failure_class=failure_class
+        )
+
+    def fail(self, job_id: str, error_message: Optional[str] = None) -> None:
+        """Mark a leased job as permanently failed"""
+        self._update_job(
+            job_id,
+            status="failed",
+            completed_at=datetime.now(timezone.utc),
+            lease_expires_at=None,
+            error_message=error_message
+        )
+
+    def dead_letter(self, job_id: str, error_message: Optional[str] = None,
+                    failure_class: Optional[str] = None) -> None:
+        """Park a job that exhausted its retries so it stops being dispatched"""
+        self._update_job(
+            job_id,
+            status="dead_letter",
+            completed_at=datetime.now(timezone.utc),
+            lease_expires_at=None,
+            error_message=error_message,
+            failure_class=failure_class
+        )
+
+    def requeue(self, job_id: str) -> None:
+        """Put a dead-lettered or failed job back in the queue with fresh retries"""
+        self._update_job(
+            job_id,
+            status="queued",
+            retry_count=0,
+            scheduled_at=datetime.now(timezone.utc),
+            completed_at=None,
+            lease_expires_at=None
+        )
+
+    def depth(self) -> Dict[str, int]:
+        """Get the number of ready, delayed and leased jobs"""
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            queued = db.query(ProcessingQueue).filter(ProcessingQueue.status == "queued")
+            return {
+                'ready': queued.filter(ProcessingQueue.scheduled_at <= now).count(),
+                'delayed': queued.filter(ProcessingQueue.scheduled_at > now).count(),
+                'leased': db.query(ProcessingQueue).filter(ProcessingQueue.status == "processing").count()
+            }
+        finally:
+            db.close()
+
+    def stage_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get ready job count and age of the oldest ready job per stage"""
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            rows = db.query(
+                ProcessingQueue.stage,
+                func.count(ProcessingQueue.id),
+                func.min(ProcessingQueue.scheduled_at)
+            ).filter(
+                ProcessingQueue.status == "queued",
+                ProcessingQueue.scheduled_at <= now
+            ).group_by(ProcessingQueue.stage).all()
+
+            metrics = {stage: {'ready': 0, 'oldest_ready_age_seconds': 0.0} for stage in JOB_STAGES}
+            for stage, ready, oldest in rows:
+                metrics[stage] = {
+                    'ready': ready,
+                    'oldest_ready_age_seconds': (now - oldest).total_seconds() if oldest else 0.0
+                }
+            return metrics
+        finally:
+            db.close()
+
+
+# Moves due delayed jobs and expired leases back to their tenant's priority
+# lane, then leases for the first requested stage with ready jobs. Within a
+# stage the tenant with the lowest in-flight/weight ratio that is under its
+# concurrency cap wins, ties going to the oldest head job; within the tenant
+# the highest priority lane is popped.
+# KEYS: delayed, leased, inflight, weights, caps.
+# ARGV: prefix, now, lease deadline, default weight, default cap, stage...
+_LEASE_SCRIPT = """
+local delayed_key, leased_key, inflight_key, weights_key, caps_key = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5]
+local prefix, now, deadline = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3])
+local default_weight, default_cap = tonumber(ARGV[4]), tonumber(ARGV[5])
+
+local function requeue(source_key, release)
+    local due = redis.call('ZRANGEBYSCORE', source_key, '-inf', now, 'LIMIT', 0, 100)
+    for _, job_id in ipairs(due) do
+        redis.call('ZREM', source_key, job_id)
+        local job = redis.call('HMGET', prefix .. 'job:' .. job_id, 'priority', 'stage', 'tenant')
+        if job[1] then
+            local tenant = job[3] or 'shared'
+            if release then
+                redis.call('HINCRBY', inflight_key, tenant, -1)
+            end
+            redis.call('ZADD', prefix .. 'ready:' .. job[2] .. ':' .. tenant .. ':' .. job[1], now, job_id)
+            redis.call('ZADD', prefix .. 'lanes:' .. job[2] .. ':' .. tenant, tonumber(job[1]), job[1])
+            redis.call('SADD', prefix .. 'tenants:' .. job[2], tenant)
+        end
+    end
+end
+
+requeue(delayed_key, false)
+requeue(leased_key, true)
+
+for i = 6, #ARGV do
+    local stage = ARGV[i]
+    local best_tenant, best_lane, best_share, best_head
+    for _, tenant in ipairs(redis.call('SMEMBERS', prefix .. 'tenants:' .. stage)) do
+        local lane, head
+        for _, candidate in ipairs(redis.call('ZREVRANGE', prefix .. 'lanes:' .. stage .. ':' .. tenant, 0, -1)) do
+            local oldest = redis.call('ZRANGE', prefix .. 'ready:' .. stage .. ':' .. tenant .. ':' .. candidate, 0, 0, 'WITHSCORES')
+            if #oldest > 0 then
+                lane, head = candidate, tonumber(oldest[2])
+                break
+            end
+        end
+
+        if lane == nil then
+            redis.call('SREM', prefix .. 'tenants:' .. stage, tenant)
+        else
+            local in_flight = tonumber(redis.call('HGET', inflight_key, tenant) or '0')
+            local weight = tonumber(redis.call('HGET', weights_key, tenant) or default_weight)
+            local cap = tonumber(redis.call('HGET', caps_key, tenant) or default_cap)
+            if cap <= 0 or in_flight < cap then
+                local share = in_flight / weight
+                if best_tenant == nil or share < best_share or (share == best_share and head < best_head) then
+                    best_tenant, best_lane, best_share, best_head = tenant, lane, share, head
+                end
+            end
+        end
+    end
+
+    if best_tenant ~= nil then
+        local popped = redis.call('ZPOPMIN', prefix .. 'ready:' .. stage .. ':' .. best_tenant .. ':' .. best_lane)
+        local job_id = popped[1]
+        redis.call('ZADD', leased_key, deadline, job_id)
+        redis.call('HINCRBY', inflight_key, best_tenant, 1)
+        local job = redis.call('HMGET', prefix .. 'job:' .. job_id, 'resume_submission_id', 'retry_count', 'max_retries')
+        return {job_id, job[1], best_lane, stage, job[2], job[3], best_tenant}
+    end
+end
+return nil
+"""
+
+# Takes a job off the leased set and gives its tenant's in-flight slot back.
+# KEYS: leased, inflight. ARGV: prefix, job id.
+_RELEASE_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[2]) == 1 then
+    local tenant = redis.call('HGET', ARGV[1] .. 'job:' .. ARGV[2], 'tenant') or 'shared'
+    redis.call('HINCRBY', KEYS[2], tenant, -1)
+    return 1
+end
+return 0
+"""
+
+
+class RedisQueueBackend(QueueBackend):
+    """Queue backend that keeps the hot dispatch path in Redis.
+
+    Ready jobs live in one sorted set per stage, tenant and priority lane,
+    delayed retries in a sorted set scored by their due time and leased jobs
+    in a sorted set scored by their lease deadline. In-flight counts per
+    tenant are kept in a hash next to the tenants' weights and caps, which
+    are refreshed from the users table. Leasing is a single Lua script, so
+    workers never contend on Postgres row locks; Postgres rows are only
+    updated by primary key.
+    """
+
+    def __init__(self, visibility_timeout: Optional[int] = None, redis_client: Optional[redis.Redis] = None):
+        super().__init__(visibility_timeout)
+        self.redis = redis_client or redis.from_url(settings.redis_url)
+        self.prefix = settings.queue_redis_prefix
+        self._lease_script = self.redis.register_script(_LEASE_SCRIPT)
+        self._release_script = self.redis.register_script(_RELEASE_SCRIPT)
+        self._shares_synced_at = 0.0
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}{name}"
+
+    def _push(self, job_id: str, resume_submission_id: str, priority: int, retry_count: int,
+              max_retries: int, ready_at: float, stage: str = JOB_STAGE_PARSE,
+              tenant: str = SHARED_TENANT, pipe: Optional[Any] = None) -> None:
+        """Store a job hash and place it in its lane or the delayed set"""
+        execute = pipe is None
+        pipe = pipe if pipe is not None else self.redis.pipeline()
+        pipe.hset(self._key(f"job:{job_id}"), mapping={
+            'resume_submission_id': resume_submission_id,
+            'priority': priority,
+            'stage': stage,
+            'tenant': tenant,
+            'retry_count': retry_count,
+            'max_retries': max_retries
+        })
+        if ready_at > time.time():
+            pipe.zadd(self._key("delayed"), {job_id: ready_at})
+        else:
+            self._make_ready(pipe, job_id, stage, tenant, priority, ready_at)
+        if execute:
+            pipe.execute()
+
+    def _make_ready(self, pipe: Any, job_id: str, stage: str, tenant: str, priority: int, ready_at: float) -> None:
+        """Queue commands placing a job in its tenant's priority lane"""
+        pipe.zadd(self._key(f"ready:{stage}:{tenant}:{priority}"), {job_id: ready_at})
+        pipe.zadd(self._key(f"lanes:{stage}:{tenant}"), {str(priority): priority})
+        pipe.sadd(self._key(f"tenants:{stage}"), tenant)
+
+    def _release(self, job_id: str) -> None:
+        """Take a job off the leased set, freeing its tenant's in-flight slot"""
+        self._release_script(keys=[self._key("leased"), self._key("inflight")], args=[self.prefix, job_id])
+
+    def sync_tenant_shares(self) -> None:
+        """Copy tenant weights and concurrency caps from the users table into Redis"""
+        db = SessionLocal()
+        try:
+            rows = db.query(User.id, User.queue_weight, User.max_concurrent_jobs).all()
+        finally:
+            db.close()
+
+        pipe = self.redis.pipeline()
+        pipe.delete(self._key("weights"), self._key("caps"))
+        for user_id, weight, max_concurrent_jobs in rows:
+            if weight:
+                pipe.hset(self._key("weights"), str(user_id), weight)
+            if max_concurrent_jobs is not None:
+                pipe.hset(self._key("caps"), str(user_id), max_concurrent_jobs)
+        pipe.execute()
+        self._shares_synced_at = time.monotonic()
+
+    def enqueue(self, resume_submission_id: str, priority: int = 0, delay_seconds: int = 0) -> str:
+        """Add a submission to the queue and return the job id"""
+        ready_at = time.time() + delay_seconds
+        job = self._create_job(
+            resume_submission_id, priority, datetime.fromtimestamp(ready_at, tz=timezone.utc)
+        )
+        self._push(str(job.id), str(resume_submission_id), priority, 0, job.max_retries, ready_at,
+                   tenant=tenant_key(job.user_id))
+        return str(job.id)
+
+    def enqueue_many(self, resume_submission_ids: List[str], priority: int = 0) -> List[str]:
+        """Add many submissions to the queue in one insert and one Redis round trip"""
+        rows = self._create_jobs(resume_submission_ids, priority)
+        self.publish(rows)
+        return [str(row['id']) for row in rows]
+
+    def publish(self, jobs: List[Dict[str, Any]]) -> None:
+        """Push committed queued jobs to Redis, skipping any already there.
+
+        Publishing the same jobs again is harmless, so jobs whose push was
+        lost (Redis down after their rows were committed) can be published
+        by a retry.
+        """
+        if not jobs:
+            return
+        pipe = self.redis.pipeline()
+        for job in jobs:
+            pipe.exists(self._key(f"job:{job['id']}"))
+        present = pipe.execute()
+        pipe = self.redis.pipeline()
+        for job, exists in zip(jobs, present):
+            if exists:
+                continue
+            ready_at = job['scheduled_at'].timestamp() if job.get('scheduled_at') else time.time()
+            self._push(str(job['id']), str(job['resume_submission_id']), job.get('priority') or 0,
+                       job.get('retry_count') or 0, job.get('max_retries') or 3, ready_at,
+                       job.get('stage') or JOB_STAGE_PARSE, tenant_key(job.get('user_id')), pipe=pipe)
+        pipe.execute()
+
+    def lease(self, stages: Optional[List[str]] = None,
+              visibility_timeout: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Lease the next ready job of the tenant furthest below its fair share"""
+        if time.monotonic() - self._shares_synced_at > settings.queue_tenant_share_refresh:
+            self.sync_tenant_shares()
+
+        now = time.time()
+        deadline = now + (visibility_timeout or self.visibility_timeout)
+        result = self._lease_script(
+            keys=[
+                self._key("delayed"), self._key("leased"), self._key("inflight"),
+                self._key("weights"), self._key("caps")
+            ],
+            args=[
+                self.prefix, now, deadline,
+                settings.queue_default_tenant_weight, settings.queue_default_tenant_concurrency,
+                *(stages or JOB_STAGES)
+            ]
+        )
+        if not result:
+            return None
+
+        job_id, resume_submission_id, priority, stage, retry_count, max_retries, tenant = [
+            value.decode() if isinstance(value, bytes) else value for value in result
+        ]
+        self._update_job(
+            job_id,
+            status="processing",
+            started_at=datetime.fromtimestamp(now, tz=timezone.utc),
+            lease_expires_at=datetime.fromtimestamp(deadline, tz=timezone.utc)
+        )
+        return {
+            'id': job_id,
+            'resume_submission_id': resume_submission_id,
+            'priority': int(priority),
+            'stage': stage,
+            'retry_count': int(retry_count or 0),
+            'max_retries': int(max_retries or 3),
+            'user_id': None if tenant == SHARED_TENANT else tenant
+        }
+
+    def advance(self, job_id: str, stage: str) -> None:
+        """Hand a leased job over to the worker pool of the next stage"""
+        now = time.time()
+        priority, tenant = self.redis.hmget(self._key(f"job:{job_id}"), "priority", "tenant")
+        self._release(job_id)
+        pipe = self.redis.pipeline()
+        pipe.hset(self._key(f"job:{job_id}"), "stage", stage)
+        self._make_ready(pipe, job_id, stage, tenant.decode() if tenant else SHARED_TENANT, int(priority or 0), now)
+        pipe.execute()
+        self._update_job(
+            job_id,
+            stage=stage,
+            status="queued",
+            scheduled_at=datetime.fromtimestamp(now, tz=timezone.utc),
+            lease_expires_at=None
+        )
+
+    def extend(self, job_id: str, visibility_timeout: Optional[int] = None) -> None:
+        """Extend the lease of a job that is still being worked on"""
+        deadline = time.time() + (visibility_timeout or self.visibility_timeout)
+        # xx: a job released in the meantime is not put back in the leased set
+        if self.redis.zadd(self._key("leased"), {job_id: deadline}, xx=True, ch=True):
+            self._extend_lease(job_id, datetime.fromtimestamp(deadline, tz=timezone.utc))
+
+    def ack(self, job_id: str) -> None:
+        """Mark a leased job as completed"""
+        self._remove(job_id)
+        self._update_job(job_id, status="completed", completed_at=datetime.now(timezone.utc), lease_expires_at=None)
+
+    def retry(self, job_id: str, delay_seconds: float = 0, error_message: Optional[str] = None,
+              failure_class: Optional[str] = None) -> None:
+        """Return a leased job to the queue after a delay"""
+        ready_at = time.time() + delay_seconds
+        self._release(job_id)
+        pipe = self.redis.pipeline()
+        pipe.hincrby(self._key(f"job:{job_id}"), "retry_count", 1)
+        pipe.zadd(self._key("delayed"), {job_id: ready_at})
+        pipe.execute()
+        self._update_job(
+            job_id,
+            status="queued",
+            retry_count=ProcessingQueue.retry_count + 1,
+            scheduled_at=datetime.fromtimestamp(ready_at, tz=timezone.utc),
+            lease_expires_at=None,
+            error_message=error_message,
+            failure_class=failure_class
+        )
+
+    def fail(self, job_id: str, error_message: Optional[str] = None) -> None:
+        """Mark a leased job as permanently failed"""
+        self._remove(job_id)
+        self._update_job(
+            job_id,
+            status="failed",
+            completed_at=datetime.now(timezone.utc),
+            lease_expires_at=None,
+            error_message=error_message
+        )
+
+    def dead_letter(self, job_id: str, error_message: Optional[str] = None,
+                    failure_class: Optional[str] = None) -> None:
+        """Park a job that exhausted its retries so it stops being dispatched"""
+        self._remove(job_id)
+        self._update_job(
+            job_id,
+            status="dead_letter",
+            completed_at=datetime.now(timezone.utc),
+            lease_expires_at=None,
+            error_message=error_message,
+            failure_class=failure_class
+        )
+
+    def requeue(self, job_id: str) -> None:
+        """Put a dead-lettered or failed job back in the queue with fresh retries"""
+        now = time.time()
+        self._update_job(
+            job_id,
+            status="queued",
+            retry_count=0,
+            scheduled_at=datetime.fromtimestamp(now, tz=timezone.utc),
+            completed_at=None,
+            lease_expires_at=None
+        )
+        db = SessionLocal()
+        try:
+            job = db.query(ProcessingQueue).filter(ProcessingQueue.id == job_id).first()
+            self._push(job_id, str(job.resume_submission_id), job.priority or 0, 0, job.max_retries or 3,
+                       now, job.stage or JOB_STAGE_PARSE, tenant_key(job.user_id))
+        finally:
+            db.close()
+
+    def depth(self) -> Dict[str, int]:
+        """Get the number of ready, delayed and leased jobs"""
+        pipe = self.redis.pipeline()
+        pipe.zcard(self._key("delayed"))
+        pipe.zcard(self._key("leased"))
+        delayed, leased = pipe.execute()
+        return {
+            'ready': sum(metrics['ready'] for metrics in self.stage_metrics().values()),
+            'delayed': delayed,
+            'leased': leased
+        }
+
+    def stage_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get ready job count and age of the oldest ready job per stage"""
+        now = time.time()
+        metrics = {}
+        for stage in JOB_STAGES:
+            lane_keys = []
+            for tenant in self.redis.smembers(self._key(f"tenants:{stage}")):
+                tenant = tenant.decode()
+                lanes = self.redis.zrange(self._key(f"lanes:{stage}:{tenant}"), 0, -1)
+                lane_keys.extend(self._key(f"ready:{stage}:{tenant}:{lane.decode()}") for lane in lanes)
+            pipe = self.redis.pipeline()
+            for lane_key in lane_keys:
+                pipe.zcard(lane_key)
+                pipe.zrange(lane_key, 0, 0, withscores=True)
+            results = pipe.execute()
+
+            ready = sum(results[0::2])
+            oldest_scores = [entries[0][1] for entries in results[1::2] if entries]
+            metrics[stage] = {
+                'ready': ready,
+                'oldest_ready_age_seconds': max(0.0, now - min(oldest_scores)) if oldest_scores else 0.0
+            }
+        return metrics
+
+    def restore_from_database(self) -> int:
+        """Re-seed Redis from queued and processing rows after Redis data loss"""
+        db = SessionLocal()
+        try:
+            jobs = db.query(ProcessingQueue).filter(
+                ProcessingQueue.status.in_(["queued", "processing"])
+            ).all()
+            restored = 0
+            for job in jobs:
+                if self.redis.exists(self._key(f"job:{job.id}")):
+                    continue
+                ready_at = job.scheduled_at.timestamp() if job.scheduled_at else time.time()
+                self._push(str(job.id), str(job.resume_submission_id), job.priority or 0,
+                           job.retry_count or 0, job.max_retries or 3, ready_at, job.stage or JOB_STAGE_PARSE,
+                           tenant_key(job.user_id))
+                restored += 1
+            return restored
+        finally:
+            db.close()
+
+    def _remove(self, job_id: str) -> None:
+        """Drop a finished job from Redis"""
+        self._release(job_id)
+        self.redis.delete(self._key(f"job:{job_id}"))
+
+
+def get_queue_backend() -> QueueBackend:
+    """Create the queue backend selected by settings.queue_backend"""
+    if settings.queue_backend == "redis":
+        return RedisQueueBackend()
+    if settings.queue_backend == "postgres":
+        return PostgresQueueBackend()
+    raise ValueError(f"Unsupported queue backend: {settings.queue_backend}")
@@ -0,0 +1,322 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.config import settings
+
+
+# Session.info key of the users whose stats change when the session commits
+CHANGED_USERS_KEY = "dashboard_cache_changed_users"
+# Stands for every user, e.g. after a full rollup rebuild
+ALL_USERS = "all"
+
+
+class ComputeCancelled(Exception):
+    """The request computing a response was cancelled before it finished"""
+
+
+class CacheBackend(ABC):
+    """Storage for cached responses and the generation counters that invalidate them"""
+
+    name = "none"
+    # Whether other processes share the storage, so computing a response needs a cross-process lock
+    shared = False
+
+    @abstractmethod
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """Get the values of keys, None for each one missing or expired"""
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """Store a value for ttl seconds"""
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Increment a counter that never expires, returning its new value"""
+
+    def try_lock(self, key: str, token: str, timeout: float) -> bool:
+        return True
+
+    def unlock(self, key: str, token: str) -> None:
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Cache kept in this process, bounded by DASHBOARD_CACHE_MAX_ENTRIES"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.dashboard_cache_max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        now = time.monotonic()
+        values = []
+        with self._lock:
+            for key in keys:
+                if key in self._counters:
+                    values.append(str(self._counters[key]))
+                    continue
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] <= now:
+                    del self._entries[key]
+                    entry = None
+                values.append(entry[1] if entry is not None else None)
+        return values
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            # Entries of an old generation are never read again; the oldest go first
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+_UNLOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by every API process through Redis"""
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, redis_client: Optional[redis.Redis] = None):
+        self.redis = redis_client or redis.from_url(settings.redis_url, decode_responses=True)
+        self.prefix = settings.dashboard_cache_redis_prefix
+        self._unlock_script = self.redis.register_script(_UNLOCK_SCRIPT)
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        return self.redis.mget([self.prefix + key for key in keys])
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self.redis.set(self.prefix + key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return self.redis.incr(self.prefix + key)
+
+    def try_lock(self, key: str, token: str, timeout: float) -> bool:
+        return bool(self.redis.set(self.prefix + "lock:" + key, token, nx=True, px=int(timeout * 1000)))
+
+    def unlock(self, key: str, token: str) -> None:
+        self._unlock_script(keys=[self.prefix + "lock:" + key], args=[token])
+
+
+class ResponseCache:
+    """Caches dashboard responses per endpoint, user and parameters for a short TTL.
+
+    Keys embed a global and a per-user generation counter. A commit that
+    changes a user's stats bumps their generation, so later requests miss
+    and recompute; old entries are never read again and expire. Concurrent
+    misses on the same key share one computation: within a process they
+    await the same future, and across processes (Redis backend) one holds a
+    lock while the others wait for its result.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[int] = None):
+        self.backend = backend
+        self.ttl = ttl or settings.dashboard_cache_ttl
+        self.lock_timeout = settings.dashboard_cache_lock_timeout
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'invalidations': 0, 'errors': 0}
+
+    def _generation_keys(self, user_id) -> List[str]:
+        return [f"gen:{ALL_USERS}", f"gen:user:{user_id}"]
+
+    def _key(self, endpoint: str, user_id, generations: List[Optional[str]], params: Dict[str, Any]) -> str:
+        generation = ".".join(value or "0" for value in generations)
+        query = "&".join(f"{name}={params[name]}" for name in sorted(params))
+        return f"{endpoint}:{user_id}:{generation}:{query}"
+
+    async def get_or_compute(self, endpoint: str, user_id, params: Dict[str, Any],
+                             compute: Callable[[], Any], ttl: Optional[int] = None) -> Any:
+        """Get a cached response, or compute it in a thread and cache it.
+
+        compute must return a JSON-serializable value. If the cache backend
+        fails, the response is computed without it. If the request computing
+        a response is cancelled, the requests waiting on it compute it anew.
+        """
+        if self.backend is None:
+            return await asyncio.to_thread(compute)
+
+        try:
+            if self.backend.shared:
+                key, cached = await asyncio.to_thread(self._lookup, endpoint, user_id, params)
+            else:
+                key, cached = self._lookup(endpoint, user_id, params)
+        except Exception as e:
+            print(f"Dashboard cache unavailable: {str(e)}")
+            self.stats['errors'] += 1
+            return await asyncio.to_thread(compute)
+        if cached is not None:
+            self.stats['hits'] += 1
+            return json.loads(cached)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats['coalesced'] += 1
+            try:
+                return json.loads(await asyncio.shield(inflight))
+            except ComputeCancelled:
+                # The request computing it went away; one waiter takes over
+                return await self.get_or_compute(endpoint, user_id, params, compute, ttl)
+
+        self.stats['misses'] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fill(key, compute, ttl or self.ttl)
+            future.set_result(value)
+            return json.loads(value)
+        except asyncio.CancelledError:
+            # Waiters get an error they can handle rather than being cancelled too
+            future.set_exception(ComputeCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no other request was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def _lookup(self, endpoint: str, user_id, params: Dict[str, Any]) -> tuple:
+        """Get the current key of a response and its cached value, if any"""
+        generations = self.backend.get_many(self._generation_keys(user_id))
+        key = self._key(endpoint, user_id, generations, params)
+        return key, self.backend.get_many([key])[0]
+
+    async def _fill(self, key: str, compute: Callable[[], Any], ttl: int) -> str:
+        """Compute and store a response, waiting instead if another process is computing it"""
+        token = uuid.uuid4().hex
+        locked = await asyncio.to_thread(self._try_lock, key, token)
+        if not locked:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+                cached = await asyncio.to_thread(self._get, key)
+                if cached is not None:
+                    self.stats['coalesced'] += 1
+                    return cached
+        try:
+            value = json.dumps(await asyncio.to_thread(compute))
+            await asyncio.to_thread(self._set, key, value, ttl)
+            return value
+        finally:
+            if locked:
+                await asyncio.to_thread(self._unlock, key, token)
+
+    def _try_lock(self, key: str, token: str) -> bool:
+        if not self.backend.shared:
+            return True
+        try:
+            return self.backend.try_lock(key, token, self.lock_timeout)
+        except Exception:
+            self.stats['errors'] += 1
+            return True
+
+    def _get(self, key: str) -> Optional[str]:
+        try:
+            return self.backend.get_many([key])[0]
+        except Exception:
+            self.stats['errors'] += 1
+            return None
+
+    def _set(self, key: str, value: str, ttl: int) -> None:
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception:
+            self.stats['errors'] += 1
+
+    def _unlock(self, key: str, token: str) -> None:
+        try:
+            self.backend.unlock(key, token)
+        except Exception:
+            self.stats['errors'] += 1
+
+    def invalidate(self, user_id=ALL_USERS) -> None:
+        """Make a user's cached responses (or everyone's) stale"""
+        if self.backend is None:
+            return
+        self.stats['invalidations'] += 1
+        key = f"gen:{ALL_USERS}" if user_id == ALL_USERS else f"gen:user:{user_id}"
+        try:
+            self.backend.incr(key)
+        except Exception as e:
+            print(f"Error invalidating dashboard cache: {str(e)}")
+            self.stats['errors'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss and coalesced counts"""
+        lookups = self.stats['hits'] + self.stats['misses'] + self.stats['coalesced']
+        return {
+            'backend': self.backend.name if self.backend is not None else "off",
+            'ttl_seconds': self.ttl,
+            **self.stats,
+            'hit_rate': round((self.stats['hits'] + self.stats['coalesced']) / lookups, 3) if lookups else 0.0,
+            'inflight': len(self._inflight)
+        }
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide dashboard response cache, with the backend selected by settings"""
+    global _response_cache
+    if _response_cache is None:
+        if settings.dashboard_cache_backend == "redis":
+            backend = RedisCacheBackend()
+        elif settings.dashboard_cache_backend == "memory":
+            backend = MemoryCacheBackend()
+        elif settings.dashboard_cache_backend == "off":
+            backend = None
+        else:
+            raise ValueError(f"Unsupported dashboard cache backend: {settings.dashboard_cache_backend}")
+        _response_cache = ResponseCache(backend)
+    return _response_cache
+
+
+def mark_stats_changed(db: Session, user_id=ALL_USERS) -> None:
+    """Invalidate a user's cached dashboard responses once the session commits"""
+    db.info.setdefault(CHANGED_USERS_KEY, set()).add(str(user_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    changed = session.info.pop(CHANGED_USERS_KEY, None)
+    if not changed:
+        return
+    response_cache = get_response_cache()
+    if ALL_USERS in changed:
+        response_cache.invalidate()
+        return
+    for user_id in changed:
+        response_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session: Session) -> None:
+    session.info.pop(CHANGED_USERS_KEY, None)
@@ -6,6 +6,10 @@ from docx import Document
 import io
 
 
+class ResumeParseError(ValueError):
+    """A resume file that cannot be read or is of an unsupported type"""
+
+
 class ResumeParser:
     """Service for parsing resume files and extracting structured information"""
     
@@ -15,7 +19,7 @@ class ResumeParser:
     def parse_resume(self, file_content: bytes, file_type: str) -> Dict[str, Any]:
         """Parse resume file and extract structured information"""
         if file_type.lower() not in self.supported_formats:
-            raise ValueError(f"Unsupported file type: {file_type}")
+            raise ResumeParseError(f"Unsupported file type: {file_type}")
         
         # Extract raw text
         raw_text = self._extract_text(file_content, file_type)
@@ -43,7 +47,7 @@ class ResumeParser:
         elif file_type.lower() in ['doc', 'docx']:
             return self._extract_docx_text(file_content)
         else:
-            raise ValueError(f"Unsupported file type: {file_type}")
+            raise ResumeParseError(f"Unsupported file type: {file_type}")
     
     def _extract_pdf_text(self, file_content: bytes) -> str:
         """Extract text from PDF file"""
@@ -54,7 +58,7 @@ class ResumeParser:
                 text += page.extract_text() + "\n"
             return text
         except Exception as e:
-            raise ValueError(f"Error extracting text from PDF: {str(e)}")
+            raise ResumeParseError(f"Error extracting text from PDF: {str(e)}")
     
     def _extract_docx_text(self, file_content: bytes) -> str:
         """Extract text from DOCX file"""
@@ -65,7 +69,7 @@ class ResumeParser:
                 text += paragraph.text + "\n"
             return text
         except Exception as e:
-            raise ValueError(f"Error extracting text from DOCX: {str(e)}")
+            raise ResumeParseError(f"Error extracting text from DOCX: {str(e)}")
     
     def _extract_name(self, text: str) -> Optional[str]:
         """Extract candidate name from resume text"""
@@ -0,0 +1,66 @@
+import random
+from typing import Any, Dict, Optional
+from openai import APIConnectionError, RateLimitError
+from sqlalchemy.exc import DBAPIError, OperationalError, TimeoutError as PoolTimeoutError
+from app.services.resume_parser import ResumeParseError
+
+
+FAILURE_RATE_LIMIT = "rate_limit"
+FAILURE_PARSE_ERROR = "parse_error"
+FAILURE_TRANSIENT_DB = "transient_db"
+FAILURE_UNKNOWN = "unknown"
+
+
+class RetryPolicy:
+    """Decides whether and when a failed queue job is retried"""
+
+    def __init__(self):
+        # Backoff per failure class. max_retries of None falls back to the
+        # job's own max_retries column.
+        self.policies = {
+            FAILURE_RATE_LIMIT: {'base_delay': 30, 'max_delay': 900, 'max_retries': 8},
+            FAILURE_PARSE_ERROR: {'base_delay': 60, 'max_delay': 60, 'max_retries': 1},
+            FAILURE_TRANSIENT_DB: {'base_delay': 5, 'max_delay': 300, 'max_retries': 5},
+            FAILURE_UNKNOWN: {'base_delay': 30, 'max_delay': 600, 'max_retries': None}
+        }
+
+    def classify(self, error: BaseException) -> str:
+        """Map an exception to a failure class"""
+        # Connection failures and timeouts to the LLM back off like rate limits
+        if isinstance(error, (RateLimitError, APIConnectionError)):
+            return FAILURE_RATE_LIMIT
+        if isinstance(error, (OperationalError, PoolTimeoutError)):
+            return FAILURE_TRANSIENT_DB
+        if isinstance(error, DBAPIError) and error.connection_invalidated:
+            return FAILURE_TRANSIENT_DB
+        if isinstance(error, ResumeParseError):
+            # Only the parser's own errors; a stray ValueError is not a bad file
+            return FAILURE_PARSE_ERROR
+        return FAILURE_UNKNOWN
+
+    def max_retries(self, failure_class: str, job: Dict[str, Any]) -> int:
+        """Get the number of retries allowed for a failure class"""
+        max_retries = self.policies[failure_class]['max_retries']
+        return job.get('max_retries', 3) if max_retries is None else max_retries
+
+    def should_retry(self, failure_class: str, job: Dict[str, Any]) -> bool:
+        """Check whether a job has retries left for this failure class"""
+        return job.get('retry_count', 0) < self.max_retries(failure_class, job)
+
+    def next_delay(self, failure_class: str, retry_count: int) -> float:
+        """Get a jittered exponential backoff delay in seconds"""
+        policy = self.policies[failure_class]
+        ceiling = min(policy['max_delay'], policy['base_delay'] * (2 ** retry_count))
+        # "Equal jitter": keep half the backoff, randomise the other half
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def decide(self, error: BaseException, job: Dict[str, Any]) -> Dict[str, Optional[Any]]:
+        """Classify a failure and decide between retrying and dead-lettering"""
+        failure_class = self.classify(error)
+        if self.should_retry(failure_class, job):
+            return {
+                'failure_class': failure_class,
+                'retry': True,
+                'delay_seconds': self.next_delay(failure_class, job.get('retry_count', 0))
+            }
+        return {'failure_class': failure_class, 'retry': False, 'delay_seconds': None}
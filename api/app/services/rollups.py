@@ -0,0 +1,202 @@
+import uuid
+from datetime import date
+from typing import Any, Dict, Optional
+from sqlalchemy import Date, cast, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from app.models.daily_user_rollup import DailyUserRollup
+from app.models.email_config import EmailConfig
+from app.models.email_response import EmailResponse
+from app.models.resume_submission import ResumeSubmission
+from app.models.scoring_result import ScoringResult
+from app.services.response_cache import ALL_USERS, mark_stats_changed
+
+
+ROLLUP_COUNTERS = ['submissions', 'processed', 'failed', 'score_sum', 'score_count', 'responses']
+
+
+def email_config_owner(email_config_id):
+    """The user owning a mailbox, as a subquery to use in place of a user id"""
+    return select(EmailConfig.user_id).where(EmailConfig.id == email_config_id).scalar_subquery()
+
+
+def submission_day(submission: ResumeSubmission) -> Optional[date]:
+    """The rollup day of a submission, or None for one not yet flushed (today)"""
+    return submission.created_at.date() if submission.created_at is not None else None
+
+
+def bump_daily_rollup(db, user_id, day: Optional[date] = None, **counts: int) -> None:
+    """Add to a user's counters for a day, in the caller's transaction.
+
+    Outcomes of a submission (processed, failed, its scores and responses)
+    count against the day it was received, so each pipeline write touches a
+    single rollup row. day defaults to the current date in the database.
+    user_id may be a subquery such as email_config_owner(). The user's
+    cached dashboard responses are invalidated when the caller commits.
+    """
+    unknown = set(counts) - set(ROLLUP_COUNTERS)
+    if unknown:
+        raise ValueError(f"Unknown rollup counters: {', '.join(sorted(unknown))}")
+    counts = {name: value for name, value in counts.items() if value}
+    if not counts:
+        return
+
+    statement = insert(DailyUserRollup).values(
+        id=uuid.uuid4(),
+        user_id=user_id,
+        day=day if day is not None else func.current_date(),
+        **counts
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[DailyUserRollup.user_id, DailyUserRollup.day],
+        set_={
+            **{name: getattr(DailyUserRollup, name) + statement.excluded[name] for name in counts},
+            'updated_at': func.now()
+        }
+    ).returning(DailyUserRollup.user_id)
+    mark_stats_changed(db, db.execute(statement).scalar())
+
+
+def set_submission_status(db, submission: ResumeSubmission, status: str, **counts: int) -> None:
+    """Change a submission's status, in the caller's transaction.
+
+    The processed and failed counters of the submission's day follow the
+    change actually made: entering "completed" or "failed" adds one, leaving
+    it takes one away, so a completed submission that later fails moves
+    from one counter to the other. Any other counts, such as its score, are
+    added in the same write.
+    """
+    counts['processed'] = counts.get('processed', 0) + (status == "completed") - (submission.status == "completed")
+    counts['failed'] = counts.get('failed', 0) + (status == "failed") - (submission.status == "failed")
+    bump_daily_rollup(db, email_config_owner(submission.email_config_id), submission_day(submission), **counts)
+    submission.status = status
+
+
+def retract_submission(db, submission: ResumeSubmission, user_id) -> None:
+    """Take a submission that is about to be deleted, with its scores and responses, out of the rollups.
+
+    Its processed or failed count is taken from its status, which
+    set_submission_status keeps in step with the counters.
+    """
+    score_sum, score_count = db.query(
+        func.coalesce(func.sum(ScoringResult.total_score), 0),
+        func.count(ScoringResult.id)
+    ).filter(ScoringResult.resume_submission_id == submission.id).one()
+    responses = db.query(func.count(EmailResponse.id)).filter(
+        EmailResponse.resume_submission_id == submission.id
+    ).scalar()
+    bump_daily_rollup(
+        db, user_id, submission_day(submission),
+        submissions=-1,
+        processed=-1 if submission.status == "completed" else 0,
+        failed=-1 if submission.status == "failed" else 0,
+        score_sum=-int(score_sum),
+        score_count=-score_count,
+        responses=-responses
+    )
+
+
+def retract_mailbox(db, email_config_id, user_id) -> None:
+    """Take every submission of a mailbox that is about to be deleted out of the rollups.
+
+    Counts are aggregated per day and subtracted with one write per day, in
+    the caller's transaction, so unlike a rebuild nothing else is locked.
+    """
+    day = cast(ResumeSubmission.created_at, Date)
+    retracted: Dict[date, Dict[str, int]] = {}
+
+    def merge(rows, names):
+        for row in rows:
+            counters = retracted.setdefault(row[0], dict.fromkeys(ROLLUP_COUNTERS, 0))
+            for name, value in zip(names, row[1:]):
+                counters[name] = -int(value or 0)
+
+    merge(db.query(
+        day,
+        func.count(ResumeSubmission.id),
+        func.count(ResumeSubmission.id).filter(ResumeSubmission.status == "completed"),
+        func.count(ResumeSubmission.id).filter(ResumeSubmission.status == "failed")
+    ).filter(ResumeSubmission.email_config_id == email_config_id).group_by(day),
+        ['submissions', 'processed', 'failed'])
+    merge(db.query(
+        day,
+        func.sum(ScoringResult.total_score),
+        func.count(ScoringResult.id)
+    ).select_from(ScoringResult).join(
+        ResumeSubmission, ScoringResult.resume_submission_id == ResumeSubmission.id
+    ).filter(ResumeSubmission.email_config_id == email_config_id).group_by(day),
+        ['score_sum', 'score_count'])
+    merge(db.query(
+        day,
+        func.count(EmailResponse.id)
+    ).select_from(EmailResponse).join(
+        ResumeSubmission, EmailResponse.resume_submission_id == ResumeSubmission.id
+    ).filter(ResumeSubmission.email_config_id == email_config_id).group_by(day),
+        ['responses'])
+
+    # Days in a fixed order, so concurrent retractions take row locks alike
+    for retracted_day in sorted(retracted):
+        bump_daily_rollup(db, user_id, retracted_day, **retracted[retracted_day])
+
+
+def rebuild_daily_rollups(db, user_id=None, since: Optional[date] = None) -> int:
+    """Recompute rollups from the submission, scoring and response tables.
+
+    Covers every user, or one, from a day onward or for all history. The
+    table is locked for the rebuild, so pipeline writes wait for it rather
+    than being counted twice or lost. The caller commits. Returns the number
+    of rollup rows written.
+    """
+    db.execute(text("LOCK TABLE daily_user_rollups IN SHARE ROW EXCLUSIVE MODE"))
+
+    day = cast(ResumeSubmission.created_at, Date)
+    scope = []
+    if user_id is not None:
+        scope.append(EmailConfig.user_id == user_id)
+    if since is not None:
+        scope.append(ResumeSubmission.created_at >= since)
+
+    rollups: Dict[tuple, Dict[str, Any]] = {}
+
+    def merge(rows, names):
+        for row in rows:
+            counters = rollups.setdefault((row[0], row[1]), dict.fromkeys(ROLLUP_COUNTERS, 0))
+            for name, value in zip(names, row[2:]):
+                counters[name] = int(value or 0)
+
+    merge(db.query(
+        EmailConfig.user_id, day,
+        func.count(ResumeSubmission.id),
+        func.count(ResumeSubmission.id).filter(ResumeSubmission.status == "completed"),
+        func.count(ResumeSubmission.id).filter(ResumeSubmission.status == "failed")
+    ).join(EmailConfig).filter(*scope).group_by(EmailConfig.user_id, day),
+        ['submissions', 'processed', 'failed'])
+    merge(db.query(
+        EmailConfig.user_id, day,
+        func.sum(ScoringResult.total_score),
+        func.count(ScoringResult.id)
+    ).select_from(ScoringResult).join(
+        ResumeSubmission, ScoringResult.resume_submission_id == ResumeSubmission.id
+    ).join(EmailConfig).filter(*scope).group_by(EmailConfig.user_id, day),
+        ['score_sum', 'score_count'])
+    merge(db.query(
+        EmailConfig.user_id, day,
+        func.count(EmailResponse.id)
+    ).select_from(EmailResponse).join(
+        ResumeSubmission, EmailResponse.resume_submission_id == ResumeSubmission.id
+    ).join(EmailConfig).filter(*scope).group_by(EmailConfig.user_id, day),
+        ['responses'])
+
+    existing = db.query(DailyUserRollup)
+    if user_id is not None:
+        existing = existing.filter(DailyUserRollup.user_id == user_id)
+    if since is not None:
+        existing = existing.filter(DailyUserRollup.day >= since)
+    existing.delete(synchronize_session=False)
+    mark_stats_changed(db, user_id if user_id is not None else ALL_USERS)
+
+    if rollups:
+        db.execute(insert(DailyUserRollup), [
+            {'id': uuid.uuid4(), 'user_id': rollup_user_id, 'day': rollup_day, **counters}
+            for (rollup_user_id, rollup_day), counters in rollups.items()
+        ])
+    return len(rollups)
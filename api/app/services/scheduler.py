@@ -0,0 +1,352 @@
+import asyncio
+import hashlib
+import inspect
+import os
+import random
+import socket
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+from sqlalchemy import text
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.models.scheduled_task_run import ScheduledTaskRun
+from app.services.file_processor import FileProcessor
+from app.services.pipeline import ROLE_STAGES
+
+
+TaskFunc = Callable[[], Union[Any, Awaitable[Any]]]
+
+
+class CronSchedule:
+    """A five-field cron expression (minute hour day-of-month month day-of-week).
+
+    Fields accept `*`, numbers, ranges (`1-5`), lists (`1,15`) and steps
+    (`*/10`, `0-30/5`). Day-of-week runs 0-6 from Sunday. As in cron, a
+    restricted day-of-month and day-of-week match when either one does.
+    """
+
+    FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression}")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = [
+            self._parse_field(field, low, high) for field, (low, high) in zip(fields, self.FIELD_RANGES)
+        ]
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        """Expand one cron field into the set of values it matches"""
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+            if part == "*":
+                start, end = low, high
+            elif "-" in part:
+                start, end = (int(value) for value in part.split("-", 1))
+            else:
+                start = end = int(part)
+            if start < low or end > high or start > end or step < 1:
+                raise ValueError(f"Invalid cron field: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_match = moment.day in self.days
+        # Python weekday() is Monday=0; cron is Sunday=0
+        weekday_match = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day:
+            return weekday_match
+        if self.any_weekday:
+            return day_match
+        return day_match or weekday_match
+
+    def next_after(self, moment: datetime) -> datetime:
+        """Get the first matching minute strictly after a moment"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 4)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                candidate = (candidate.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+            elif candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+
+
+class ScheduledTask:
+    """A periodic task run on a fixed interval or a cron schedule"""
+
+    def __init__(self, name: str, func: TaskFunc, interval: Optional[float] = None,
+                 cron: Optional[str] = None, jitter: float = 0, run_on_start: bool = False,
+                 timeout: Optional[float] = None):
+        if (interval is None) == (cron is None):
+            raise ValueError(f"Task {name} needs exactly one of interval or cron")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = CronSchedule(cron) if cron else None
+        self.jitter = jitter
+        self.run_on_start = run_on_start
+        self.timeout = timeout
+        self.running = False
+        self.last_started_at: Optional[datetime] = None
+        self.last_status: Optional[str] = None
+
+    @property
+    def lock_key(self) -> int:
+        """Postgres advisory lock key for this task"""
+        digest = hashlib.sha256(f"scheduled_task:{self.name}".encode()).digest()
+        return int.from_bytes(digest[:8], "big", signed=True)
+
+    @property
+    def min_spacing(self) -> timedelta:
+        """Shortest gap between two cluster-wide runs before a run counts as a repeat"""
+        if self.interval is not None:
+            return timedelta(seconds=self.interval / 2)
+        return timedelta(seconds=30)
+
+    def next_run(self, now: datetime) -> datetime:
+        """Get when the task is next due, including jitter"""
+        if self.cron is not None:
+            due = self.cron.next_after(now)
+        else:
+            due = now + timedelta(seconds=self.interval)
+        return due + timedelta(seconds=random.uniform(0, self.jitter))
+
+
+class TaskScheduler:
+    """Runs periodic tasks with overlap prevention across processes and nodes.
+
+    Every node may run the same scheduler. When a task is due, the node that
+    takes the task's Postgres advisory lock runs it; the others skip that
+    round. The lock is held for the whole run, so a slow run never overlaps
+    the next one, and a run is skipped when another node already ran the
+    task within half its interval. Each run is recorded in
+    scheduled_task_runs.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self.node = f"{socket.gethostname()}:{os.getpid()}"
+        self._runners: List[asyncio.Task] = []
+        self._stop_event: Optional[asyncio.Event] = None
+
+    def add_task(self, name: str, func: TaskFunc, interval: Optional[float] = None,
+                 cron: Optional[str] = None, jitter: float = 0, run_on_start: bool = False,
+                 timeout: Optional[float] = None) -> ScheduledTask:
+        """Register a task; sync functions run in a worker thread"""
+        if name in self.tasks:
+            raise ValueError(f"Task already registered: {name}")
+        task = ScheduledTask(name, func, interval, cron, jitter, run_on_start, timeout)
+        self.tasks[name] = task
+        return task
+
+    async def start(self) -> None:
+        """Start one timer loop per registered task"""
+        self._stop_event = asyncio.Event()
+        self._runners = [
+            asyncio.create_task(self._run_task_loop(task), name=f"scheduler-{task.name}")
+            for task in self.tasks.values()
+        ]
+
+    async def stop(self) -> None:
+        """Stop the timer loops, letting running tasks finish"""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+        self._runners = []
+
+    async def run(self) -> None:
+        """Run the scheduler until stop is called"""
+        await self.start()
+        await asyncio.gather(*self._runners, return_exceptions=True)
+
+    async def _run_task_loop(self, task: ScheduledTask) -> None:
+        """Wait for each due time of a task and run it"""
+        if task.run_on_start:
+            await self.run_task(task)
+        while not self._stop_event.is_set():
+            now = datetime.now(timezone.utc)
+            delay = (task.next_run(now) - now).total_seconds()
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=max(0.0, delay))
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self.run_task(task)
+
+    async def run_task(self, task: ScheduledTask) -> Optional[str]:
+        """Run a task once if this node wins its lock, returning the run status"""
+        if task.running:
+            # The previous run on this node is still going
+            return None
+
+        task.running = True
+        try:
+            connection = await asyncio.to_thread(self._try_lock, task)
+            if connection is None:
+                return None
+            try:
+                if await asyncio.to_thread(self._ran_recently, task):
+                    return None
+                return await self._execute(task)
+            finally:
+                await asyncio.to_thread(self._unlock, task, connection)
+        except Exception as e:
+            print(f"Scheduler error in {task.name}: {str(e)}")
+            return None
+        finally:
+            task.running = False
+
+    async def _execute(self, task: ScheduledTask) -> str:
+        """Call the task function and record the run"""
+        started_at = datetime.now(timezone.utc)
+        task.last_started_at = started_at
+        run_id = await asyncio.to_thread(self._record_start, task, started_at)
+
+        result, error_message, status = None, None, "succeeded"
+        try:
+            if inspect.iscoroutinefunction(task.func):
+                call = task.func()
+            else:
+                call = asyncio.to_thread(task.func)
+            result = await asyncio.wait_for(call, timeout=task.timeout) if task.timeout else await call
+        except asyncio.TimeoutError:
+            status, error_message = "timed_out", f"Timed out after {task.timeout} seconds"
+        except Exception as e:
+            status, error_message = "failed", str(e)
+
+        task.last_status = status
+        await asyncio.to_thread(self._record_finish, run_id, started_at, status, result, error_message)
+        return status
+
+    def _try_lock(self, task: ScheduledTask):
+        """Take the task's advisory lock on a dedicated connection, or return None"""
+        connection = engine.connect()
+        try:
+            locked = connection.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": task.lock_key}
+            ).scalar()
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if not locked:
+            connection.close()
+            return None
+        return connection
+
+    def _unlock(self, task: ScheduledTask, connection) -> None:
+        """Release the task's advisory lock"""
+        try:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": task.lock_key})
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _ran_recently(self, task: ScheduledTask) -> bool:
+        """Check whether any node started this task within its minimum spacing"""
+        db = SessionLocal()
+        try:
+            since = datetime.now(timezone.utc) - task.min_spacing
+            return db.query(ScheduledTaskRun.id).filter(
+                ScheduledTaskRun.task_name == task.name,
+                ScheduledTaskRun.started_at >= since
+            ).first() is not None
+        finally:
+            db.close()
+
+    def _record_start(self, task: ScheduledTask, started_at: datetime) -> str:
+        """Insert the history row of a run"""
+        db = SessionLocal()
+        try:
+            run = ScheduledTaskRun(task_name=task.name, node=self.node, status="running", started_at=started_at)
+            db.add(run)
+            db.commit()
+            return str(run.id)
+        finally:
+            db.close()
+
+    def _record_finish(self, run_id: str, started_at: datetime, status: str,
+                       result: Any, error_message: Optional[str]) -> None:
+        """Complete the history row of a run"""
+        finished_at = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            db.query(ScheduledTaskRun).filter(ScheduledTaskRun.id == run_id).update({
+                'status': status,
+                'finished_at': finished_at,
+                'duration_ms': int((finished_at - started_at).total_seconds() * 1000),
+                'result': result if isinstance(result, (dict, list, int, float, str)) else None,
+                'error_message': error_message
+            }, synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def get_status(self) -> List[Dict[str, Any]]:
+        """Get the schedule and last run of each task on this node"""
+        return [
+            {
+                'name': task.name,
+                'interval': task.interval,
+                'cron': task.cron.expression if task.cron else None,
+                'jitter': task.jitter,
+                'running': task.running,
+                'last_started_at': task.last_started_at,
+                'last_status': task.last_status
+            }
+            for task in self.tasks.values()
+        ]
+
+
+def cleanup_uploads() -> Dict[str, int]:
+    """Delete uploaded files older than the retention period"""
+    deleted = FileProcessor().cleanup_old_files(settings.upload_retention_days)
+    return {'deleted_files': deleted}
+
+
+def prune_task_history() -> Dict[str, int]:
+    """Delete scheduler run history older than the retention period"""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.scheduler_history_retention_days)
+    db = SessionLocal()
+    try:
+        deleted = db.query(ScheduledTaskRun).filter(
+            ScheduledTaskRun.started_at < cutoff
+        ).delete(synchronize_session=False)
+        db.commit()
+        return {'deleted_runs': deleted}
+    finally:
+        db.close()
+
+
+def build_scheduler(pipeline=None) -> TaskScheduler:
+    """Create a scheduler with the standard maintenance tasks.
+
+    Mailbox polling is scheduled only when an ingesting pipeline is passed,
+    so the advisory lock makes exactly one node poll each round.
+    """
+    scheduler = TaskScheduler()
+    if pipeline is not None and "ingest" in ROLE_STAGES[pipeline.role]:
+        scheduler.add_task(
+            "poll_mailboxes", pipeline.poll_mailboxes,
+            interval=settings.scheduler_mailbox_poll_interval,
+            jitter=settings.scheduler_mailbox_poll_jitter,
+            run_on_start=True
+        )
+    scheduler.add_task("cleanup_uploads", cleanup_uploads, cron=settings.scheduler_upload_cleanup_cron)
+    scheduler.add_task("prune_task_history", prune_task_history, cron="0 4 * * *")
+    return scheduler
@@ -0,0 +1,232 @@
+import smtplib
+import threading
+import time
+from email.message import Message
+from typing import Any, Dict, List, Optional, Tuple
+from app.config import settings
+
+
+SmtpKey = Tuple[str, int, str]
+
+def is_connection_error(error: Exception) -> bool:
+    """Whether an SMTP error means the session is gone, rather than a refusal.
+
+    SMTPException subclasses OSError, so socket errors are told apart from
+    server replies by exclusion.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """Whether the server rejected a message outright (5xx), so resending won't help"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def resolve_smtp_settings(email_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Get the SMTP server and login for a mailbox, falling back to the global account"""
+    if email_config and email_config.get('smtp_host'):
+        return {
+            'host': email_config['smtp_host'],
+            'port': email_config.get('smtp_port') or 587,
+            'username': email_config.get('smtp_username'),
+            'password': email_config.get('smtp_password')
+        }
+    return {
+        'host': settings.smtp_host,
+        'port': settings.smtp_port,
+        'username': settings.smtp_username,
+        'password': settings.smtp_password
+    }
+
+
+class PooledSmtpSession:
+    """An open, logged-in SMTP session and how much it has been used"""
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+
+    def close(self) -> None:
+        try:
+            self.smtp.quit()
+        except Exception:
+            try:
+                self.smtp.close()
+            except Exception:
+                pass
+
+
+class SmtpConnectionPool:
+    """Keeps SMTP sessions open between sends, per server and login.
+
+    Sending takes an idle session for the SMTP settings if there is one,
+    so a run of replies pays for one TLS handshake and login rather than
+    one per message. A session idle for more than SMTP_NOOP_INTERVAL is
+    checked with NOOP before use, sessions idle past SMTP_IDLE_TIMEOUT or
+    that sent SMTP_MAX_MESSAGES_PER_CONNECTION messages are closed, and at
+    most SMTP_POOL_SIZE sessions are open per server and login.
+    """
+
+    def __init__(self):
+        self._idle: Dict[SmtpKey, List[PooledSmtpSession]] = {}
+        self._slots: Dict[SmtpKey, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.stats = {'connects': 0, 'reuses': 0, 'health_check_failures': 0, 'sent': 0, 'failed': 0}
+
+    @staticmethod
+    def pool_key(smtp_settings: Dict[str, Any]) -> SmtpKey:
+        return (smtp_settings['host'].lower(), int(smtp_settings['port']), smtp_settings.get('username') or '')
+
+    def _connect(self, smtp_settings: Dict[str, Any]) -> PooledSmtpSession:
+        """Open and log in a new session"""
+        if int(smtp_settings['port']) == 465:
+            smtp = smtplib.SMTP_SSL(smtp_settings['host'], smtp_settings['port'], timeout=settings.smtp_timeout)
+        else:
+            smtp = smtplib.SMTP(smtp_settings['host'], smtp_settings['port'], timeout=settings.smtp_timeout)
+            if settings.smtp_use_tls:
+                smtp.starttls()
+        try:
+            if smtp_settings.get('username'):
+                smtp.login(smtp_settings['username'], smtp_settings['password'])
+        except Exception:
+            smtp.close()
+            raise
+        with self._lock:
+            self.stats['connects'] += 1
+        return PooledSmtpSession(smtp)
+
+    def _healthy(self, session: PooledSmtpSession) -> bool:
+        """Check a session that sat idle is still open on the server"""
+        try:
+            return session.smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _acquire(self, key: SmtpKey, smtp_settings: Dict[str, Any]) -> PooledSmtpSession:
+        """Take an idle session for the key, checking it if needed, or open one"""
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                session = idle.pop() if idle else None
+            if session is None:
+                return self._connect(smtp_settings)
+            idle_for = now - session.last_used
+            if idle_for > settings.smtp_idle_timeout:
+                session.close()
+                continue
+            if idle_for > settings.smtp_noop_interval and not self._healthy(session):
+                with self._lock:
+                    self.stats['health_check_failures'] += 1
+                session.close()
+                continue
+            with self._lock:
+                self.stats['reuses'] += 1
+            return session
+
+    def _release(self, key: SmtpKey, session: Optional[PooledSmtpSession]) -> None:
+        """Return a session to the pool, or close it once it has sent its share"""
+        if session is None:
+            return
+        if session.messages_sent >= settings.smtp_max_messages_per_connection:
+            session.close()
+            return
+        session.last_used = time.monotonic()
+        with self._lock:
+            self._idle.setdefault(key, []).append(session)
+
+    def send_many(self, smtp_settings: Dict[str, Any],
+                  messages: List[Tuple[Message, str, List[str]]]) -> List[Dict[str, Any]]:
+        """Send (message, from, recipients) tuples over one pooled session.
+
+        Returns a status dict per message, in order, whose 'permanent' flag
+        marks a 5xx rejection that a retry would not fix. A message refused by
+        the server fails on its own and the session carries on; a dropped
+        connection is reopened and the message tried once more. If no
+        session can be opened, the remaining messages all fail with that
+        error rather than each trying to log in again.
+        """
+        key = self.pool_key(smtp_settings)
+        with self._lock:
+            slot = self._slots.setdefault(key, threading.BoundedSemaphore(settings.smtp_pool_size))
+        results: List[Dict[str, Any]] = []
+        session = None
+        with slot:
+            try:
+                for index, (message, from_addr, recipients) in enumerate(messages):
+                    try:
+                        result = self._send_one(key, smtp_settings, session, message, from_addr, recipients)
+                    except Exception as e:
+                        # Only raised once the previous session was closed
+                        session = None
+                        results.extend(
+                            {'status': "failed", 'error': str(e), 'permanent': False} for _ in messages[index:]
+                        )
+                        break
+                    session = result.pop('session')
+                    results.append(result)
+            finally:
+                self._release(key, session)
+        with self._lock:
+            for result in results:
+                self.stats['sent' if result['status'] == "sent" else 'failed'] += 1
+        return results
+
+    def _send_one(self, key: SmtpKey, smtp_settings: Dict[str, Any], session: Optional[PooledSmtpSession],
+                  message: Message, from_addr: str, recipients: List[str]) -> Dict[str, Any]:
+        """Send one message, reconnecting once if the session has gone away.
+
+        Errors opening a session are raised to the caller.
+        """
+        for attempt in range(2):
+            if session is None:
+                session = self._acquire(key, smtp_settings)
+            try:
+                session.smtp.send_message(message, from_addr, recipients)
+                session.messages_sent += 1
+                if session.messages_sent >= settings.smtp_max_messages_per_connection:
+                    session.close()
+                    session = None
+                return {'status': "sent", 'error': None, 'permanent': False, 'session': session}
+            except OSError as e:
+                if not is_connection_error(e):
+                    # Refused by the server; smtplib has already reset the
+                    # transaction, so the session can send the next message
+                    return {'status': "failed", 'error': str(e), 'permanent': is_permanent_failure(e),
+                            'session': session}
+                session.close()
+                session = None
+                if attempt == 1:
+                    return {'status': "failed", 'error': str(e), 'permanent': False, 'session': None}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get send counters and how many sessions sit idle per server"""
+        with self._lock:
+            return {
+                **self.stats,
+                'idle_sessions': {f"{host}:{port}": len(idle) for (host, port, _), idle in self._idle.items() if idle}
+            }
+
+    def close_all(self) -> None:
+        """Close every idle session"""
+        with self._lock:
+            sessions = [session for idle in self._idle.values() for session in idle]
+            self._idle = {}
+        for session in sessions:
+            session.close()
+
+
+_smtp_pool: Optional[SmtpConnectionPool] = None
+
+
+def get_smtp_pool() -> SmtpConnectionPool:
+    """Get the process-wide SMTP connection pool"""
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SmtpConnectionPool()
+    return _smtp_pool
@@ -0,0 +1,210 @@
+import re
+import string
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+from app.config import settings
+from app.models.email_template import EmailTemplate
+from app.models.resume_submission import ResumeSubmission
+from app.models.scoring_result import ScoringResult
+
+
+RenderFunction = Callable[[Mapping[str, Any]], str]
+
+FIELD_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+CONVERSIONS = {'s': "_str", 'r': "_repr", 'a': "_ascii"}
+
+
+class TemplateError(ValueError):
+    """A template that cannot be compiled"""
+
+
+def compile_template(source: str) -> RenderFunction:
+    """Compile a str.format-style template into a render function.
+
+    The template is parsed once into a generated function that joins the
+    literal text with each field's value, so rendering does no parsing.
+    Template text only ever becomes constants of that function, never
+    code. Placeholders must be plain names; attribute and index lookups
+    such as {name.attr} or {name[0]} are rejected, as str.format would
+    let them reach into the field values.
+    """
+    try:
+        parsed = list(string.Formatter().parse(source))
+    except ValueError as e:
+        raise TemplateError(str(e)) from e
+
+    constants: List[Any] = []
+    terms: List[str] = []
+
+    def constant(value: Any) -> str:
+        constants.append(value)
+        return f"_c[{len(constants) - 1}]"
+
+    for literal, field_name, format_spec, conversion in parsed:
+        if literal:
+            terms.append(constant(literal))
+        if field_name is None:
+            continue
+        if not FIELD_NAME.match(field_name):
+            raise TemplateError(f"Unsupported placeholder {{{field_name}}}: use a plain field name")
+        if format_spec and '{' in format_spec:
+            raise TemplateError(f"Nested placeholders are not supported in {{{field_name}:{format_spec}}}")
+        value = f"_f[{constant(field_name)}]"
+        if conversion:
+            if conversion not in CONVERSIONS:
+                raise TemplateError(f"Unknown conversion !{conversion} in {{{field_name}}}")
+            value = f"{CONVERSIONS[conversion]}({value})"
+        terms.append(f"_format({value}, {constant(format_spec)})" if format_spec else f"_str({value})")
+
+    if not terms:
+        return lambda fields: ""
+    code = "def render(_f):\n    return ''.join((" + ", ".join(terms) + ",))\n"
+    namespace = {
+        '__builtins__': {}, '_c': tuple(constants),
+        '_format': format, '_str': str, '_repr': repr, '_ascii': ascii
+    }
+    exec(compile(code, "<email template>", "exec"), namespace)
+    return namespace['render']
+
+
+class CompiledTemplate:
+    """An email template's subject and body, compiled once for rendering"""
+
+    def __init__(self, template_id: str, name: str, subject_template: str, body_template: str,
+                 recommendation_type: Optional[str] = None, is_default: bool = False):
+        self.id = template_id
+        self.name = name
+        self.recommendation_type = recommendation_type
+        self.is_default = is_default
+        self.render_subject = compile_template(subject_template)
+        self.render_body = compile_template(body_template)
+
+    @classmethod
+    def from_model(cls, template: EmailTemplate) -> "CompiledTemplate":
+        return cls(str(template.id), template.name, template.subject_template, template.body_template,
+                   template.recommendation_type, bool(template.is_default))
+
+    def render(self, fields: Mapping[str, Any]) -> Dict[str, str]:
+        """Render the subject and body for one recipient"""
+        return {
+            'subject': self.render_subject(fields)[:500],
+            'body': self.render_body(fields),
+            'template_name': self.name
+        }
+
+
+class TemplateEngine:
+    """Selects and renders users' email templates from compiled forms.
+
+    Compiled templates are cached by template id and updated_at, so an
+    edited template is compiled again and an unchanged one never is. Each
+    user's active templates are indexed by recommendation_type in memory
+    and reloaded after TEMPLATE_INDEX_TTL seconds, or at once when this
+    process changes them; other processes pick up edits within the TTL.
+    """
+
+    def __init__(self):
+        self._compiled: "OrderedDict[Tuple[str, Any], CompiledTemplate]" = OrderedDict()
+        self._index: Dict[str, Tuple[float, Dict[Optional[str], CompiledTemplate], Optional[CompiledTemplate]]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'compiles': 0, 'compile_cache_hits': 0, 'index_loads': 0, 'index_hits': 0}
+
+    def _compile(self, template: EmailTemplate) -> CompiledTemplate:
+        """Get a template's compiled form, compiling it if it changed"""
+        key = (str(template.id), template.updated_at)
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is not None:
+                self._compiled.move_to_end(key)
+                self.stats['compile_cache_hits'] += 1
+                return compiled
+        compiled = CompiledTemplate.from_model(template)
+        with self._lock:
+            self._compiled[key] = compiled
+            self.stats['compiles'] += 1
+            while len(self._compiled) > settings.template_cache_size:
+                self._compiled.popitem(last=False)
+        return compiled
+
+    def _load_index(self, db, user_id: str):
+        """Index a user's active templates by recommendation type"""
+        templates = db.query(EmailTemplate).filter(
+            EmailTemplate.user_id == user_id,
+            EmailTemplate.is_active == True
+        ).order_by(EmailTemplate.created_at).all()
+        by_recommendation: Dict[Optional[str], CompiledTemplate] = {}
+        default = None
+        for template in templates:
+            try:
+                compiled = self._compile(template)
+            except TemplateError as e:
+                print(f"Skipping email template {template.id}: {str(e)}")
+                continue
+            by_recommendation.setdefault(template.recommendation_type, compiled)
+            if default is None and template.is_default:
+                default = compiled
+        entry = (time.monotonic(), by_recommendation, default)
+        with self._lock:
+            self._index[user_id] = entry
+            self.stats['index_loads'] += 1
+        return entry
+
+    def select(self, db, user_id, recommendation: Optional[str]) -> Optional[CompiledTemplate]:
+        """Pick the user's template for a recommendation, falling back to the default"""
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._index.get(user_id)
+            fresh = entry is not None and time.monotonic() - entry[0] < settings.template_index_ttl
+            if fresh:
+                self.stats['index_hits'] += 1
+        if not fresh:
+            entry = self._load_index(db, user_id)
+        _, by_recommendation, default = entry
+        return by_recommendation.get(recommendation) or default
+
+    def invalidate(self, user_id) -> None:
+        """Drop a user's index after their templates change"""
+        with self._lock:
+            self._index.pop(str(user_id), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'compiled_templates': len(self._compiled), 'indexed_users': len(self._index)}
+
+
+class TemplateFields(dict):
+    """Template fields that render unknown placeholders as empty strings"""
+
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+def build_template_fields(submission: ResumeSubmission, scoring_result: ScoringResult) -> TemplateFields:
+    """Build the placeholder values available to email templates"""
+    job_description = submission.job_description
+    return TemplateFields({
+        'candidate_name': submission.candidate_name or 'Candidate',
+        'candidate_email': submission.candidate_email,
+        'position': job_description.title if job_description else (submission.position_applied or ''),
+        'company': job_description.company if job_description else '',
+        'total_score': scoring_result.total_score,
+        'recommendation': scoring_result.recommendation or '',
+        'job_match_score': scoring_result.job_match_score,
+        'experience_score': scoring_result.experience_score,
+        'education_score': scoring_result.education_score,
+        'stability_score': scoring_result.stability_score,
+        'presentation_score': scoring_result.presentation_score
+    })
+
+
+_template_engine: Optional[TemplateEngine] = None
+
+
+def get_template_engine() -> TemplateEngine:
+    """Get the process-wide template engine"""
+    global _template_engine
+    if _template_engine is None:
+        _template_engine = TemplateEngine()
+    return _template_engine
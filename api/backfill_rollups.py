@@ -0,0 +1,31 @@
+import argparse
+from datetime import date, timedelta
+from typing import Optional
+from app.database import SessionLocal
+from app.services.rollups import rebuild_daily_rollups
+
+
+def main(user_id: Optional[str], days: Optional[int]) -> None:
+    """Recompute the daily dashboard rollups from the submission tables"""
+    since = date.today() - timedelta(days=days - 1) if days else None
+    db = SessionLocal()
+    try:
+        written = rebuild_daily_rollups(db, user_id=user_id, since=since)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    scope = f"user {user_id}" if user_id else "all users"
+    window = f"the last {days} days" if days else "all history"
+    print(f"Wrote {written} daily rollups for {scope} over {window}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill the per-user daily dashboard rollups")
+    parser.add_argument("--user", default=None, help="Rebuild one user's rollups (default: every user)")
+    parser.add_argument("--days", type=int, default=None,
+                        help="Rebuild only the last N days (default: all history)")
+    args = parser.parse_args()
+    main(args.user, args.days)
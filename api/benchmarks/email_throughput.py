@@ -0,0 +1,167 @@
+"""Benchmark mailbox ingestion and outgoing mail against local stand-in servers.
+
+Seeds a stand-in POP3 (or IMAP) mailbox with synthetic applications carrying
+PDF/DOCX resumes. It then drains the mailbox through EmailProcessor, which
+fetches each message, parses it as it streams and spools the resume to a
+temporary upload directory, and reports messages per second. With
+--parse-workers the spooled resumes are also run through ResumeParser in a
+process pool. Finally it sends candidate replies through the pooled SMTP
+client to a stand-in SMTP server and reports messages per second. No
+database or real mail provider is needed.
+
+    python benchmarks/email_throughput.py --messages 2000 --send 2000
+    python benchmarks/email_throughput.py --protocol imap --parse-workers 4
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402
+from devtools.imap_server import StandInImapServer  # noqa: E402
+from devtools.mail_fixtures import generate_mail  # noqa: E402
+from devtools.pop3_server import StandInPop3Server  # noqa: E402
+from devtools.smtp_server import StandInSmtpServer  # noqa: E402
+
+
+def report(label: str, count: int, elapsed: float, extra: str = "") -> None:
+    rate = count / elapsed if elapsed else 0.0
+    print(f"{label:<10} {count} in {elapsed:.2f}s ({rate:,.1f}/s){extra}")
+
+
+def bench_fetch(email_processor, protocol: str, messages: int, noise: float, batch_size: int) -> list:
+    """Drain a seeded mailbox, returning the spooled resumes"""
+    raw_messages = list(generate_mail(messages, noise))
+    raw_bytes = sum(len(raw) for raw in raw_messages)
+    if protocol == "imap":
+        server = StandInImapServer()
+        for raw in raw_messages:
+            server.deliver(raw)
+    else:
+        server = StandInPop3Server()
+        server.maildrop.deliver_many(raw_messages)
+    host, port = server.start()
+    email_config = {
+        'id': "benchmark",
+        'pop3_host': host, 'pop3_port': port, 'pop3_username': "test", 'pop3_password': "test",
+        'imap_host': host, 'imap_port': port, 'imap_username': "test", 'imap_password': "test",
+        'imap_folder': "INBOX"
+    }
+    fetch = email_processor.fetch_imap_emails if protocol == "imap" else email_processor.fetch_emails
+
+    emails, seen, sessions = [], set(), 0
+    started = time.perf_counter()
+    try:
+        while True:
+            result = fetch(email_config, skip_uids=seen, batch_size=batch_size)
+            sessions += 1
+            if result['error']:
+                raise RuntimeError(result['error'])
+            emails.extend(result['emails'])
+            seen.update(email_data['uid'] for email_data in result['emails'])
+            seen.update(result['skipped_uids'])
+            if not result['remaining']:
+                break
+    finally:
+        server.stop()
+    elapsed = time.perf_counter() - started
+
+    attachments = [attachment for email_data in emails for attachment in email_data['attachments']]
+    report("fetch", messages, elapsed, (
+        f", {raw_bytes / elapsed / 1e6:.1f} MB/s over {sessions} {protocol.upper()} sessions; "
+        f"{len(attachments)} resumes spooled, {messages - len(emails)} skipped"
+    ))
+    screening = email_processor.mail_classifier.get_stats()
+    print(f"{'screening':<10} skip rate {screening['skip_rate']:.1%}, "
+          f"{screening['bytes_saved'] / 1e6:.1f} MB not downloaded")
+    return attachments
+
+
+def bench_parse(attachments: list, workers: int) -> None:
+    """Parse the spooled resumes in a process pool, as the parse stage does"""
+    from app.services.pipeline import parse_resume_file
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(
+            parse_resume_file,
+            [attachment['path'] for attachment in attachments],
+            [Path(attachment['filename']).suffix.lstrip('.').lower() for attachment in attachments],
+            chunksize=16
+        ))
+    elapsed = time.perf_counter() - started
+    named = sum(1 for parsed in results if parsed.get('extracted_name'))
+    report("parse", len(results), elapsed, f" with {workers} workers; {named} with a name extracted")
+
+
+def bench_send(email_processor, count: int, batch_size: int, threads: int) -> None:
+    """Send replies in batches over the pooled SMTP client"""
+    server = StandInSmtpServer(keep_messages=False)
+    host, port = server.start()
+    email_config = {'smtp_host': host, 'smtp_port': port, 'smtp_username': "test", 'smtp_password': "test"}
+    emails = [
+        {
+            'to_email': f"candidate{index}@example.org",
+            'subject': "Your application",
+            'body': "Thank you for applying. We will be in touch about next steps.\n" * 5
+        }
+        for index in range(count)
+    ]
+    batches = [emails[start:start + batch_size] for start in range(0, count, batch_size)]
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            results = [
+                result
+                for batch_results in pool.map(lambda batch: email_processor.send_many(batch, email_config), batches)
+                for result in batch_results
+            ]
+    finally:
+        email_processor.smtp_pool.close_all()
+        server.stop()
+    elapsed = time.perf_counter() - started
+    failed = sum(1 for result in results if result['status'] != "sent")
+    report("send", count, elapsed, f" over {server.sessions} SMTP sessions; {failed} failed")
+
+
+def main(args) -> None:
+    upload_dir = tempfile.mkdtemp(prefix="email-benchmark-")
+    settings.upload_dir = upload_dir
+    settings.pop3_use_ssl = False
+    settings.imap_use_ssl = False
+    settings.smtp_use_tls = False
+    settings.smtp_pool_size = max(settings.smtp_pool_size, args.send_threads)
+
+    from app.services.email_processor import EmailProcessor
+
+    email_processor = EmailProcessor()
+    try:
+        if args.messages:
+            attachments = bench_fetch(email_processor, args.protocol, args.messages, args.noise,
+                                      args.fetch_batch_size)
+            if args.parse_workers and attachments:
+                bench_parse(attachments, args.parse_workers)
+        if args.send:
+            bench_send(email_processor, args.send, args.send_batch_size, args.send_threads)
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark email ingestion and sending")
+    parser.add_argument("--protocol", choices=["pop3", "imap"], default="pop3")
+    parser.add_argument("--messages", type=int, default=1000, help="Messages to seed and fetch")
+    parser.add_argument("--noise", type=float, default=0.1,
+                        help="Share of seeded messages that are newsletters, auto-replies or bounces")
+    parser.add_argument("--fetch-batch-size", type=int, default=settings.email_fetch_batch_size)
+    parser.add_argument("--parse-workers", type=int, default=0, help="Also parse the resumes with this many processes")
+    parser.add_argument("--send", type=int, default=1000, help="Replies to send")
+    parser.add_argument("--send-batch-size", type=int, default=50)
+    parser.add_argument("--send-threads", type=int, default=4)
+    main(parser.parse_args())
@@ -0,0 +1,96 @@
+"""Benchmark candidate response rendering: str.format_map vs compiled templates.
+
+Renders the same personalized reply for a batch of synthetic scoring results,
+once by formatting the stored template strings and once through
+CompiledTemplate, and prints renders per second for each. No database is
+needed.
+
+    python benchmarks/template_rendering.py --renders 50000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.template_engine import CompiledTemplate, TemplateFields  # noqa: E402
+
+
+SUBJECT = "Your application for {position} at {company}"
+BODY = """Dear {candidate_name},
+
+Thank you for applying for the {position} role at {company}. We have reviewed
+your resume and your overall score is {total_score:.1f} out of 100
+(job match {job_match_score:.0f}, experience {experience_score:.0f},
+education {education_score:.0f}).
+
+Our recommendation: {recommendation}.
+
+We will contact you at {candidate_email} about next steps.
+
+Kind regards,
+The {company} hiring team
+"""
+RECOMMENDATIONS = ["strong_match", "good_match", "possible_match", "not_a_match"]
+
+
+def build_fields(count: int):
+    rng = random.Random(42)
+    return [
+        TemplateFields({
+            'candidate_name': f"Candidate {index}",
+            'candidate_email': f"candidate{index}@example.com",
+            'position': "Backend Engineer",
+            'company': "Example Corp",
+            'total_score': rng.uniform(0, 100),
+            'recommendation': rng.choice(RECOMMENDATIONS),
+            'job_match_score': rng.uniform(0, 100),
+            'experience_score': rng.uniform(0, 100),
+            'education_score': rng.uniform(0, 100),
+            'stability_score': rng.uniform(0, 100),
+            'presentation_score': rng.uniform(0, 100)
+        })
+        for index in range(count)
+    ]
+
+
+def measure(label: str, render, batch) -> float:
+    started = time.perf_counter()
+    for fields in batch:
+        render(fields)
+    elapsed = time.perf_counter() - started
+    rate = len(batch) / elapsed
+    print(f"{label:<12} {len(batch)} renders in {elapsed:.3f}s ({rate:,.0f}/s)")
+    return rate
+
+
+def main(renders: int, rounds: int) -> None:
+    batch = build_fields(renders)
+    compiled = CompiledTemplate("benchmark", "benchmark", SUBJECT, BODY)
+
+    def format_map(fields):
+        return SUBJECT.format_map(fields)[:500], BODY.format_map(fields)
+
+    def compiled_render(fields):
+        return compiled.render(fields)
+
+    for fields in batch[:100]:
+        rendered = compiled.render(fields)
+        assert (rendered['subject'], rendered['body']) == format_map(fields)
+
+    best = {'format_map': 0.0, 'compiled': 0.0}
+    for _ in range(rounds):
+        best['format_map'] = max(best['format_map'], measure("format_map", format_map, batch))
+        best['compiled'] = max(best['compiled'], measure("compiled", compiled_render, batch))
+    print(f"Best of {rounds}: format_map {best['format_map']:,.0f}/s, compiled {best['compiled']:,.0f}/s "
+          f"({best['compiled'] / best['format_map']:.2f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark email template rendering")
+    parser.add_argument("--renders", type=int, default=50000, help="Renders per round")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per method; the best is reported")
+    args = parser.parse_args()
+    main(args.renders, args.rounds)
@@ -0,0 +1,358 @@
+"""Local stand-in IMAP server for exercising IMAP ingestion without a real mail provider.
+
+Implements the subset of IMAP4rev1 that EmailProcessor uses: LOGIN,
+SELECT/EXAMINE, UID SEARCH, (UID) FETCH of UID, BODYSTRUCTURE, header fields
+and body sections, IDLE, NOOP and LOGOUT. Messages live in memory; deliver()
+adds one and notifies idling clients with an EXISTS response. Run it directly
+to serve the .eml files in a directory, picking up new ones as they appear:
+
+    python devtools/imap_server.py --port 1143 --spool ./mail
+"""
+import argparse
+import os
+import re
+import select
+import socketserver
+import threading
+import time
+from email import message_from_bytes, utils
+from email.message import Message
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+class StandInMailbox:
+    """An in-memory folder of (uid, raw message) pairs"""
+
+    def __init__(self, uidvalidity: Optional[int] = None):
+        self.uidvalidity = uidvalidity or int(time.time())
+        self.messages: List[Tuple[int, bytes]] = []
+        self.next_uid = 1
+        self.changed = threading.Condition()
+
+    def deliver(self, raw: bytes) -> int:
+        """Add a message and wake idling sessions, returning its uid"""
+        with self.changed:
+            uid = self.next_uid
+            self.next_uid += 1
+            self.messages.append((uid, raw.replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')))
+            self.changed.notify_all()
+            return uid
+
+    def count(self) -> int:
+        with self.changed:
+            return len(self.messages)
+
+    def snapshot(self) -> List[Tuple[int, bytes]]:
+        with self.changed:
+            return list(self.messages)
+
+
+def _quote(value: Optional[str]) -> str:
+    if value is None:
+        return "NIL"
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _params(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return "NIL"
+    return "(" + " ".join(f"{_quote(key)} {_quote(value)}" for key, value in pairs) + ")"
+
+
+def _part_params(part: Message, header: str) -> List[Tuple[str, str]]:
+    """Get a header's parameters, re-encoding RFC 2231 values as servers send them"""
+    params = []
+    for key, value in (part.get_params(header=header) or [])[1:]:
+        if isinstance(value, tuple):
+            charset, language, _ = value
+            text = utils.collapse_rfc2231_value(value)
+            params.append((f"{key}*", utils.encode_rfc2231(text, charset, language or None)))
+        else:
+            params.append((key, value))
+    return params
+
+
+def _raw_payload(part: Message) -> bytes:
+    """The part body as transmitted, still transfer-encoded"""
+    payload = part.get_payload()
+    if isinstance(payload, list):
+        return b""
+    return payload.encode('utf-8', errors='replace').replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')
+
+
+def body_structure(part: Message) -> str:
+    """Build the BODYSTRUCTURE of a message part (message/rfc822 is described as a leaf)"""
+    if part.is_multipart():
+        children = "".join(body_structure(child) for child in part.get_payload())
+        return f"({children} {_quote(part.get_content_subtype().upper())})"
+
+    params = _part_params(part, 'content-type')
+    payload = _raw_payload(part)
+    fields = [
+        _quote(part.get_content_maintype().upper()),
+        _quote(part.get_content_subtype().upper()),
+        _params(params),
+        _quote(part.get('Content-ID')),
+        _quote(part.get('Content-Description')),
+        _quote((part.get('Content-Transfer-Encoding') or '7BIT').upper()),
+        str(len(payload))
+    ]
+    if part.get_content_maintype() == 'text':
+        fields.append(str(payload.count(b'\r\n')))
+    disposition = part.get('Content-Disposition')
+    if disposition:
+        disposition_type = disposition.split(';', 1)[0].strip().upper()
+        fields += ["NIL", f"({_quote(disposition_type)} {_params(_part_params(part, 'content-disposition'))})"]
+    return "(" + " ".join(fields) + ")"
+
+
+def body_section(message: Message, section: str) -> bytes:
+    """Get a numbered body section such as 1 or 2.1"""
+    part = message
+    for index in section.split('.'):
+        if part.is_multipart():
+            part = part.get_payload()[int(index) - 1]
+        elif index != '1':
+            return b""
+    return _raw_payload(part)
+
+
+def header_fields(raw: bytes, names: List[str]) -> bytes:
+    """Get the named header lines of a message, followed by the blank line"""
+    header_block = raw.split(b'\r\n\r\n', 1)[0]
+    lines, current = [], b""
+    for line in header_block.split(b'\r\n'):
+        if line[:1] in (b' ', b'\t'):
+            current += b'\r\n' + line
+            continue
+        if current:
+            lines.append(current)
+        current = line
+    if current:
+        lines.append(current)
+    wanted = {name.upper() for name in names}
+    selected = [line for line in lines if line.split(b':', 1)[0].decode(errors='ignore').upper() in wanted]
+    return b"".join(line + b'\r\n' for line in selected) + b'\r\n'
+
+
+def parse_sequence_set(sequence_set: str, largest: int) -> List[int]:
+    """Expand an IMAP sequence set like 1,3:5,7:* against the largest value"""
+    values = set()
+    for item in sequence_set.split(','):
+        if ':' in item:
+            start, end = (largest if value == '*' else int(value) for value in item.split(':', 1))
+            values.update(range(min(start, end), max(start, end) + 1))
+        else:
+            values.add(largest if item == '*' else int(item))
+    return sorted(values)
+
+
+FETCH_ITEM = re.compile(r'BODY(?:\.PEEK)?\[[^\]]*\](?:<\d+\.\d+>)?|[A-Z0-9.]+', re.IGNORECASE)
+ARGUMENT = re.compile(r'"((?:[^"\\]|\\.)*)"|(\S+)')
+
+
+class ImapSessionHandler(socketserver.StreamRequestHandler):
+    """One IMAP client session"""
+
+    # Responses are often written in several pieces; without this each piece
+    # after the first waits on the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def send(self, data: bytes) -> None:
+        self.wfile.write(data)
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        try:
+            self.serve_session()
+        except (BrokenPipeError, ConnectionResetError):
+            # The client dropped the connection, e.g. after an IDLE timeout
+            pass
+
+    def serve_session(self) -> None:
+        server: "StandInImapServer" = self.server.stand_in
+        mailbox = server.mailbox
+        authenticated = False
+        self.send(b"* OK [CAPABILITY IMAP4rev1 IDLE] Stand-in IMAP server ready\r\n")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.decode(errors='ignore').rstrip('\r\n').split(' ', 2)
+            if len(parts) < 2:
+                self.send(b"* BAD Missing command\r\n")
+                continue
+            tag, command = parts[0], parts[1].upper()
+            arguments = parts[2] if len(parts) > 2 else ""
+            uid_mode = command == 'UID'
+            if uid_mode:
+                command, _, arguments = arguments.partition(' ')
+                command = command.upper()
+
+            if command == 'CAPABILITY':
+                self.send(b"* CAPABILITY IMAP4rev1 IDLE\r\n" + f"{tag} OK CAPABILITY completed\r\n".encode())
+            elif command == 'LOGIN':
+                values = [
+                    re.sub(r'\\(.)', r'\1', match.group(1)) if match.group(1) is not None else match.group(2)
+                    for match in ARGUMENT.finditer(arguments)
+                ]
+                if values[:2] == [server.username, server.password]:
+                    authenticated = True
+                    self.send(f"{tag} OK LOGIN completed\r\n".encode())
+                else:
+                    self.send(f"{tag} NO [AUTHENTICATIONFAILED] Invalid credentials\r\n".encode())
+            elif command == 'LOGOUT':
+                self.send(b"* BYE Logging out\r\n" + f"{tag} OK LOGOUT completed\r\n".encode())
+                return
+            elif command == 'NOOP':
+                self.send(f"* {mailbox.count()} EXISTS\r\n{tag} OK NOOP completed\r\n".encode())
+            elif not authenticated:
+                self.send(f"{tag} NO Log in first\r\n".encode())
+            elif command in ('SELECT', 'EXAMINE'):
+                access = "READ-ONLY" if command == 'EXAMINE' else "READ-WRITE"
+                self.send((
+                    f"* {mailbox.count()} EXISTS\r\n* 0 RECENT\r\n"
+                    f"* OK [UIDVALIDITY {mailbox.uidvalidity}] UIDs valid\r\n"
+                    f"* OK [UIDNEXT {mailbox.next_uid}] Predicted next UID\r\n"
+                    f"{tag} OK [{access}] {command} completed\r\n"
+                ).encode())
+            elif command == 'SEARCH':
+                messages = mailbox.snapshot()
+                values = [uid for uid, _ in messages] if uid_mode else list(range(1, len(messages) + 1))
+                self.send(f"* SEARCH {' '.join(map(str, values))}\r\n{tag} OK SEARCH completed\r\n".encode())
+            elif command == 'FETCH':
+                self.fetch(tag, arguments, uid_mode, mailbox)
+            elif command == 'IDLE':
+                self.idle(tag, mailbox)
+            else:
+                self.send(f"{tag} BAD Unsupported command {command}\r\n".encode())
+
+    def fetch(self, tag: str, arguments: str, uid_mode: bool, mailbox: StandInMailbox) -> None:
+        sequence_set, _, item_list = arguments.partition(' ')
+        items = FETCH_ITEM.findall(item_list.strip()[1:-1] if item_list.strip().startswith('(') else item_list)
+        messages = mailbox.snapshot()
+        if uid_mode:
+            wanted = set(parse_sequence_set(sequence_set, messages[-1][0] if messages else 0))
+            selected = [(number, uid, raw) for number, (uid, raw) in enumerate(messages, 1) if uid in wanted]
+            if not any(item.upper() == 'UID' for item in items):
+                items.insert(0, 'UID')
+        else:
+            wanted = set(parse_sequence_set(sequence_set, len(messages)))
+            selected = [(number, uid, raw) for number, (uid, raw) in enumerate(messages, 1) if number in wanted]
+
+        for number, uid, raw in selected:
+            message = message_from_bytes(raw)
+            response = f"* {number} FETCH (".encode()
+            rendered = []
+            for item in items:
+                name = item.upper()
+                if name == 'UID':
+                    rendered.append(f"UID {uid}".encode())
+                elif name == 'BODYSTRUCTURE':
+                    rendered.append(f"BODYSTRUCTURE {body_structure(message)}".encode())
+                elif name == 'RFC822.SIZE':
+                    rendered.append(f"RFC822.SIZE {len(raw)}".encode())
+                elif name.startswith('BODY'):
+                    section = item[item.index('[') + 1:item.index(']')]
+                    if section.upper().startswith('HEADER.FIELDS'):
+                        names = section[section.index('(') + 1:section.rindex(')')].split()
+                        data = header_fields(raw, names)
+                    elif section.upper() == 'HEADER':
+                        data = raw.split(b'\r\n\r\n', 1)[0] + b'\r\n\r\n'
+                    elif section == '':
+                        data = raw
+                    else:
+                        data = body_section(message, section)
+                    rendered.append(f"BODY[{section}] {{{len(data)}}}\r\n".encode() + data)
+            self.send(response + b" ".join(rendered) + b")\r\n")
+        self.send(f"{tag} OK FETCH completed\r\n".encode())
+
+    def idle(self, tag: str, mailbox: StandInMailbox) -> None:
+        """Report new messages until the client sends DONE"""
+        self.send(b"+ idling\r\n")
+        known = mailbox.count()
+        while True:
+            with mailbox.changed:
+                if mailbox.count() == known:
+                    mailbox.changed.wait(timeout=0.2)
+            count = mailbox.count()
+            if count != known:
+                known = count
+                self.send(f"* {count} EXISTS\r\n".encode())
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if readable:
+                line = self.rfile.readline()
+                if not line:
+                    return
+                if line.strip().upper() == b'DONE':
+                    self.send(f"{tag} OK IDLE terminated\r\n".encode())
+                    return
+
+
+class StandInImapServer:
+    """A threaded stand-in IMAP server on localhost"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, username: str = "test",
+                 password: str = "test", mailbox: Optional[StandInMailbox] = None):
+        self.username = username
+        self.password = password
+        self.mailbox = mailbox or StandInMailbox()
+        self._server = socketserver.ThreadingTCPServer((host, port), ImapSessionHandler, bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address
+
+    def start(self) -> Tuple[str, int]:
+        """Serve on a background thread, returning the bound address"""
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.address
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def deliver(self, raw: bytes) -> int:
+        return self.mailbox.deliver(raw)
+
+
+def watch_spool(server: StandInImapServer, spool: Path, interval: float) -> None:
+    """Deliver .eml files from a directory, including ones added later"""
+    delivered = set()
+    while True:
+        for path in sorted(spool.glob("*.eml")):
+            if path.name not in delivered:
+                delivered.add(path.name)
+                uid = server.deliver(path.read_bytes())
+                print(f"Delivered {path.name} as uid {uid}")
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in IMAP server for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1143)
+    parser.add_argument("--username", default=os.environ.get("STANDIN_IMAP_USERNAME", "test"))
+    parser.add_argument("--password", default=os.environ.get("STANDIN_IMAP_PASSWORD", "test"))
+    parser.add_argument("--spool", default=None, help="Directory of .eml files to serve")
+    args = parser.parse_args()
+
+    imap_server = StandInImapServer(args.host, args.port, args.username, args.password)
+    host, port = imap_server.start()
+    print(f"Stand-in IMAP server on {host}:{port} (user {args.username}); set IMAP_USE_SSL=false")
+    try:
+        if args.spool:
+            watch_spool(imap_server, Path(args.spool), 1.0)
+        else:
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        imap_server.stop()
@@ -0,0 +1,230 @@
+"""Synthetic job application emails for the stand-in mail servers.
+
+Each application is a multipart message from a made-up candidate with a
+short cover note and a one-page resume attached as PDF or DOCX. The PDF and
+DOCX files are built here in pure Python and hold real text, so
+ResumeParser extracts a name, email, skills and experience from them.
+Other hiring-inbox mail can be mixed in as well: newsletters with a PDF
+brochure, out-of-office replies and bounces. Write a spool directory for
+the IMAP or POP3 stand-in with:
+
+    python devtools/mail_fixtures.py --count 1000 --noise 0.3 --out ./mail
+"""
+import argparse
+import io
+import random
+import zipfile
+from email.message import EmailMessage
+from email.utils import format_datetime, make_msgid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+
+FIRST_NAMES = ["Alice", "Bilal", "Chen", "Dana", "Emeka", "Farah", "Goran", "Hana", "Ivan", "Julia",
+               "Kenji", "Lena", "Mateo", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sven", "Tariq"]
+LAST_NAMES = ["Anders", "Bauer", "Costa", "Diaz", "Evans", "Fischer", "Garcia", "Haddad", "Ito", "Jensen",
+              "Kowalski", "Lopez", "Moreau", "Novak", "Okafor", "Patel", "Rossi", "Silva", "Tanaka", "Weber"]
+POSITIONS = ["Backend Engineer", "Data Analyst", "Product Designer", "DevOps Engineer", "QA Engineer"]
+SKILLS = ["Python", "Java", "JavaScript", "SQL", "PostgreSQL", "Docker", "Kubernetes", "AWS", "React",
+          "Machine Learning", "Git", "Linux", "REST APIs", "Agile", "Communication", "Leadership"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+
+
+def resume_lines(name: str, email_address: str, rng: random.Random) -> List[str]:
+    """The text of a one-page resume"""
+    years = rng.randint(1, 15)
+    lines = [
+        name,
+        f"Email: {email_address}",
+        f"Phone: +1 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        f"LinkedIn: linkedin.com/in/{name.lower().replace(' ', '-')}",
+        "",
+        "SUMMARY",
+        f"Engineer with {years} years of experience building reliable software.",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 6)),
+        "",
+        "EXPERIENCE"
+    ]
+    end_year = 2024
+    for _ in range(rng.randint(1, 3)):
+        start_year = end_year - rng.randint(1, 5)
+        lines.append(f"Software Engineer, {rng.choice(COMPANIES)} ({start_year} - {end_year})")
+        end_year = start_year
+    lines += ["", "EDUCATION", f"Bachelor of Science in Computer Science, {rng.choice(['MIT', 'ETH', 'UCL'])}"]
+    return lines
+
+
+def _pdf_text(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_pdf(lines: List[str]) -> bytes:
+    """A single-page PDF showing the lines in Helvetica"""
+    content = "BT /F1 11 Tf 14 TL 56 780 Td\n" + "".join(f"({_pdf_text(line)}) '\n" for line in lines) + "ET"
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+        "/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(content.encode('latin-1', errors='replace'))} >>\nstream\n{content}\nendstream"
+    ]
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1', errors='replace'))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+
+def build_docx(lines: List[str]) -> bytes:
+    """A DOCX document with one paragraph per line"""
+    paragraphs = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>' for line in lines
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f'<w:body>{paragraphs}</w:body></w:document>'
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", DOCX_CONTENT_TYPES)
+        archive.writestr("_rels/.rels", DOCX_RELS)
+        archive.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+def build_application(index: int, rng: random.Random, to_address: str = "jobs@example.com",
+                      sent_at: Optional[datetime] = None) -> bytes:
+    """A candidate's application email with a PDF or DOCX resume attached"""
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    name = f"{first} {last}"
+    address = f"{first.lower()}.{last.lower()}{index}@example.org"
+    position = rng.choice(POSITIONS)
+    lines = resume_lines(name, address, rng)
+
+    message = EmailMessage()
+    message['From'] = f"{name} <{address}>"
+    message['To'] = to_address
+    message['Subject'] = f"Application for {position}"
+    message['Date'] = format_datetime(sent_at or datetime.now(timezone.utc))
+    message['Message-ID'] = make_msgid(idstring=f"application{index}", domain="example.org")
+    message.set_content(
+        f"Hello,\n\nPlease find attached my resume for the {position} position.\n\nBest regards,\n{name}\n"
+    )
+    if rng.random() < 0.5:
+        message.add_attachment(build_pdf(lines), maintype="application", subtype="pdf",
+                               filename=f"{first}_{last}_resume.pdf")
+    else:
+        message.add_attachment(
+            build_docx(lines), maintype="application",
+            subtype="vnd.openxmlformats-officedocument.wordprocessingml.document",
+            filename=f"{first}_{last}_resume.docx"
+        )
+    return message.as_bytes()
+
+
+def build_newsletter(index: int, to_address: str = "jobs@example.com") -> bytes:
+    """A mailing list newsletter with a PDF brochure, which screening can't tell from a resume"""
+    message = EmailMessage()
+    message['From'] = "Hiring Weekly <news@example.net>"
+    message['To'] = to_address
+    message['Subject'] = f"Hiring Weekly #{index}"
+    message['Message-ID'] = make_msgid(idstring=f"newsletter{index}", domain="example.net")
+    message['List-Id'] = "Hiring Weekly <weekly.example.net>"
+    message['List-Unsubscribe'] = "<mailto:unsubscribe@example.net>"
+    message.set_content("This week in hiring: ten tips for better interviews.\n" * 20)
+    message.add_attachment(build_pdf([f"Hiring Weekly #{index}"] + ["Ten tips for better interviews."] * 40),
+                           maintype="application", subtype="pdf", filename="brochure.pdf")
+    return message.as_bytes()
+
+
+def build_auto_reply(index: int, to_address: str = "jobs@example.com") -> bytes:
+    """An out-of-office reply to one of our own emails"""
+    message = EmailMessage()
+    message['From'] = f"Former Candidate <candidate{index}@example.org>"
+    message['To'] = to_address
+    message['Subject'] = "Automatic reply: Your application"
+    message['Message-ID'] = make_msgid(idstring=f"autoreply{index}", domain="example.org")
+    message['Auto-Submitted'] = "auto-replied"
+    message.set_content("I am out of the office until Monday with limited access to email.\n")
+    return message.as_bytes()
+
+
+def build_bounce(index: int, to_address: str = "jobs@example.com") -> bytes:
+    """A delivery status notification for a reply that could not be delivered"""
+    message = EmailMessage()
+    message['From'] = "Mail Delivery System <MAILER-DAEMON@example.com>"
+    message['To'] = to_address
+    message['Subject'] = "Undelivered Mail Returned to Sender"
+    message['Message-ID'] = make_msgid(idstring=f"bounce{index}", domain="example.com")
+    message.set_content(f"Your message to candidate{index}@example.org could not be delivered.\n")
+    message.add_attachment(
+        f"Reporting-MTA: dns; mail.example.com\n\nFinal-Recipient: rfc822; candidate{index}@example.org\n"
+        "Action: failed\nStatus: 5.1.1\n",
+        subtype="plain", filename="details.txt"
+    )
+    message.set_type("multipart/report")
+    message.set_param("report-type", "delivery-status")
+    return message.as_bytes()
+
+
+NOISE_BUILDERS = [build_newsletter, build_auto_reply, build_bounce]
+
+
+def generate_mail(count: int, noise_ratio: float = 0.0, seed: int = 42,
+                  to_address: str = "jobs@example.com") -> Iterator[bytes]:
+    """Yield count messages, about noise_ratio of them not applications"""
+    rng = random.Random(seed)
+    started = datetime.now(timezone.utc) - timedelta(minutes=count)
+    for index in range(count):
+        if rng.random() < noise_ratio:
+            yield rng.choice(NOISE_BUILDERS)(index, to_address)
+        else:
+            yield build_application(index, rng, to_address, started + timedelta(minutes=index))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write synthetic application emails as .eml files")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--noise", type=float, default=0.0,
+                        help="Share of messages that are newsletters, auto-replies or bounces")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="./mail", help="Directory to write the .eml files to")
+    args = parser.parse_args()
+
+    out_dir = Path(args.out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for number, raw in enumerate(generate_mail(args.count, args.noise, args.seed)):
+        (out_dir / f"{number:06d}.eml").write_bytes(raw)
+    print(f"Wrote {args.count} messages to {out_dir}")
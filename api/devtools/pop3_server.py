@@ -0,0 +1,233 @@
+"""Local stand-in POP3 server for exercising mailbox ingestion without a real mail provider.
+
+Implements the POP3 commands EmailProcessor uses, USER/PASS, UIDL, TOP and
+RETR, along with STAT, LIST, DELE, RSET, NOOP, CAPA and QUIT. Messages live
+in memory. Run it directly to serve synthetic applications, or the .eml
+files in a directory (set POP3_USE_SSL=false):
+
+    python devtools/pop3_server.py --port 1110 --seed 1000
+    python devtools/pop3_server.py --port 1110 --spool ./mail
+"""
+import argparse
+import os
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+
+class StandInMaildrop:
+    """An in-memory POP3 maildrop of (uid, raw message) pairs"""
+
+    def __init__(self):
+        self.messages: List[Tuple[str, bytes]] = []
+        self.next_uid = 1
+        self._lock = threading.Lock()
+
+    def deliver(self, raw: bytes) -> str:
+        """Add a message, returning its uid"""
+        with self._lock:
+            uid = f"standin-{self.next_uid}"
+            self.next_uid += 1
+            self.messages.append((uid, raw.replace(b'\r\n', b'\n').replace(b'\n', b'\r\n')))
+            return uid
+
+    def deliver_many(self, messages: Iterable[bytes]) -> int:
+        return sum(1 for raw in messages if self.deliver(raw))
+
+    def snapshot(self) -> List[Tuple[str, bytes]]:
+        with self._lock:
+            return list(self.messages)
+
+    def remove(self, uids: Iterable[str]) -> None:
+        removed = set(uids)
+        with self._lock:
+            self.messages = [(uid, raw) for uid, raw in self.messages if uid not in removed]
+
+
+def stuff_lines(raw: bytes) -> Iterable[bytes]:
+    """Split a message into CRLF-terminated lines, dot-stuffed for a multi-line response"""
+    if raw.endswith(b'\r\n'):
+        raw = raw[:-2]
+    for line in raw.split(b'\r\n'):
+        yield (b'.' + line if line.startswith(b'.') else line) + b'\r\n'
+
+
+class Pop3SessionHandler(socketserver.StreamRequestHandler):
+    """One POP3 client session"""
+
+    # Responses are often written in several pieces; without this each piece
+    # after the first waits on the client's delayed ACK
+    disable_nagle_algorithm = True
+    # Writes are buffered and flushed once per response
+    wbufsize = 64 * 1024
+
+    def send(self, data: bytes) -> None:
+        self.wfile.write(data)
+
+    def handle(self) -> None:
+        try:
+            self.serve_session()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def serve_session(self) -> None:
+        server: "StandInPop3Server" = self.server.stand_in
+        username = None
+        # The maildrop is fixed for the session, as POP3 message numbers are
+        messages: Optional[List[Tuple[str, bytes]]] = None
+        deleted = set()
+        self.send(b"+OK Stand-in POP3 server ready\r\n")
+        self.wfile.flush()
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            parts = line.decode(errors='ignore').rstrip('\r\n').split(' ')
+            command, arguments = parts[0].upper(), parts[1:]
+
+            if command == 'QUIT':
+                if messages is not None and deleted:
+                    server.maildrop.remove(uid for number, (uid, _) in enumerate(messages, 1) if number in deleted)
+                self.send(b"+OK Bye\r\n")
+                self.wfile.flush()
+                return
+            if command == 'CAPA':
+                self.send(b"+OK Capability list follows\r\nUSER\r\nTOP\r\nUIDL\r\n.\r\n")
+            elif command == 'USER':
+                username = arguments[0] if arguments else None
+                self.send(b"+OK\r\n")
+            elif command == 'PASS':
+                if username == server.username and " ".join(arguments) == server.password:
+                    messages = server.maildrop.snapshot()
+                    self.send(b"+OK Logged in\r\n")
+                else:
+                    self.send(b"-ERR [AUTH] Invalid credentials\r\n")
+            elif messages is None:
+                self.send(b"-ERR Log in first\r\n")
+            elif command == 'NOOP':
+                self.send(b"+OK\r\n")
+            elif command == 'RSET':
+                deleted.clear()
+                self.send(b"+OK\r\n")
+            elif command == 'STAT':
+                live = [raw for number, (_, raw) in enumerate(messages, 1) if number not in deleted]
+                self.send(f"+OK {len(live)} {sum(len(raw) for raw in live)}\r\n".encode())
+            elif command in ('LIST', 'UIDL'):
+                self.listing(command, arguments, messages, deleted)
+            elif command in ('RETR', 'TOP', 'DELE'):
+                number = self.message_number(arguments, messages, deleted)
+                if number is None:
+                    self.send(b"-ERR No such message\r\n")
+                elif command == 'DELE':
+                    deleted.add(number)
+                    self.send(b"+OK Deleted\r\n")
+                else:
+                    raw = messages[number - 1][1]
+                    if command == 'TOP':
+                        header, _, body = raw.partition(b'\r\n\r\n')
+                        count = int(arguments[1]) if len(arguments) > 1 else 0
+                        raw = header + b'\r\n\r\n' + b'\r\n'.join(body.split(b'\r\n')[:count])
+                    self.send(f"+OK {len(raw)} octets\r\n".encode())
+                    self.wfile.writelines(stuff_lines(raw))
+                    self.send(b".\r\n")
+            else:
+                self.send(f"-ERR Unsupported command {command}\r\n".encode())
+            self.wfile.flush()
+
+    @staticmethod
+    def message_number(arguments: List[str], messages: List[Tuple[str, bytes]], deleted: set) -> Optional[int]:
+        try:
+            number = int(arguments[0])
+        except (IndexError, ValueError):
+            return None
+        if number < 1 or number > len(messages) or number in deleted:
+            return None
+        return number
+
+    def listing(self, command: str, arguments: List[str], messages: List[Tuple[str, bytes]], deleted: set) -> None:
+        def entry(number: int) -> str:
+            uid, raw = messages[number - 1]
+            return f"{number} {uid if command == 'UIDL' else len(raw)}"
+
+        if arguments:
+            number = self.message_number(arguments, messages, deleted)
+            self.send(f"+OK {entry(number)}\r\n".encode() if number else b"-ERR No such message\r\n")
+            return
+        lines = [entry(number) for number in range(1, len(messages) + 1) if number not in deleted]
+        self.send(b"+OK\r\n" + "".join(f"{line}\r\n" for line in lines).encode() + b".\r\n")
+
+
+class StandInPop3Server:
+    """A threaded stand-in POP3 server on localhost"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, username: str = "test",
+                 password: str = "test", maildrop: Optional[StandInMaildrop] = None):
+        self.username = username
+        self.password = password
+        self.maildrop = maildrop or StandInMaildrop()
+        self._server = socketserver.ThreadingTCPServer((host, port), Pop3SessionHandler, bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address
+
+    def start(self) -> Tuple[str, int]:
+        """Serve on a background thread, returning the bound address"""
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.address
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def deliver(self, raw: bytes) -> str:
+        return self.maildrop.deliver(raw)
+
+
+def watch_spool(server: StandInPop3Server, spool: Path, interval: float) -> None:
+    """Deliver .eml files from a directory, including ones added later"""
+    delivered = set()
+    while True:
+        for path in sorted(spool.glob("*.eml")):
+            if path.name not in delivered:
+                delivered.add(path.name)
+                uid = server.deliver(path.read_bytes())
+                print(f"Delivered {path.name} as {uid}")
+        time.sleep(interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in POP3 server for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1110)
+    parser.add_argument("--username", default=os.environ.get("STANDIN_POP3_USERNAME", "test"))
+    parser.add_argument("--password", default=os.environ.get("STANDIN_POP3_PASSWORD", "test"))
+    parser.add_argument("--spool", default=None, help="Directory of .eml files to serve")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic applications to load at start")
+    args = parser.parse_args()
+
+    pop3_server = StandInPop3Server(args.host, args.port, args.username, args.password)
+    if args.seed:
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        from mail_fixtures import generate_mail
+        pop3_server.maildrop.deliver_many(generate_mail(args.seed))
+    host, port = pop3_server.start()
+    print(f"Stand-in POP3 server on {host}:{port} (user {args.username}); set POP3_USE_SSL=false")
+    try:
+        if args.spool:
+            watch_spool(pop3_server, Path(args.spool), 1.0)
+        else:
+            while True:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pop3_server.stop()
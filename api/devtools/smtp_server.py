@@ -0,0 +1,193 @@
+"""Local stand-in SMTP server for exercising outgoing mail without a real mail provider.
+
+Implements EHLO/HELO, AUTH PLAIN and LOGIN, MAIL, RCPT, DATA, RSET, NOOP
+and QUIT, without STARTTLS. Accepted messages are counted, and kept in
+memory unless keep_messages is off. Recipients in reject_domains are
+refused with 550. Run it directly and point SMTP_HOST/SMTP_PORT at it with
+SMTP_USE_TLS=false:
+
+    python devtools/smtp_server.py --port 1025
+"""
+import argparse
+import base64
+import os
+import socketserver
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+
+class SmtpSessionHandler(socketserver.StreamRequestHandler):
+    """One SMTP client session"""
+
+    # Responses are often written in several pieces; without this each piece
+    # after the first waits on the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode() + b"\r\n")
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        try:
+            self.serve_session()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def serve_session(self) -> None:
+        server: "StandInSmtpServer" = self.server.stand_in
+        authenticated = server.username is None
+        sender: Optional[str] = None
+        recipients: List[str] = []
+        server.open_session()
+        self.reply("220 stand-in ESMTP ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            text = line.decode(errors='ignore').rstrip('\r\n')
+            command, _, argument = text.partition(' ')
+            command = command.upper()
+
+            if command == 'EHLO':
+                self.wfile.write(b"250-stand-in\r\n250-AUTH PLAIN LOGIN\r\n250-8BITMIME\r\n")
+                self.reply("250 SIZE 52428800")
+            elif command == 'HELO':
+                self.reply("250 stand-in")
+            elif command == 'AUTH':
+                authenticated = self.authenticate(argument, server)
+                self.reply("235 Authentication succeeded" if authenticated else "535 Authentication failed")
+            elif command == 'NOOP':
+                self.reply("250 OK")
+            elif command == 'RSET':
+                sender, recipients = None, []
+                self.reply("250 OK")
+            elif command == 'QUIT':
+                self.reply("221 Bye")
+                return
+            elif not authenticated:
+                self.reply("530 Authentication required")
+            elif command == 'MAIL':
+                sender, recipients = argument.partition(':')[2].strip(), []
+                self.reply("250 OK")
+            elif command == 'RCPT':
+                recipient = argument.partition(':')[2].strip().strip('<>')
+                if sender is None:
+                    self.reply("503 MAIL first")
+                elif recipient.rpartition('@')[2].lower() in server.reject_domains:
+                    self.reply("550 No such user")
+                else:
+                    recipients.append(recipient)
+                    self.reply("250 OK")
+            elif command == 'DATA':
+                if not recipients:
+                    self.reply("503 RCPT first")
+                    continue
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = self.read_data()
+                if data is None:
+                    return
+                server.accept(sender, recipients, data)
+                sender, recipients = None, []
+                self.reply("250 OK queued")
+            else:
+                self.reply(f"502 Unsupported command {command}")
+
+    def authenticate(self, argument: str, server: "StandInSmtpServer") -> bool:
+        mechanism, _, initial = argument.partition(' ')
+        if mechanism.upper() == 'PLAIN':
+            if not initial:
+                self.reply("334 ")
+                initial = self.rfile.readline().decode(errors='ignore').strip()
+            _, username, password = base64.b64decode(initial).decode(errors='ignore').split('\0', 2)
+        elif mechanism.upper() == 'LOGIN':
+            if initial:
+                username = base64.b64decode(initial).decode(errors='ignore')
+            else:
+                self.reply("334 VXNlcm5hbWU6")
+                username = base64.b64decode(self.rfile.readline().strip()).decode(errors='ignore')
+            self.reply("334 UGFzc3dvcmQ6")
+            password = base64.b64decode(self.rfile.readline().strip()).decode(errors='ignore')
+        else:
+            return False
+        return (username, password) == (server.username, server.password)
+
+    def read_data(self) -> Optional[bytes]:
+        """Read the message up to the lone dot, undoing dot-stuffing"""
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return None
+            if line in (b".\r\n", b".\n"):
+                return b"".join(lines)
+            lines.append(line[1:] if line.startswith(b"..") else line)
+
+
+class StandInSmtpServer:
+    """A threaded stand-in SMTP server on localhost"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, username: Optional[str] = "test",
+                 password: Optional[str] = "test", keep_messages: bool = True,
+                 reject_domains: Iterable[str] = ()):
+        self.username = username
+        self.password = password
+        self.keep_messages = keep_messages
+        self.reject_domains = {domain.lower() for domain in reject_domains}
+        self.messages: List[Tuple[str, List[str], bytes]] = []
+        self.accepted = 0
+        self.sessions = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), SmtpSessionHandler, bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._server.server_address
+
+    def start(self) -> Tuple[str, int]:
+        """Serve on a background thread, returning the bound address"""
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.address
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def open_session(self) -> None:
+        with self._lock:
+            self.sessions += 1
+
+    def accept(self, sender: str, recipients: List[str], data: bytes) -> None:
+        with self._lock:
+            self.accepted += 1
+            if self.keep_messages:
+                self.messages.append((sender, recipients, data))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stand-in SMTP server for local testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--username", default=os.environ.get("STANDIN_SMTP_USERNAME", "test"))
+    parser.add_argument("--password", default=os.environ.get("STANDIN_SMTP_PASSWORD", "test"))
+    args = parser.parse_args()
+
+    smtp_server = StandInSmtpServer(args.host, args.port, args.username, args.password, keep_messages=False)
+    host, port = smtp_server.start()
+    print(f"Stand-in SMTP server on {host}:{port} (user {args.username}); set SMTP_USE_TLS=false")
+    try:
+        reported = 0
+        while True:
+            time.sleep(5)
+            if smtp_server.accepted != reported:
+                reported = smtp_server.accepted
+                print(f"Accepted {reported} messages")
+    except KeyboardInterrupt:
+        smtp_server.stop()
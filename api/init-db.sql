@@ -25,6 +25,8 @@ CREATE TABLE IF NOT EXISTS users (
     last_name VARCHAR(100),
     role VARCHAR(50) DEFAULT 'user',
     is_active BOOLEAN DEFAULT TRUE,
+    queue_weight INTEGER DEFAULT 1,
+    max_concurrent_jobs INTEGER,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -34,10 +36,16 @@ CREATE TABLE IF NOT EXISTS email_configs (
     user_id UUID REFERENCES users(id) ON DELETE CASCADE,
     email_address VARCHAR(255) NOT NULL,
     email_provider VARCHAR(50) NOT NULL,
+    ingest_protocol VARCHAR(10) DEFAULT 'pop3',
     pop3_host VARCHAR(255),
     pop3_port INTEGER DEFAULT 995,
     pop3_username VARCHAR(255),
     pop3_password VARCHAR(255),
+    imap_host VARCHAR(255),
+    imap_port INTEGER DEFAULT 993,
+    imap_username VARCHAR(255),
+    imap_password VARCHAR(255),
+    imap_folder VARCHAR(255) DEFAULT 'INBOX',
     smtp_host VARCHAR(255),
     smtp_port INTEGER DEFAULT 587,
     smtp_username VARCHAR(255),
@@ -74,11 +82,40 @@ CREATE TABLE IF NOT EXISTS job_keywords (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE IF NOT EXISTS upload_batches (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    email_config_id UUID REFERENCES email_configs(id) ON DELETE CASCADE,
+    job_description_id UUID REFERENCES job_descriptions(id),
+    status VARCHAR(50) DEFAULT 'uploading',
+    idempotency_key VARCHAR(255),
+    total_files INTEGER DEFAULT 0,
+    accepted_files INTEGER DEFAULT 0,
+    rejected_files INTEGER DEFAULT 0,
+    rejections JSONB DEFAULT '[]'::jsonb,
+    error_message TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    uploaded_at TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS stored_files (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    sha256 VARCHAR(64) NOT NULL,
+    file_path VARCHAR(500) NOT NULL,
+    file_size_bytes BIGINT,
+    file_type VARCHAR(50),
+    reuse_count INTEGER DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    last_seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 CREATE TABLE IF NOT EXISTS resume_submissions (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     email_config_id UUID REFERENCES email_configs(id) ON DELETE CASCADE,
     job_description_id UUID REFERENCES job_descriptions(id),
-    candidate_email VARCHAR(255) NOT NULL,
+    upload_batch_id UUID REFERENCES upload_batches(id) ON DELETE SET NULL,
+    stored_file_id UUID REFERENCES stored_files(id) ON DELETE SET NULL,
+    candidate_email VARCHAR(255),
     candidate_name VARCHAR(255),
     position_applied VARCHAR(255),
     original_email_subject VARCHAR(500),
@@ -88,9 +125,12 @@ CREATE TABLE IF NOT EXISTS resume_submissions (
     file_size_bytes BIGINT,
     file_type VARCHAR(50),
     status VARCHAR(50) DEFAULT 'pending',
+    pipeline_stage VARCHAR(50) DEFAULT 'stored',
     processing_started_at TIMESTAMP WITH TIME ZONE,
     processing_completed_at TIMESTAMP WITH TIME ZONE,
     error_message TEXT,
+    idempotency_key VARCHAR(255),
+    duplicate_count INTEGER DEFAULT 0,
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -145,8 +185,12 @@ CREATE TABLE IF NOT EXISTS email_responses (
     template_used VARCHAR(100),
     sent_at TIMESTAMP WITH TIME ZONE,
     delivery_status VARCHAR(50),
+    send_after TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    claimed_at TIMESTAMP WITH TIME ZONE,
+    attempts INTEGER DEFAULT 0,
     error_message TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
 CREATE TABLE IF NOT EXISTS email_templates (
@@ -185,25 +229,92 @@ CREATE TABLE IF NOT EXISTS audit_log (
 CREATE TABLE IF NOT EXISTS processing_queue (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     resume_submission_id UUID REFERENCES resume_submissions(id) ON DELETE CASCADE,
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
     priority INTEGER DEFAULT 0,
     status VARCHAR(50) DEFAULT 'queued',
+    stage VARCHAR(50) DEFAULT 'parse',
     retry_count INTEGER DEFAULT 0,
     max_retries INTEGER DEFAULT 3,
     scheduled_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     started_at TIMESTAMP WITH TIME ZONE,
+    lease_expires_at TIMESTAMP WITH TIME ZONE,
     completed_at TIMESTAMP WITH TIME ZONE,
     error_message TEXT,
+    failure_class VARCHAR(50),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
 
+CREATE TABLE IF NOT EXISTS pipeline_stage_timings (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    resume_submission_id UUID REFERENCES resume_submissions(id) ON DELETE CASCADE,
+    stage VARCHAR(50) NOT NULL,
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    completed_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS email_seen_uids (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    email_config_id UUID NOT NULL REFERENCES email_configs(id) ON DELETE CASCADE,
+    uid VARCHAR(255) NOT NULL,
+    seen_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS scheduled_task_runs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    task_name VARCHAR(100) NOT NULL,
+    node VARCHAR(255),
+    status VARCHAR(50) DEFAULT 'running',
+    started_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    finished_at TIMESTAMP WITH TIME ZONE,
+    duration_ms INTEGER,
+    result JSONB,
+    error_message TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS daily_user_rollups (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    submissions INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    score_sum BIGINT NOT NULL DEFAULT 0,
+    score_count INTEGER NOT NULL DEFAULT 0,
+    responses INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_resume_submissions_status ON resume_submissions(status);
 CREATE INDEX IF NOT EXISTS idx_resume_submissions_created_at ON resume_submissions(created_at);
+CREATE INDEX IF NOT EXISTS idx_resume_submissions_created_at_id ON resume_submissions(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_resume_submissions_upload_batch_id ON resume_submissions(upload_batch_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_resume_submissions_idempotency_key ON resume_submissions(email_config_id, idempotency_key);
+CREATE INDEX IF NOT EXISTS idx_resume_submissions_stored_file_id ON resume_submissions(stored_file_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_stored_files_sha256 ON stored_files(sha256);
+CREATE INDEX IF NOT EXISTS idx_upload_batches_user_id ON upload_batches(user_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_upload_batches_idempotency_key ON upload_batches(user_id, idempotency_key);
 CREATE INDEX IF NOT EXISTS idx_scoring_results_total_score ON scoring_results(total_score);
+CREATE INDEX IF NOT EXISTS idx_scoring_results_created_at_id ON scoring_results(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_job_descriptions_user_created_at_id ON job_descriptions(user_id, created_at, id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_parsed_resumes_resume_submission_id ON parsed_resumes(resume_submission_id);
+CREATE INDEX IF NOT EXISTS idx_scoring_results_submission_job ON scoring_results(resume_submission_id, job_description_id);
+CREATE INDEX IF NOT EXISTS idx_email_responses_scoring_result_id ON email_responses(scoring_result_id);
+CREATE INDEX IF NOT EXISTS idx_email_responses_status_send_after ON email_responses(delivery_status, send_after);
 CREATE INDEX IF NOT EXISTS idx_audit_log_created_at ON audit_log(created_at);
 CREATE INDEX IF NOT EXISTS idx_processing_queue_status ON processing_queue(status);
 CREATE INDEX IF NOT EXISTS idx_processing_queue_scheduled_at ON processing_queue(scheduled_at);
+CREATE INDEX IF NOT EXISTS idx_processing_queue_stage_status ON processing_queue(stage, status, scheduled_at);
+CREATE INDEX IF NOT EXISTS idx_processing_queue_user_status ON processing_queue(user_id, status, scheduled_at);
+CREATE INDEX IF NOT EXISTS idx_pipeline_stage_timings_resume_submission_id ON pipeline_stage_timings(resume_submission_id);
+CREATE INDEX IF NOT EXISTS idx_pipeline_stage_timings_stage_completed_at ON pipeline_stage_timings(stage, completed_at);
+CREATE INDEX IF NOT EXISTS idx_scheduled_task_runs_task_started_at ON scheduled_task_runs(task_name, started_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_email_seen_uids_config_uid ON email_seen_uids(email_config_id, uid);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_daily_user_rollups_user_day ON daily_user_rollups(user_id, day);
 
 -- Create triggers for updated_at columns
 CREATE TRIGGER update_users_updated_at BEFORE UPDATE ON users
@@ -281,10 +392,10 @@ INSERT INTO job_keywords (job_description_id, keyword, category, weight) VALUES
 ON CONFLICT DO NOTHING;
 
 -- Sample resume submissions
-INSERT INTO resume_submissions (id, email_config_id, job_description_id, candidate_email, candidate_name, position_applied, attachment_filename, file_size_bytes, file_type, status) VALUES
-('550e8400-e29b-41d4-a716-446655440008', '550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440005', 'john.doe@email.com', 'John Doe', 'Senior Python Developer', 'john_doe_resume.pdf', 2048576, 'pdf', 'completed'),
-('550e8400-e29b-41d4-a716-446655440009', '550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440006', 'jane.smith@email.com', 'Jane Smith', 'Data Scientist', 'jane_smith_resume.pdf', 1536000, 'pdf', 'completed'),
-('550e8400-e29b-41d4-a716-446655440010', '550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440007', 'mike.johnson@email.com', 'Mike Johnson', 'Frontend Developer', 'mike_johnson_resume.docx', 1024000, 'docx', 'pending')
+INSERT INTO resume_submissions (id, email_config_id, job_description_id, candidate_email, candidate_name, position_applied, attachment_filename, file_size_bytes, file_type, status, pipeline_stage) VALUES
+('550e8400-e29b-41d4-a716-446655440008', '550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440005', 'john.doe@email.com', 'John Doe', 'Senior Python Developer', 'john_doe_resume.pdf', 2048576, 'pdf', 'completed', 'scored'),
+('550e8400-e29b-41d4-a716-446655440009', '550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440006', 'jane.smith@email.com', 'Jane Smith', 'Data Scientist', 'jane_smith_resume.pdf', 1536000, 'pdf', 'completed', 'scored'),
+('550e8400-e29b-41d4-a716-446655440010', '550e8400-e29b-41d4-a716-446655440004', '550e8400-e29b-41d4-a716-446655440007', 'mike.johnson@email.com', 'Mike Johnson', 'Frontend Developer', 'mike_johnson_resume.docx', 1024000, 'docx', 'pending', 'stored')
 ON CONFLICT DO NOTHING;
 
 -- Sample parsed resumes
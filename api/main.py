@@ -3,6 +3,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from app.config import settings
 from app.database import engine, Base, get_db
+from app.services.pipeline import ResumePipeline
 from app.routers import (
     auth_router,
     users_router,
@@ -11,8 +12,10 @@ from app.routers import (
     scoring_results_router,
     email_configs_router,
     email_templates_router,
-    dashboard_router
+    dashboard_router,
+    processing_queue_router
 )
+import asyncio
 import redis
 import smtplib
 from sqlalchemy import text
@@ -36,6 +39,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # List endpoints return the next page's cursor in a header
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Add trusted host middleware
@@ -54,9 +59,28 @@ router.include_router(scoring_results_router)
 router.include_router(email_configs_router)
 router.include_router(email_templates_router)
 router.include_router(dashboard_router)
+router.include_router(processing_queue_router)
 
 app.include_router(router)
 
+# Optionally run the resume pipeline inside the API process
+embedded_pipeline = ResumePipeline() if settings.pipeline_embedded else None
+
+
+@app.on_event("startup")
+async def start_embedded_pipeline():
+    """Start the embedded pipeline when enabled"""
+    if embedded_pipeline is not None:
+        app.state.pipeline_task = asyncio.create_task(embedded_pipeline.run())
+
+
+@app.on_event("shutdown")
+async def stop_embedded_pipeline():
+    """Stop the embedded pipeline when enabled"""
+    if embedded_pipeline is not None:
+        app.state.pipeline_task.cancel()
+        await embedded_pipeline.stop()
+
 
 @app.get("/")
 async def root():
@@ -92,8 +116,8 @@ async def redis_health_check():
     """Redis health check endpoint"""
     try:
         # Try to connect to Redis if configured
-        if hasattr(settings, 'REDIS_URL') and settings.REDIS_URL:
-            r = redis.from_url(settings.REDIS_URL)
+        if settings.redis_url:
+            r = redis.from_url(settings.redis_url)
             r.ping()
             return {"status": "healthy", "message": "Redis connection successful"}
         else:
@@ -0,0 +1,39 @@
+import argparse
+import asyncio
+import signal
+from app.services.pipeline import ResumePipeline
+from app.services.scheduler import build_scheduler
+
+
+async def main(poll_mailboxes: bool) -> None:
+    """Run the periodic task scheduler until interrupted.
+
+    With --poll-mailboxes an ingest pipeline runs alongside it, and mailbox
+    polling is one of the scheduled tasks.
+    """
+    pipeline = ResumePipeline(role="ingest") if poll_mailboxes else None
+    pipeline_task = asyncio.create_task(pipeline.run(poll_mailboxes=False)) if pipeline else None
+    scheduler = build_scheduler(pipeline)
+
+    loop = asyncio.get_running_loop()
+    stop_event = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await scheduler.start()
+    print(f"Scheduler running tasks: {', '.join(scheduler.tasks)}")
+    try:
+        await stop_event.wait()
+    finally:
+        await scheduler.stop()
+        if pipeline is not None:
+            pipeline.request_shutdown()
+            await asyncio.gather(pipeline_task, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Periodic task scheduler")
+    parser.add_argument("--poll-mailboxes", action="store_true",
+                        help="Run an ingest pipeline and schedule mailbox polling")
+    args = parser.parse_args()
+    asyncio.run(main(args.poll_mailboxes))
@@ -0,0 +1,42 @@
+import argparse
+import asyncio
+from app.services.batch_scorer import BatchScorer, load_job_description
+
+
+def main(directory: str, job: str, output: str, checkpoint: str, parse_workers: int,
+         concurrency: int, rule_based: bool) -> None:
+    """Score a directory of resumes against one job description"""
+    scorer = BatchScorer(
+        load_job_description(job),
+        output,
+        checkpoint_path=checkpoint,
+        parse_workers=parse_workers,
+        score_concurrency=concurrency,
+        use_llm=not rule_based
+    )
+    report = asyncio.run(scorer.run(directory))
+    print(
+        f"Scored {report['scored']} of {report['total']} files "
+        f"({report['failed']} failed, {report['skipped']} already done) "
+        f"in {report['elapsed_seconds']}s: {report['files_per_second']} files/s, "
+        f"avg parse {report['avg_parse_ms']}ms, avg score {report['avg_score_ms']}ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a directory of PDF/DOCX resumes offline")
+    parser.add_argument("directory", help="Directory of resume files (searched recursively)")
+    parser.add_argument("--job", required=True,
+                        help="Job description JSON file, or a job description id from the database")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to")
+    parser.add_argument("--checkpoint", default=None,
+                        help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="Parser processes (default: PIPELINE_PARSE_WORKERS)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Concurrent scoring calls (default: PIPELINE_SCORE_CONCURRENCY)")
+    parser.add_argument("--rule-based", action="store_true",
+                        help="Use the rule-based scorer only, without calling the LLM")
+    args = parser.parse_args()
+    main(args.directory, args.job, args.output, args.checkpoint, args.parse_workers,
+         args.concurrency, args.rule_based)
@@ -0,0 +1,32 @@
+import argparse
+import signal
+from app.config import settings
+from app.services.autoscaler import WorkerAutoscaler
+
+
+def main(metrics_port: int) -> None:
+    """Run the worker autoscaler until interrupted"""
+    autoscaler = WorkerAutoscaler()
+    server = autoscaler.serve_metrics(metrics_port)
+    print(f"Autoscaler metrics on port {metrics_port}")
+
+    def handle_signal(signum, frame):
+        autoscaler.request_shutdown()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    try:
+        autoscaler.run()
+    finally:
+        print("Draining workers")
+        autoscaler.stop()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Autoscale parse and score pipeline workers")
+    parser.add_argument("--metrics-port", type=int, default=settings.autoscaler_metrics_port,
+                        help="Port for the JSON scaling metrics endpoint")
+    args = parser.parse_args()
+    main(args.metrics_port)
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import settings  # noqa: E402
+from devtools.imap_server import StandInImapServer  # noqa: E402
+from devtools.pop3_server import StandInPop3Server  # noqa: E402
+from devtools.smtp_server import StandInSmtpServer  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def local_settings(tmp_path, monkeypatch):
+    """Spool attachments to a temporary directory and talk plain text to the stand-in servers"""
+    monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+    monkeypatch.setattr(settings, "pop3_use_ssl", False)
+    monkeypatch.setattr(settings, "imap_use_ssl", False)
+    monkeypatch.setattr(settings, "smtp_use_tls", False)
+
+
+@pytest.fixture
+def pop3_server():
+    server = StandInPop3Server()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def imap_server():
+    server = StandInImapServer()
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def smtp_server():
+    server = StandInSmtpServer(reject_domains=["rejected.example"])
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def email_config(pop3_server, imap_server, smtp_server):
+    """A mailbox pointing at every stand-in server"""
+    pop3_host, pop3_port = pop3_server.address
+    imap_host, imap_port = imap_server.address
+    smtp_host, smtp_port = smtp_server.address
+    return {
+        'id': "test-mailbox",
+        'pop3_host': pop3_host, 'pop3_port': pop3_port, 'pop3_username': "test", 'pop3_password': "test",
+        'imap_host': imap_host, 'imap_port': imap_port, 'imap_username': "test", 'imap_password': "test",
+        'imap_folder': "INBOX",
+        'smtp_host': smtp_host, 'smtp_port': smtp_port, 'smtp_username': "test", 'smtp_password': "test"
+    }
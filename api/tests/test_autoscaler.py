@@ -0,0 +1,124 @@
+import itertools
+import signal
+import uuid
+from datetime import datetime, timedelta, timezone
+import fakeredis
+import pytest
+from app.config import settings
+from app.services.autoscaler import WorkerAutoscaler
+from app.services.queue_backend import JOB_STAGE_PARSE, JOB_STAGE_SCORE, RedisQueueBackend
+
+
+class StandInWorker:
+    """Stands in for a worker process, exiting when signalled"""
+
+    pids = itertools.count(1000)
+
+    def __init__(self):
+        self.pid = next(self.pids)
+        self.returncode = None
+        self.signals = []
+
+    def poll(self):
+        return self.returncode
+
+    def send_signal(self, signum):
+        self.signals.append(signum)
+
+    def kill(self):
+        self.returncode = -signal.SIGKILL
+
+    def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def queue_backend():
+    return RedisQueueBackend(redis_client=fakeredis.FakeRedis())
+
+
+@pytest.fixture
+def autoscaler(queue_backend, monkeypatch):
+    monkeypatch.setattr(settings, "autoscaler_parse_min_workers", 1)
+    monkeypatch.setattr(settings, "autoscaler_parse_max_workers", 4)
+    monkeypatch.setattr(settings, "autoscaler_jobs_per_worker", 25)
+    monkeypatch.setattr(settings, "autoscaler_max_job_age", 120)
+    autoscaler = WorkerAutoscaler(queue_backend)
+    monkeypatch.setattr(autoscaler, "_spawn", lambda role: autoscaler.workers[role].append(StandInWorker()))
+    return autoscaler
+
+
+def queue_jobs(queue_backend, count, age_seconds=1):
+    queue_backend.publish([
+        {
+            'id': uuid.uuid4(),
+            'resume_submission_id': uuid.uuid4(),
+            'stage': JOB_STAGE_PARSE,
+            'scheduled_at': datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+        }
+        for _ in range(count)
+    ])
+
+
+@pytest.mark.parametrize("ready, oldest_age, running, desired", [
+    (0, 0.0, 0, 1),
+    (60, 0.0, 1, 3),
+    (500, 0.0, 2, 4),
+    (5, 300.0, 2, 3),
+    (5, 300.0, 4, 4)
+])
+def test_desired_workers_follow_backlog_within_bounds(autoscaler, ready, oldest_age, running, desired):
+    autoscaler.workers[JOB_STAGE_PARSE] = [StandInWorker() for _ in range(running)]
+
+    metrics = {'ready': ready, 'oldest_ready_age_seconds': oldest_age}
+
+    assert autoscaler.desired_workers(JOB_STAGE_PARSE, metrics) == desired
+
+
+def test_backlog_scales_up_once_per_cooldown(autoscaler, queue_backend, monkeypatch):
+    monkeypatch.setattr(settings, "autoscaler_scale_up_cooldown", 3600)
+    queue_jobs(queue_backend, 60)
+
+    autoscaler.tick()
+    queue_jobs(queue_backend, 40)
+    autoscaler.tick()
+
+    assert len(autoscaler.workers[JOB_STAGE_PARSE]) == 3
+    # The score stage is empty, so only its minimum is started
+    assert len(autoscaler.workers[JOB_STAGE_SCORE]) == settings.autoscaler_score_min_workers
+    assert [decision['action'] for decision in autoscaler.decisions if decision['role'] == JOB_STAGE_PARSE] \
+        == ["scale_up"]
+
+
+def test_idle_workers_are_retired_one_at_a_time(autoscaler, monkeypatch):
+    monkeypatch.setattr(settings, "autoscaler_scale_down_cooldown", 0)
+    monkeypatch.setattr(settings, "worker_drain_timeout", 3600)
+    workers = [StandInWorker() for _ in range(3)]
+    autoscaler.workers[JOB_STAGE_PARSE] = list(workers)
+
+    autoscaler.tick()
+
+    assert autoscaler.workers[JOB_STAGE_PARSE] == workers[:2]
+    assert workers[2].signals == [signal.SIGTERM]
+    assert [entry['process'] for entry in autoscaler.draining] == [workers[2]]
+
+    # The retired worker finishes its in-flight job and exits
+    workers[2].returncode = 0
+    autoscaler.tick()
+
+    assert autoscaler.workers[JOB_STAGE_PARSE] == workers[:1]
+    assert [entry['process'] for entry in autoscaler.draining] == [workers[1]]
+
+
+def test_worker_that_overruns_its_drain_is_killed(autoscaler, monkeypatch):
+    monkeypatch.setattr(settings, "autoscaler_scale_down_cooldown", 3600)
+    monkeypatch.setattr(settings, "worker_drain_timeout", 0)
+    worker = StandInWorker()
+    autoscaler.workers[JOB_STAGE_PARSE] = [StandInWorker(), worker]
+    autoscaler._retire(JOB_STAGE_PARSE)
+
+    autoscaler.tick()
+
+    assert worker.returncode == -signal.SIGKILL
+    assert autoscaler.draining == []
+    assert autoscaler.decisions[0]['action'] == "killed"
@@ -0,0 +1,38 @@
+import uuid
+import pytest
+from app.models.resume_submission import ResumeSubmission
+from app.services.pipeline import (
+    CHECKPOINT_PARSED, CHECKPOINT_RESPONDED, CHECKPOINT_SCORED, CHECKPOINT_STORED,
+    reached_checkpoint, resumed_status
+)
+
+
+@pytest.mark.parametrize("pipeline_stage, checkpoint, reached", [
+    (None, CHECKPOINT_STORED, False),
+    ("unknown", CHECKPOINT_STORED, False),
+    (CHECKPOINT_STORED, CHECKPOINT_STORED, True),
+    (CHECKPOINT_STORED, CHECKPOINT_PARSED, False),
+    (CHECKPOINT_SCORED, CHECKPOINT_PARSED, True),
+    (CHECKPOINT_RESPONDED, CHECKPOINT_SCORED, True),
+    (CHECKPOINT_SCORED, CHECKPOINT_RESPONDED, False)
+])
+def test_checkpoints_are_ordered(pipeline_stage, checkpoint, reached):
+    assert reached_checkpoint(pipeline_stage, checkpoint) is reached
+
+
+@pytest.mark.parametrize("pipeline_stage, has_job_description, status", [
+    (None, True, "processing"),
+    (CHECKPOINT_STORED, True, "processing"),
+    (CHECKPOINT_PARSED, True, "processing"),
+    (CHECKPOINT_PARSED, False, "parsed"),
+    (CHECKPOINT_SCORED, True, "completed"),
+    (CHECKPOINT_RESPONDED, True, "completed")
+])
+def test_restarted_job_resumes_from_its_checkpoint(pipeline_stage, has_job_description, status):
+    submission = ResumeSubmission(
+        id=uuid.uuid4(),
+        pipeline_stage=pipeline_stage,
+        job_description_id=uuid.uuid4() if has_job_description else None
+    )
+
+    assert resumed_status(submission) == status
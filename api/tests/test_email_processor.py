@@ -0,0 +1,159 @@
+import hashlib
+import random
+from email.message import EmailMessage
+from pathlib import Path
+import pytest
+from app.config import settings
+from app.services.email_processor import EmailProcessor
+from devtools.mail_fixtures import build_application, build_auto_reply, build_bounce, build_newsletter, build_pdf
+
+
+@pytest.fixture
+def email_processor():
+    email_processor = EmailProcessor()
+    yield email_processor
+    email_processor.smtp_pool.close_all()
+
+
+def seed(server) -> list:
+    """Deliver applications interleaved with a newsletter, an auto-reply and a bounce"""
+    rng = random.Random(7)
+    messages = [
+        build_application(0, rng), build_newsletter(1), build_application(2, rng),
+        build_auto_reply(3), build_application(4, rng), build_bounce(5)
+    ]
+    for raw in messages:
+        server.deliver(raw)
+    return messages
+
+
+def assert_spooled(email_data):
+    assert len(email_data['attachments']) == 1
+    attachment = email_data['attachments'][0]
+    content = Path(attachment['path']).read_bytes()
+    assert attachment['size'] == len(content)
+    assert attachment['sha256'] == hashlib.sha256(content).hexdigest()
+    assert Path(attachment['filename']).suffix in (".pdf", ".docx")
+
+
+@pytest.mark.parametrize("protocol", ["pop3", "imap"])
+def test_fetch_screens_out_noise_and_spools_resumes(protocol, email_processor, email_config,
+                                                    pop3_server, imap_server):
+    seed(imap_server if protocol == "imap" else pop3_server)
+    fetch = email_processor.fetch_imap_emails if protocol == "imap" else email_processor.fetch_emails
+
+    result = fetch(email_config)
+
+    assert result['error'] is None
+    assert result['remaining'] == 0
+    assert len(result['server_uids']) == 6
+    applications = [email_data for email_data in result['emails'] if email_data['subject'].startswith("Application")]
+    assert len(applications) == 3
+    for email_data in applications:
+        assert email_data['email_config_id'] == "test-mailbox"
+        assert "resume" in email_data['body']
+        assert_spooled(email_data)
+    # The newsletter carries a PDF, so its list headers don't screen it out
+    newsletters = [email_data for email_data in result['emails'] if email_data['subject'].startswith("Hiring Weekly")]
+    assert len(newsletters) == 1
+    assert len(result['skipped_uids']) == 6 - len(result['emails'])
+
+
+@pytest.mark.parametrize("protocol", ["pop3", "imap"])
+def test_fetch_drains_mailbox_in_batches(protocol, email_processor, email_config, pop3_server, imap_server):
+    seed(imap_server if protocol == "imap" else pop3_server)
+    fetch = email_processor.fetch_imap_emails if protocol == "imap" else email_processor.fetch_emails
+
+    seen, uids, sessions = set(), [], 0
+    while True:
+        result = fetch(email_config, skip_uids=seen, batch_size=4)
+        sessions += 1
+        assert result['error'] is None
+        uids.extend(email_data['uid'] for email_data in result['emails'])
+        seen.update(email_data['uid'] for email_data in result['emails'])
+        seen.update(result['skipped_uids'])
+        if not result['remaining']:
+            break
+
+    assert sessions == 2
+    assert len(uids) == len(set(uids)) == 4
+    assert seen == set(result['server_uids'])
+
+
+@pytest.mark.parametrize("protocol", ["pop3", "imap"])
+def test_attachment_name_cannot_leave_upload_dir(protocol, email_processor, email_config, pop3_server,
+                                                 imap_server, tmp_path):
+    message = EmailMessage()
+    message['From'] = "candidate@example.org"
+    message['Subject'] = "Application for Engineer"
+    message.set_content("My resume is attached.\n")
+    message.add_attachment(build_pdf(["Ada Lovelace"]), maintype="application", subtype="pdf",
+                           filename="../../escaped.pdf")
+    (imap_server if protocol == "imap" else pop3_server).deliver(message.as_bytes())
+    fetch = email_processor.fetch_imap_emails if protocol == "imap" else email_processor.fetch_emails
+
+    result = fetch(email_config)
+
+    [email_data] = result['emails']
+    [attachment] = email_data['attachments']
+    assert Path(attachment['path']).parent.resolve() == Path(settings.upload_dir).resolve()
+    assert not (tmp_path / "escaped.pdf").exists()
+    assert not list(tmp_path.parent.glob("escaped*"))
+
+
+def test_pop3_keeps_job_board_mail_with_list_headers(email_processor, email_config, pop3_server):
+    rng = random.Random(11)
+    forwarded = build_application(0, rng).replace(
+        b"Subject:", b"List-Unsubscribe: <mailto:leave@board.example>\nPrecedence: bulk\nSubject:", 1
+    )
+    digest = EmailMessage()
+    digest['From'] = "Hiring Weekly <news@example.net>"
+    digest['List-Id'] = "Hiring Weekly <weekly.example.net>"
+    digest['Subject'] = "Hiring Weekly"
+    digest.set_content("Plain text only.\n")
+    pop3_server.deliver(forwarded)
+    pop3_server.deliver(digest.as_bytes())
+
+    result = email_processor.fetch_emails(email_config)
+
+    [email_data] = result['emails']
+    assert email_data['subject'].startswith("Application for ")
+    assert len(email_data['attachments']) == 1
+    assert len(result['skipped_uids']) == 1
+
+
+def test_fetch_reports_failed_login(email_processor, email_config):
+    result = email_processor.fetch_emails({**email_config, 'pop3_password': "wrong"})
+
+    assert result['error']
+    assert result['emails'] == []
+    assert result['server_uids'] is None
+
+
+def test_send_many_reuses_one_session(email_processor, email_config, smtp_server):
+    emails = [
+        {'to_email': f"candidate{index}@example.org", 'subject': "Your application", 'body': "Thank you."}
+        for index in range(3)
+    ]
+
+    results = email_processor.send_many(emails, email_config)
+
+    assert [result['status'] for result in results] == ["sent"] * 3
+    assert smtp_server.sessions == 1
+    assert [recipients for _, recipients, _ in smtp_server.messages] == [[email['to_email']] for email in emails]
+    assert b"Subject: Your application" in smtp_server.messages[0][2]
+
+
+def test_send_many_fails_refused_recipient_only(email_processor, email_config, smtp_server):
+    emails = [
+        {'to_email': "first@example.org", 'subject': "Hello", 'body': "Thank you."},
+        {'to_email': "someone@rejected.example", 'subject': "Hello", 'body': "Thank you."},
+        {'to_email': "last@example.org", 'subject': "Hello", 'body': "Thank you."}
+    ]
+
+    results = email_processor.send_many(emails, email_config)
+
+    assert [result['status'] for result in results] == ["sent", "failed", "sent"]
+    assert results[1]['permanent'] is True
+    assert results[1]['error']
+    assert smtp_server.accepted == 2
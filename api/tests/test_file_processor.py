@@ -0,0 +1,65 @@
+import io
+from pathlib import Path
+import pytest
+from app.config import settings
+from app.services.file_processor import FileProcessor
+
+
+TRAVERSAL_NAMES = ["../../escaped.pdf", "..\\..\\escaped.pdf", "/tmp/escaped.pdf", "nested/../../escaped.pdf"]
+
+
+@pytest.fixture
+def file_processor():
+    return FileProcessor()
+
+
+def assert_in_upload_dir(path):
+    path = Path(path)
+    assert path.parent.resolve() == Path(settings.upload_dir).resolve()
+    assert path.name.startswith("escaped_") and path.suffix == ".pdf"
+
+
+@pytest.mark.parametrize("filename", TRAVERSAL_NAMES)
+def test_save_stream_keeps_files_in_upload_dir(file_processor, tmp_path, filename):
+    success, message, saved = file_processor.save_stream(io.BytesIO(b"%PDF-1.4 resume"), filename, "pdf")
+
+    assert success, message
+    assert_in_upload_dir(saved['path'])
+    assert not (tmp_path / "escaped.pdf").exists()
+
+
+@pytest.mark.parametrize("filename", TRAVERSAL_NAMES)
+def test_open_spool_and_save_file_keep_files_in_upload_dir(file_processor, filename):
+    success, message, spool = file_processor.open_spool(filename, "pdf")
+    assert success, message
+    spool.write(b"%PDF-1.4 resume")
+    assert spool.finish()[0]
+    assert_in_upload_dir(spool.path)
+
+    success, message, path = file_processor.save_file(b"%PDF-1.4 resume", filename, "pdf")
+    assert success, message
+    assert_in_upload_dir(path)
+
+
+def test_rejects_names_resolving_outside_upload_dir(file_processor, tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    # A link planted in the upload directory must not be followed out of it
+    Path(settings.upload_dir, "link").symlink_to(outside)
+    file_processor._generate_unique_filename = lambda filename: "link/escaped.pdf"
+
+    success, message, spool = file_processor.open_spool("escaped.pdf", "pdf")
+
+    assert not success
+    assert message == "Invalid filename"
+    assert list(outside.iterdir()) == []
+
+
+def test_save_stream_enforces_size_limit(file_processor):
+    file_processor.max_file_size = 10
+
+    success, message, saved = file_processor.save_stream(io.BytesIO(b"x" * 100), "big.pdf", "pdf")
+
+    assert not success
+    assert saved is None
+    assert list(Path(settings.upload_dir).iterdir()) == []
@@ -0,0 +1,83 @@
+import io
+import uuid
+import pytest
+from fastapi import HTTPException
+from app.models.upload_batch import UploadBatch
+from app.routers.resume_submissions import _replay_upload_batch
+from app.services.bulk_upload import BulkUploadProcessor
+from app.services.pipeline import email_idempotency_key
+from app.services.queue_backend import PostgresQueueBackend
+
+
+@pytest.fixture
+def inserted(monkeypatch):
+    """Submission rows each ingest would insert, by attempt"""
+    attempts = []
+    monkeypatch.setattr(BulkUploadProcessor, "_insert_submissions", lambda self, rows: attempts[-1].extend(rows))
+    monkeypatch.setattr(BulkUploadProcessor, "_update_batch", lambda self, batch_id, **values: None)
+    return attempts
+
+
+def ingest(inserted, batch_id, files):
+    inserted.append([])
+    BulkUploadProcessor(PostgresQueueBackend()).ingest(
+        batch_id, str(uuid.uuid4()), str(uuid.uuid4()),
+        [(filename, io.BytesIO(content)) for filename, content in files]
+    )
+    return [row['idempotency_key'] for row in inserted[-1]]
+
+
+def test_email_key_is_stable_across_polls():
+    email = {'message_id': "<cv-1@example.com>", 'from_email': "a@example.com", 'subject': "CV"}
+
+    key = email_idempotency_key(email, "sha-1")
+
+    assert key == email_idempotency_key(dict(email, subject="Re: CV"), "sha-1")
+    assert key != email_idempotency_key(email, "sha-2")
+    assert key != email_idempotency_key(dict(email, message_id="<cv-2@example.com>"), "sha-1")
+
+
+def test_email_key_without_message_id_uses_stable_headers():
+    email = {'from_email': "a@example.com", 'date': "Wed, 1 May 2024 09:00:00 +0000", 'subject': "CV"}
+
+    key = email_idempotency_key(email, "sha-1")
+
+    assert key == email_idempotency_key(dict(email, body="re-fetched"), "sha-1")
+    assert key != email_idempotency_key(dict(email, subject="Another CV"), "sha-1")
+
+
+def test_retried_upload_reproduces_its_keys(inserted):
+    batch_id = str(uuid.uuid4())
+    files = [("alice.pdf", b"%PDF-1.4 alice"), ("bob.pdf", b"%PDF-1.4 bob")]
+
+    first = ingest(inserted, batch_id, files)
+    retry = ingest(inserted, batch_id, files)
+
+    # The same keys let the retry skip the files the first attempt stored
+    assert retry == first
+    assert len(set(first)) == 2
+
+
+def test_upload_keys_depend_on_batch_name_and_content(inserted):
+    batch_id = str(uuid.uuid4())
+
+    [key] = ingest(inserted, batch_id, [("alice.pdf", b"%PDF-1.4 alice")])
+
+    assert ingest(inserted, str(uuid.uuid4()), [("alice.pdf", b"%PDF-1.4 alice")]) != [key]
+    assert ingest(inserted, batch_id, [("renamed.pdf", b"%PDF-1.4 alice")]) != [key]
+    assert ingest(inserted, batch_id, [("alice.pdf", b"%PDF-1.4 alice v2")]) != [key]
+
+
+def test_stored_batch_is_replayed():
+    batch = UploadBatch(id=uuid.uuid4(), status="queued")
+
+    assert _replay_upload_batch(None, batch) is batch
+
+
+def test_batch_still_being_stored_is_a_conflict():
+    batch = UploadBatch(id=uuid.uuid4(), status="uploading")
+
+    with pytest.raises(HTTPException) as excinfo:
+        _replay_upload_batch(None, batch)
+
+    assert excinfo.value.status_code == 409
@@ -0,0 +1,91 @@
+import random
+from email import message_from_bytes
+import pytest
+from app.config import settings
+from app.services.mail_classifier import (
+    MAIL_APPLICATION, MAIL_AUTO_REPLY, MAIL_BOUNCE, MAIL_NEWSLETTER, MAIL_NO_ATTACHMENT, MAIL_OVERSIZED,
+    MailClassifier, classify_headers
+)
+from devtools.mail_fixtures import build_application, build_auto_reply, build_bounce, build_newsletter
+
+
+def headers(raw: bytes):
+    return message_from_bytes(raw.split(b"\n\n", 1)[0] + b"\n\n")
+
+
+@pytest.mark.parametrize("raw, mail_class", [
+    (build_application(0, random.Random(1)), MAIL_APPLICATION),
+    # Its PDF brochure could be a resume as far as the headers show, so it is downloaded
+    (build_newsletter(0), MAIL_APPLICATION),
+    (build_auto_reply(0), MAIL_AUTO_REPLY),
+    (build_bounce(0), MAIL_BOUNCE)
+])
+def test_classifies_fixture_mail(raw, mail_class):
+    assert classify_headers(headers(raw)) == mail_class
+
+
+@pytest.mark.parametrize("header, mail_class", [
+    ("From: MAILER-DAEMON@example.com", MAIL_BOUNCE),
+    ("Return-Path: <>\nSubject: Undeliverable: Your application", MAIL_BOUNCE),
+    ("Subject: Out of Office: away until Monday", MAIL_AUTO_REPLY),
+    ("X-Autoreply: yes", MAIL_AUTO_REPLY),
+    ("Precedence: bulk", MAIL_NEWSLETTER),
+    ("List-Id: <jobs.example.net>", MAIL_NEWSLETTER)
+])
+def test_classifies_by_header(header, mail_class):
+    sender = "" if header.startswith("From:") else "From: candidate@example.org\n"
+    raw = f"{sender}{header}\nContent-Type: text/plain\n\n"
+    assert classify_headers(message_from_bytes(raw.encode())) == mail_class
+
+
+@pytest.mark.parametrize("header", ["List-Unsubscribe: <mailto:leave@example.net>", "Precedence: bulk",
+                                    "Auto-Submitted: auto-generated", "Subject: Automatic reply: CV attached"])
+def test_mail_with_a_resume_is_not_screened_by_list_or_auto_headers(header):
+    raw = f"From: jobs@board.example\n{header}\nContent-Type: multipart/mixed; boundary=x\n\n"
+    message = message_from_bytes(raw.encode())
+
+    assert classify_headers(message, resume_parts=1) == MAIL_APPLICATION
+    assert classify_headers(message, resume_parts=0) in (MAIL_AUTO_REPLY, MAIL_NEWSLETTER)
+    # Over POP3 the structure is unknown, so multipart mail is downloaded to look for a resume
+    assert classify_headers(message) == MAIL_APPLICATION
+    plain = message_from_bytes(raw.replace("multipart/mixed; boundary=x", "text/plain").encode())
+    assert classify_headers(plain) in (MAIL_AUTO_REPLY, MAIL_NEWSLETTER)
+
+
+def test_bounce_with_a_resume_is_still_a_bounce():
+    message = message_from_bytes(b"From: MAILER-DAEMON@example.com\nContent-Type: multipart/mixed\n\n")
+
+    assert classify_headers(message, resume_parts=1) == MAIL_BOUNCE
+
+
+def test_mail_that_cannot_carry_a_resume():
+    plain = message_from_bytes(b"From: candidate@example.org\nContent-Type: text/plain\n\n")
+    alternative = message_from_bytes(b"From: candidate@example.org\nContent-Type: multipart/alternative\n\n")
+    mixed = message_from_bytes(b"From: candidate@example.org\nContent-Type: multipart/mixed\n\n")
+
+    assert classify_headers(plain) == MAIL_NO_ATTACHMENT
+    assert classify_headers(alternative) == MAIL_NO_ATTACHMENT
+    assert classify_headers(mixed, resume_parts=0) == MAIL_NO_ATTACHMENT
+    assert classify_headers(plain, resume_parts=1) == MAIL_APPLICATION
+
+
+def test_oversized_mail():
+    raw = headers(build_application(0, random.Random(1)))
+
+    assert classify_headers(raw, size=settings.mail_max_message_size + 1) == MAIL_OVERSIZED
+    assert classify_headers(raw, size=settings.mail_max_message_size) == MAIL_APPLICATION
+
+
+def test_counts_skips_per_mailbox():
+    mail_classifier = MailClassifier()
+    mail_classifier.classify("a", headers(build_application(0, random.Random(1))), size=5000, header_bytes=500)
+    mail_classifier.classify("a", headers(build_auto_reply(0)), size=5000, header_bytes=500)
+    mail_classifier.classify("b", headers(build_bounce(0)), size=1000, header_bytes=200)
+
+    stats = mail_classifier.get_stats()
+
+    assert stats['screened'] == 3
+    assert stats['skipped'] == 2
+    assert stats['bytes_saved'] == 4500 + 800
+    assert stats['mailboxes']['a']['skip_rate'] == 0.5
+    assert stats['mailboxes']['b']['by_class'] == {MAIL_BOUNCE: 1}
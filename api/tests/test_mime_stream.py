@@ -0,0 +1,75 @@
+import hashlib
+import random
+from email.message import EmailMessage
+from pathlib import Path
+from app.config import settings
+from app.services.file_processor import FileProcessor
+from app.services.mime_stream import StreamingMimeParser
+from devtools.mail_fixtures import build_application, build_pdf
+
+
+def parse(raw: bytes):
+    parser = StreamingMimeParser(FileProcessor())
+    for line in raw.split(b"\n"):
+        parser.feed(line.rstrip(b"\r"))
+    return parser.close()
+
+
+def message_with(filename: str, content: bytes, subtype: str = "pdf") -> bytes:
+    message = EmailMessage()
+    message['From'] = "candidate@example.org"
+    message['Subject'] = "Application"
+    message.set_content("Resume attached.\n")
+    message.add_attachment(content, maintype="application", subtype=subtype, filename=filename)
+    return message.as_bytes()
+
+
+def test_spools_decoded_attachment_to_upload_dir():
+    pdf = build_pdf(["Ada Lovelace", "ada@example.org"])
+
+    email_data = parse(message_with("Ada_resume.pdf", pdf))
+
+    assert email_data['subject'] == "Application"
+    assert email_data['body'].strip() == "Resume attached."
+    [attachment] = email_data['attachments']
+    assert attachment['filename'] == "Ada_resume.pdf"
+    assert attachment['content_type'] == "application/pdf"
+    assert Path(attachment['path']).read_bytes() == pdf
+    assert attachment['size'] == len(pdf)
+    assert attachment['sha256'] == hashlib.sha256(pdf).hexdigest()
+
+
+def test_fixture_application_round_trips():
+    email_data = parse(build_application(0, random.Random(3)))
+
+    [attachment] = email_data['attachments']
+    assert Path(attachment['path']).stat().st_size == attachment['size'] > 0
+
+
+def test_ignores_unsupported_attachments():
+    email_data = parse(message_with("photo.png", b"\x89PNG" * 100, subtype="octet-stream"))
+
+    assert email_data['attachments'] == []
+    assert list(Path(settings.upload_dir).iterdir()) == []
+
+
+def test_attachment_name_cannot_leave_upload_dir(tmp_path):
+    email_data = parse(message_with("../../escaped.pdf", b"%PDF-1.4 resume"))
+
+    [attachment] = email_data['attachments']
+    path = Path(attachment['path'])
+    assert path.parent.resolve() == Path(settings.upload_dir).resolve()
+    assert attachment['filename'] == "../../escaped.pdf"
+    assert not (tmp_path / "escaped.pdf").exists()
+    assert not (tmp_path.parent / "escaped.pdf").exists()
+
+
+def test_discard_removes_spooled_files():
+    parser = StreamingMimeParser(FileProcessor())
+    for line in message_with("resume.pdf", b"%PDF-1.4 resume").split(b"\n"):
+        parser.feed(line)
+    parser.close()
+
+    parser.discard()
+
+    assert list(Path(settings.upload_dir).iterdir()) == []
@@ -0,0 +1,30 @@
+import uuid
+from datetime import datetime, timezone
+import pytest
+from fastapi import HTTPException
+from app.services.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trips():
+    created_at = datetime(2024, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    row_id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, row_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, row_id)
+
+
+def test_cursor_keeps_naive_timestamps():
+    created_at = datetime(2024, 3, 1, 12, 30)
+    row_id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", encode_cursor(datetime(2024, 1, 1), "not-a-uuid")])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+
+    assert error.value.status_code == 400
@@ -0,0 +1,195 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+import fakeredis
+import pytest
+from app.services.queue_backend import RedisQueueBackend, fair_share_order
+from app.services.resume_parser import ResumeParseError
+from app.services.retry_policy import FAILURE_PARSE_ERROR, RetryPolicy
+
+
+@pytest.fixture
+def job_updates(monkeypatch):
+    """processing_queue writes the Redis backend mirrors to Postgres, by job id"""
+    updates = {}
+    monkeypatch.setattr(RedisQueueBackend, "_update_job",
+                        lambda self, job_id, **values: updates.setdefault(job_id, []).append(values))
+    monkeypatch.setattr(RedisQueueBackend, "_extend_lease",
+                        lambda self, job_id, lease_expires_at: updates.setdefault(job_id, []).append(
+                            {'lease_expires_at': lease_expires_at}))
+    return updates
+
+
+@pytest.fixture
+def backend(job_updates):
+    backend = RedisQueueBackend(visibility_timeout=60, redis_client=fakeredis.FakeRedis())
+    # Tenant weights and caps come from the users table; tests use the defaults
+    backend._shares_synced_at = float("inf")
+    return backend
+
+
+def job(user_id=None, priority=0, scheduled_at=None, **values):
+    return {
+        'id': uuid.uuid4(),
+        'resume_submission_id': uuid.uuid4(),
+        'user_id': user_id,
+        'priority': priority,
+        'stage': "parse",
+        'retry_count': 0,
+        'max_retries': 3,
+        'scheduled_at': scheduled_at or datetime.now(timezone.utc) - timedelta(seconds=1),
+        **values
+    }
+
+
+def test_publish_makes_committed_jobs_leasable(backend):
+    jobs = [job(), job()]
+
+    backend.publish(jobs)
+
+    leased = [backend.lease()['id'] for _ in jobs]
+    assert sorted(leased) == sorted(str(queued['id']) for queued in jobs)
+    assert backend.lease() is None
+
+
+def test_publishing_again_does_not_duplicate_jobs(backend):
+    first, second = job(), job()
+    backend.publish([first])
+    leased = backend.lease()
+
+    # A retried batch publishes every queued job it finds, including ones already in Redis
+    backend.publish([first, second])
+
+    assert leased['id'] == str(first['id'])
+    assert backend.lease()['id'] == str(second['id'])
+    assert backend.lease() is None
+    assert backend.depth()['leased'] == 2
+
+
+def test_ack_finishes_a_leased_job(backend, job_updates):
+    queued = job()
+    backend.publish([queued])
+
+    leased = backend.lease()
+    backend.extend(leased['id'])
+    backend.ack(leased['id'])
+
+    assert backend.depth() == {'ready': 0, 'delayed': 0, 'leased': 0}
+    assert [update.get('status') for update in job_updates[leased['id']]] == ["processing", None, "completed"]
+    assert backend.lease() is None
+
+
+def test_expired_lease_is_redelivered(backend):
+    backend.publish([job()])
+    leased = backend.lease()
+    assert backend.lease() is None
+
+    # The worker holding the job died and stopped extending its lease
+    backend.redis.zadd(backend._key("leased"), {leased['id']: 0})
+
+    assert backend.lease()['id'] == leased['id']
+    assert backend.depth()['leased'] == 1
+
+
+def test_extend_does_not_revive_a_released_lease(backend, job_updates):
+    backend.publish([job()])
+    leased = backend.lease()
+    backend.ack(leased['id'])
+
+    backend.extend(leased['id'])
+
+    assert backend.depth()['leased'] == 0
+    assert job_updates[leased['id']][-1]['status'] == "completed"
+
+
+def test_retry_delays_the_job_and_counts_the_attempt(backend, job_updates):
+    backend.publish([job()])
+    leased = backend.lease()
+
+    backend.retry(leased['id'], delay_seconds=60, error_message="timeout", failure_class="unknown")
+
+    assert backend.lease() is None
+    assert backend.depth() == {'ready': 0, 'delayed': 1, 'leased': 0}
+    assert job_updates[leased['id']][-1]['status'] == "queued"
+
+    # The backoff has passed
+    backend.redis.zadd(backend._key("delayed"), {leased['id']: 0})
+    retried = backend.lease()
+
+    assert retried['id'] == leased['id']
+    assert retried['retry_count'] == 1
+
+
+def test_job_is_dead_lettered_once_its_retries_run_out(backend, job_updates):
+    retry_policy = RetryPolicy()
+    backend.publish([job()])
+    error = ResumeParseError("Error extracting text from PDF: EOF marker not found")
+
+    decisions = []
+    while (leased := backend.lease()) is not None:
+        decision = retry_policy.decide(error, leased)
+        decisions.append(decision['retry'])
+        if decision['retry']:
+            backend.retry(leased['id'], 0, str(error), decision['failure_class'])
+        else:
+            backend.dead_letter(leased['id'], str(error), decision['failure_class'])
+
+    # parse_error allows one retry
+    assert decisions == [True, False]
+    [updates] = job_updates.values()
+    assert updates[-1]['status'] == "dead_letter"
+    assert updates[-1]['failure_class'] == FAILURE_PARSE_ERROR
+    assert backend.depth() == {'ready': 0, 'delayed': 0, 'leased': 0}
+
+
+def test_fair_share_order_favours_tenants_below_their_share():
+    tenants = {
+        "busy": {'in_flight': 4, 'oldest_ready': 100.0},
+        "heavy": {'in_flight': 4, 'oldest_ready': 300.0},
+        "idle": {'in_flight': 0, 'oldest_ready': 200.0},
+        "capped": {'in_flight': 2, 'oldest_ready': 50.0}
+    }
+    shares = {"heavy": {'weight': 4}, "capped": {'max_concurrent_jobs': 2}}
+
+    # idle 0/1, heavy 4/4, busy 4/1; capped is at its cap
+    assert fair_share_order(tenants, shares) == ["idle", "heavy", "busy"]
+
+
+def test_fair_share_ties_go_to_the_longest_waiting_tenant():
+    tenants = {
+        "late": {'in_flight': 1, 'oldest_ready': 200.0},
+        "early": {'in_flight': 1, 'oldest_ready': 100.0}
+    }
+
+    assert fair_share_order(tenants, {}) == ["early", "late"]
+
+
+def test_lease_alternates_between_tenants(backend):
+    # One user floods the queue before another submits a single job
+    flood = [job(user_id="flood", scheduled_at=datetime.now(timezone.utc) - timedelta(seconds=60 - n))
+             for n in range(5)]
+    backend.publish(flood + [job(user_id="other")])
+
+    leased = [backend.lease()['user_id'] for _ in range(3)]
+
+    assert leased == ["flood", "other", "flood"]
+
+
+def test_lease_gives_heavier_tenants_more_slots(backend):
+    backend.redis.hset(backend._key("weights"), "heavy", 2)
+    backend.publish([job(user_id=user_id) for user_id in ["heavy", "light"] * 3])
+
+    leased = [backend.lease()['user_id'] for _ in range(3)]
+
+    assert sorted(leased) == ["heavy", "heavy", "light"]
+
+
+def test_lease_skips_tenants_at_their_cap(backend):
+    backend.redis.hset(backend._key("caps"), "capped", 1)
+    backend.publish([job(user_id="capped"), job(user_id="capped")])
+
+    first = backend.lease()
+
+    assert first['user_id'] == "capped"
+    assert backend.lease() is None
+    backend.ack(first['id'])
+    assert backend.lease()['user_id'] == "capped"
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+import pytest
+from app.services.response_cache import CacheBackend, MemoryCacheBackend, ResponseCache
+
+
+def test_backend_must_implement_storage():
+    class PartialBackend(CacheBackend):
+        def get_many(self, keys):
+            return [None] * len(keys)
+
+    with pytest.raises(TypeError):
+        PartialBackend()
+
+
+def test_concurrent_misses_share_one_computation():
+    response_cache = ResponseCache(MemoryCacheBackend(max_entries=10), ttl=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'total': 3}
+
+    async def run():
+        return await asyncio.gather(*[
+            response_cache.get_or_compute("metrics", "user", {'days': 7}, compute) for _ in range(5)
+        ])
+
+    assert asyncio.run(run()) == [{'total': 3}] * 5
+    assert len(calls) == 1
+    assert response_cache.stats['misses'] == 1
+    assert response_cache.stats['coalesced'] == 4
+
+
+def test_invalidation_recomputes():
+    response_cache = ResponseCache(MemoryCacheBackend(max_entries=10), ttl=60)
+    values = iter([1, 2])
+
+    async def run():
+        first = await response_cache.get_or_compute("metrics", "user", {}, lambda: next(values))
+        cached = await response_cache.get_or_compute("metrics", "user", {}, lambda: next(values))
+        response_cache.invalidate("user")
+        return first, cached, await response_cache.get_or_compute("metrics", "user", {}, lambda: next(values))
+
+    assert asyncio.run(run()) == (1, 1, 2)
+
+
+def test_waiters_recompute_when_the_computing_request_is_cancelled():
+    response_cache = ResponseCache(MemoryCacheBackend(max_entries=10), ttl=60)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+        return {'total': len(calls)}
+
+    async def run():
+        owner = asyncio.create_task(response_cache.get_or_compute("metrics", "user", {}, compute))
+        await asyncio.sleep(0.05)
+        waiters = [asyncio.create_task(response_cache.get_or_compute("metrics", "user", {}, compute))
+                   for _ in range(3)]
+        await asyncio.sleep(0.05)
+        owner.cancel()
+        results = await asyncio.gather(*waiters)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return results
+
+    assert asyncio.run(run()) == [{'total': 2}] * 3
+    assert len(calls) == 2
+    assert response_cache.get_stats()['inflight'] == 0
@@ -0,0 +1,63 @@
+import httpx
+import pytest
+from openai import APIConnectionError
+from sqlalchemy.exc import OperationalError
+from app.services.resume_parser import ResumeParseError, ResumeParser
+from app.services.retry_policy import (
+    FAILURE_PARSE_ERROR, FAILURE_RATE_LIMIT, FAILURE_TRANSIENT_DB, FAILURE_UNKNOWN, RetryPolicy
+)
+
+
+@pytest.fixture
+def retry_policy():
+    return RetryPolicy()
+
+
+@pytest.mark.parametrize("error, failure_class", [
+    (APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")),
+     FAILURE_RATE_LIMIT),
+    (OperationalError("SELECT 1", {}, Exception("server closed the connection")), FAILURE_TRANSIENT_DB),
+    (ResumeParseError("Unsupported file type: txt"), FAILURE_PARSE_ERROR),
+    (ValueError("invalid literal for int()"), FAILURE_UNKNOWN),
+    (RuntimeError("boom"), FAILURE_UNKNOWN)
+])
+def test_classifies_errors(retry_policy, error, failure_class):
+    assert retry_policy.classify(error) == failure_class
+
+
+@pytest.mark.parametrize("content, file_type", [(b"%PDF-1.4 truncated", "pdf"), (b"plain text", "txt")])
+def test_parser_errors_classify_as_parse_error(retry_policy, content, file_type):
+    with pytest.raises(ResumeParseError) as excinfo:
+        ResumeParser().parse_resume(content, file_type)
+
+    assert retry_policy.classify(excinfo.value) == FAILURE_PARSE_ERROR
+
+
+@pytest.mark.parametrize("failure_class", [FAILURE_RATE_LIMIT, FAILURE_TRANSIENT_DB, FAILURE_UNKNOWN])
+def test_delay_stays_within_jittered_backoff(retry_policy, failure_class):
+    policy = retry_policy.policies[failure_class]
+    for retry_count in range(10):
+        ceiling = min(policy['max_delay'], policy['base_delay'] * 2 ** retry_count)
+        for _ in range(20):
+            assert ceiling / 2 <= retry_policy.next_delay(failure_class, retry_count) <= ceiling
+
+
+def test_retries_until_class_limit(retry_policy):
+    error = ResumeParseError("Corrupt PDF")
+
+    first = retry_policy.decide(error, {'retry_count': 0, 'max_retries': 3})
+    second = retry_policy.decide(error, {'retry_count': 1, 'max_retries': 3})
+
+    assert first['failure_class'] == FAILURE_PARSE_ERROR
+    assert first['retry'] is True
+    assert first['delay_seconds'] > 0
+    assert second == {'failure_class': FAILURE_PARSE_ERROR, 'retry': False, 'delay_seconds': None}
+
+
+def test_unknown_failures_use_job_limit(retry_policy):
+    error = RuntimeError("boom")
+
+    assert retry_policy.decide(error, {'retry_count': 4, 'max_retries': 5})['retry'] is True
+    assert retry_policy.decide(error, {'retry_count': 5, 'max_retries': 5})['retry'] is False
+    assert retry_policy.decide(error, {'retry_count': 2})['retry'] is True
+    assert retry_policy.decide(error, {'retry_count': 3})['retry'] is False
@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+import pytest
+from app.models.resume_submission import ResumeSubmission
+from app.services import rollups
+
+
+@pytest.fixture
+def bumps(monkeypatch):
+    """Counts each bump_daily_rollup call would add, with zeros dropped as it drops them"""
+    recorded = []
+    monkeypatch.setattr(rollups, "bump_daily_rollup", lambda db, user_id, day=None, **counts: recorded.append(
+        {name: value for name, value in counts.items() if value}
+    ))
+    return recorded
+
+
+@pytest.mark.parametrize("old, new, counts", [
+    ("pending", "processing", {}),
+    ("processing", "completed", {'processed': 1}),
+    ("completed", "completed", {}),
+    ("processing", "failed", {'failed': 1}),
+    ("failed", "failed", {}),
+    ("completed", "failed", {'processed': -1, 'failed': 1}),
+    ("failed", "pending", {'failed': -1}),
+    ("pending", "completed", {'processed': 1})
+])
+def test_counters_follow_status_change(bumps, old, new, counts):
+    submission = ResumeSubmission(id=uuid.uuid4(), email_config_id=uuid.uuid4(), status=old,
+                                  created_at=datetime(2024, 5, 1, 9, 0))
+
+    rollups.set_submission_status(None, submission, new)
+
+    assert submission.status == new
+    assert bumps == [counts]
+
+
+def test_extra_counts_go_in_the_same_bump(bumps):
+    submission = ResumeSubmission(id=uuid.uuid4(), email_config_id=uuid.uuid4(), status="completed")
+
+    rollups.set_submission_status(None, submission, "completed", score_sum=80, score_count=1)
+
+    assert bumps == [{'score_sum': 80, 'score_count': 1}]
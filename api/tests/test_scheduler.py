@@ -0,0 +1,41 @@
+from datetime import datetime
+import pytest
+from app.services.scheduler import CronSchedule
+
+
+@pytest.mark.parametrize("expression, moment, expected", [
+    ("*/15 * * * *", datetime(2024, 5, 1, 10, 7, 30), datetime(2024, 5, 1, 10, 15)),
+    ("*/15 * * * *", datetime(2024, 5, 1, 10, 15), datetime(2024, 5, 1, 10, 30)),
+    ("0 3 * * *", datetime(2024, 5, 1, 3, 0), datetime(2024, 5, 2, 3, 0)),
+    ("30 9 * * 1-5", datetime(2024, 5, 3, 10, 0), datetime(2024, 5, 6, 9, 30)),
+    ("0 0 1 * *", datetime(2024, 12, 15, 8, 0), datetime(2025, 1, 1, 0, 0)),
+    ("0 12 29 2 *", datetime(2024, 3, 1), datetime(2028, 2, 29, 12, 0)),
+    ("0,30 8-9 * * *", datetime(2024, 5, 1, 9, 30), datetime(2024, 5, 2, 8, 0)),
+    ("0-30/10 * * * *", datetime(2024, 5, 1, 10, 31), datetime(2024, 5, 1, 11, 0))
+])
+def test_next_after(expression, moment, expected):
+    assert CronSchedule(expression).next_after(moment) == expected
+
+
+def test_day_of_month_or_day_of_week():
+    # The 13th or any Friday (day-of-week 5)
+    schedule = CronSchedule("0 0 13 * 5")
+
+    assert schedule.next_after(datetime(2024, 9, 1)) == datetime(2024, 9, 6)
+    assert schedule.next_after(datetime(2024, 9, 12)) == datetime(2024, 9, 13)
+
+
+def test_sunday_is_zero():
+    assert CronSchedule("0 0 * * 0").next_after(datetime(2024, 5, 1)) == datetime(2024, 5, 5)
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "5-1 * * * *", "*/0 * * * *",
+                                        "* * 0 * *", "* * * 13 *", "* * * * 7", "a * * * *"])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_expression_that_never_matches():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 31 2 *").next_after(datetime(2024, 1, 1))
@@ -0,0 +1,96 @@
+import socket
+from email.message import EmailMessage
+import pytest
+from app.config import settings
+from app.services.smtp_pool import SmtpConnectionPool
+
+
+@pytest.fixture
+def pool():
+    pool = SmtpConnectionPool()
+    yield pool
+    pool.close_all()
+
+
+@pytest.fixture
+def smtp_settings(smtp_server):
+    host, port = smtp_server.address
+    return {'host': host, 'port': port, 'username': "test", 'password': "test"}
+
+
+def messages(*recipients):
+    built = []
+    for recipient in recipients:
+        message = EmailMessage()
+        message['Subject'] = "Your application"
+        message.set_content("Thanks for applying.")
+        built.append((message, "hr@example.com", [recipient]))
+    return built
+
+
+def idle_session(pool, smtp_settings):
+    [session] = pool._idle[pool.pool_key(smtp_settings)]
+    return session
+
+
+def test_session_is_kept_between_sends(pool, smtp_settings, smtp_server):
+    pool.send_many(smtp_settings, messages("a@example.com"))
+    pool.send_many(smtp_settings, messages("b@example.com"))
+
+    assert smtp_server.sessions == 1
+    assert smtp_server.accepted == 2
+    assert pool.get_stats()['connects'] == 1
+    assert pool.get_stats()['reuses'] == 1
+
+
+def test_session_is_replaced_after_its_message_limit(pool, smtp_settings, smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "smtp_max_messages_per_connection", 2)
+
+    results = pool.send_many(smtp_settings, messages(*(f"c{n}@example.com" for n in range(5))))
+
+    assert [result['status'] for result in results] == ["sent"] * 5
+    assert smtp_server.sessions == 3
+
+
+def test_dropped_session_is_reopened(pool, smtp_settings, smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "smtp_noop_interval", 3600)
+    pool.send_many(smtp_settings, messages("a@example.com"))
+    # The server timed the idle session out
+    idle_session(pool, smtp_settings).smtp.sock.shutdown(socket.SHUT_RDWR)
+
+    [result] = pool.send_many(smtp_settings, messages("b@example.com"))
+
+    assert result['status'] == "sent"
+    assert smtp_server.sessions == 2
+    assert smtp_server.accepted == 2
+
+
+def test_idle_session_is_checked_before_use(pool, smtp_settings, smtp_server, monkeypatch):
+    monkeypatch.setattr(settings, "smtp_noop_interval", -1)
+    pool.send_many(smtp_settings, messages("a@example.com"))
+    idle_session(pool, smtp_settings).smtp.close()
+
+    [result] = pool.send_many(smtp_settings, messages("b@example.com"))
+
+    assert result['status'] == "sent"
+    assert pool.get_stats()['health_check_failures'] == 1
+    assert smtp_server.sessions == 2
+
+
+def test_rejected_recipient_fails_permanently_without_ending_the_session(pool, smtp_settings, smtp_server):
+    results = pool.send_many(smtp_settings, messages("a@rejected.example", "b@example.com"))
+
+    assert [(result['status'], result['permanent']) for result in results] == [("failed", True), ("sent", False)]
+    assert smtp_server.sessions == 1
+
+
+def test_unreachable_server_fails_every_message_once(pool):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    results = pool.send_many({'host': "127.0.0.1", 'port': port, 'username': None, 'password': None},
+                             messages("a@example.com", "b@example.com"))
+
+    assert [(result['status'], result['permanent']) for result in results] == [("failed", False)] * 2
+    assert pool.get_stats()['connects'] == 0
@@ -0,0 +1,45 @@
+import pytest
+from app.services.template_engine import CompiledTemplate, TemplateError, compile_template
+
+
+def test_renders_like_str_format():
+    source = "Dear {name}, you scored {score:.1f} ({grade!r}) for {position}."
+    fields = {'name': "Ada", 'score': 87.25, 'grade': "A", 'position': "Engineer"}
+
+    assert compile_template(source)(fields) == source.format(**fields)
+
+
+def test_literal_only_and_empty_templates():
+    assert compile_template("No fields {{here}}")({}) == "No fields {here}"
+    assert compile_template("")({}) == ""
+
+
+def test_template_text_is_never_code():
+    render = compile_template("'); import os; ('{name}\\n\"")
+
+    assert render({'name': "x"}) == "'); import os; ('x\\n\""
+
+
+@pytest.mark.parametrize("source", [
+    "{name.__class__}", "{name[0]}", "{name:{width}}", "{name!x}", "{0}", "{}", "{name", "name}"
+])
+def test_rejects_unsupported_templates(source):
+    with pytest.raises(TemplateError):
+        compile_template(source)
+
+
+def test_template_error_is_a_value_error():
+    assert issubclass(TemplateError, ValueError)
+
+
+def test_missing_field_raises_key_error():
+    with pytest.raises(KeyError):
+        compile_template("Hello {name}")({})
+
+
+def test_compiled_template_truncates_subject():
+    template = CompiledTemplate("1", "long", "{subject}", "Body for {name}")
+
+    rendered = template.render({'subject': "x" * 600, 'name': "Ada"})
+
+    assert rendered == {'subject': "x" * 500, 'body': "Body for Ada", 'template_name': "long"}
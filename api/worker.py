@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import signal
+from app.config import settings
+from app.services.pipeline import ROLE_STAGES, ResumePipeline
+from app.services.scheduler import build_scheduler
+
+
+async def report_stats(pipeline: ResumePipeline, interval: int) -> None:
+    """Print stage queue depths periodically"""
+    while True:
+        await asyncio.sleep(interval)
+        stats = pipeline.get_stats()
+        summary = ", ".join(
+            f"{name}={stage['queue_depth']}/{stage['queue_size']} ({stage['in_flight']} in flight)"
+            for name, stage in stats.items()
+        )
+        print(f"Pipeline queues [{pipeline.role}]: {summary}")
+        if pipeline.poller.cycles:
+            cycle = pipeline.poller.cycles[-1]
+            print(
+                f"Mailbox sweep: {cycle['polled']}/{cycle['mailboxes']} mailboxes in {cycle['cycle_seconds']}s, "
+                f"{cycle['new_messages']} new, {cycle['errors']} errors"
+            )
+
+
+async def main(role: str, poll_interval: int, stats_interval: int, with_scheduler: bool) -> None:
+    """Run the resume pipeline until interrupted.
+
+    The first SIGTERM/SIGINT drains in-flight work before exiting; a second
+    one stops immediately. With the scheduler, mailbox polling moves to a
+    scheduled task so only one worker in the cluster polls each round.
+    """
+    pipeline = ResumePipeline(role=role)
+    loop = asyncio.get_running_loop()
+    run_task = asyncio.create_task(pipeline.run(poll_interval, poll_mailboxes=not with_scheduler))
+    scheduler = build_scheduler(pipeline) if with_scheduler else None
+    if scheduler is not None:
+        await scheduler.start()
+
+    def handle_signal():
+        if pipeline._stop_event is not None and pipeline._stop_event.is_set():
+            run_task.cancel()
+        else:
+            print(f"Draining {role} worker")
+            pipeline.request_shutdown()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, handle_signal)
+
+    stats_task = asyncio.create_task(report_stats(pipeline, stats_interval))
+    try:
+        await run_task
+    except asyncio.CancelledError:
+        pass
+    finally:
+        stats_task.cancel()
+        if scheduler is not None:
+            await scheduler.stop()
+        await pipeline.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume processing pipeline worker")
+    parser.add_argument("--role", choices=sorted(ROLE_STAGES), default="all",
+                        help="Pipeline stages this worker runs")
+    parser.add_argument("--poll-interval", type=int, default=settings.pipeline_poll_interval,
+                        help="Seconds between mailbox polls")
+    parser.add_argument("--stats-interval", type=int, default=30,
+                        help="Seconds between queue depth reports")
+    parser.add_argument("--scheduler", action="store_true",
+                        help="Also run the periodic task scheduler")
+    args = parser.parse_args()
+    asyncio.run(main(args.role, args.poll_interval, args.stats_interval, args.scheduler))
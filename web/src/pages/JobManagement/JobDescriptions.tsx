@@ -16,7 +16,7 @@ export default function JobDescriptions() {
     try {
       setLoading(true);
       const data = await jobApi.getJobDescriptions();
-      setJobDescriptions(data);
+      setJobDescriptions(data.items);
     } catch (err: any) {
       setError(err.message || 'Failed to fetch job descriptions');
     } finally {
@@ -19,7 +19,7 @@ export default function ResumeSubmissions() {
       console.log('Fetching resume submissions...');
       const data = await jobApi.getResumeSubmissions();
       console.log('Resume submissions data:', data);
-      setResumeSubmissions(data);
+      setResumeSubmissions(data.items);
     } catch (err: any) {
       console.error('Error fetching resume submissions:', err);
       setError(err.message || 'Failed to fetch resume submissions');
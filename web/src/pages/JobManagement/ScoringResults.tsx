@@ -16,7 +16,7 @@ export default function ScoringResults() {
     try {
       setLoading(true);
       const data = await jobApi.getScoringResults();
-      setScoringResults(data);
+      setScoringResults(data.items);
     } catch (err: any) {
       setError(err.message || 'Failed to fetch scoring results');
     } finally {
@@ -28,6 +28,7 @@ export type {
   ResumeSubmission,
   CreateResumeSubmission,
   ScoringResult,
+  Page,
 } from './jobApi';
 
 export type {
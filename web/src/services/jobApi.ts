@@ -112,11 +112,25 @@ export interface ScoringResult {
   updated_at: string;
 }
 
+// One page of a list endpoint. Pass nextCursor back as cursor to get the
+// following page; it is null on the last page.
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
 class JobApiService {
+  private async getPage<T>(path: string, cursor?: string, limit = 100): Promise<Page<T>> {
+    const response = await apiService.api.get(path, { params: { cursor, limit } });
+    return {
+      items: response.data,
+      nextCursor: response.headers['x-next-cursor'] ?? null,
+    };
+  }
+
   // Job Descriptions
-  async getJobDescriptions(skip = 0, limit = 100): Promise<JobDescription[]> {
-    const response = await apiService.api.get(`/job-descriptions?skip=${skip}&limit=${limit}`);
-    return response.data;
+  async getJobDescriptions(cursor?: string, limit = 100): Promise<Page<JobDescription>> {
+    return this.getPage<JobDescription>('/job-descriptions', cursor, limit);
   }
 
   async getJobDescription(id: string): Promise<JobDescription> {
@@ -139,9 +153,8 @@ class JobApiService {
   }
 
   // Resume Submissions
-  async getResumeSubmissions(skip = 0, limit = 100): Promise<ResumeSubmission[]> {
-    const response = await apiService.api.get(`/resume-submissions?skip=${skip}&limit=${limit}`);
-    return response.data;
+  async getResumeSubmissions(cursor?: string, limit = 100): Promise<Page<ResumeSubmission>> {
+    return this.getPage<ResumeSubmission>('/resume-submissions', cursor, limit);
   }
 
   async getResumeSubmission(id: string): Promise<ResumeSubmission> {
@@ -159,9 +172,8 @@ class JobApiService {
   }
 
   // Scoring Results
-  async getScoringResults(skip = 0, limit = 100): Promise<ScoringResult[]> {
-    const response = await apiService.api.get(`/scoring-results?skip=${skip}&limit=${limit}`);
-    return response.data;
+  async getScoringResults(cursor?: string, limit = 100): Promise<Page<ScoringResult>> {
+    return this.getPage<ScoringResult>('/scoring-results', cursor, limit);
   }
 
   async getScoringResult(id: string): Promise<ScoringResult> {